@@ -1,33 +1,36 @@
 from __future__ import division, print_function, absolute_import
 import os
-import tensorflow as tf
 import numpy as np
+from functools import lru_cache
 
-from tensorflow.contrib.layers import l2_regularizer, l1_regularizer
-from keras.datasets import cifar10
-from keras.utils import to_categorical
-from sklearn.model_selection import train_test_split
 from mfes.utils.ease import ease_target
+from mfes.utils.lazy_import import lazy_import
+
+tf = lazy_import('tensorflow')
 
 epoch_size = 40000
 num_classes = 10
 
-# The data, split between train and test sets:
-(x_train, y_train), (x_test, y_test) = cifar10.load_data()
-# print('x_train shape:', x_train.shape) 50000, 32, 32, 3
-# Convert class vectors to binary class matrices.
-y_train = to_categorical(y_train, num_classes)
-y_test = to_categorical(y_test, num_classes)
-x_train = x_train.astype('float32')
-x_test = x_test.astype('float32')
-x_train /= 255
-x_test /= 255
-x_train, x_val, y_train, y_val = train_test_split(x_train, y_train, test_size=0.2, random_state=42)
-# use validation set as evaluation target
-x_test, y_test = x_val, y_val
-print(x_train.shape[0], 'train samples')
-print(x_val.shape[0], 'val samples')
-print(x_test.shape[0], 'test samples')
+
+@lru_cache(maxsize=None)
+def load_dataset():
+    """Load CIFAR-10 once per process, on the first trial instead of at import."""
+    from keras.datasets import cifar10
+    from keras.utils import to_categorical
+    from sklearn.model_selection import train_test_split
+
+    # The data, split between train and test sets:
+    (x_train, y_train), (x_test, y_test) = cifar10.load_data()
+    # print('x_train shape:', x_train.shape) 50000, 32, 32, 3
+    # Convert class vectors to binary class matrices.
+    y_train = to_categorical(y_train, num_classes)
+    x_train = x_train.astype('float32')
+    x_train /= 255
+    x_train, x_val, y_train, y_val = train_test_split(x_train, y_train, test_size=0.2, random_state=42)
+    # use validation set as evaluation target
+    print(x_train.shape[0], 'train samples')
+    print(x_val.shape[0], 'val samples')
+    return x_train, y_train, x_val, y_val
 
 
 # Create the neural network
@@ -47,10 +50,10 @@ def conv_net(x, params, reuse, is_training):
             # Convolution Layer Group
             conv1_1 = tf.layers.conv2d(input, conv_unit, 3, activation=tf.nn.relu, padding='same',
                                        kernel_initializer=tf.truncated_normal_initializer(stddev=stddev),
-                                       kernel_regularizer=l2_regularizer(scale=k_reg))
+                                       kernel_regularizer=tf.contrib.layers.l2_regularizer(scale=k_reg))
             conv1_2 = tf.layers.conv2d(conv1_1, conv_unit, 3, activation=tf.nn.relu,
                                        kernel_initializer=tf.truncated_normal_initializer(stddev=stddev),
-                                       kernel_regularizer=l2_regularizer(scale=k_reg))
+                                       kernel_regularizer=tf.contrib.layers.l2_regularizer(scale=k_reg))
             # Max Pooling (down-sampling) with strides of 2 and kernel size of 2
             conv1 = tf.layers.max_pooling2d(conv1_2, 2, 2)
             input = tf.layers.dropout(conv1, rate=.25, training=is_training)
@@ -94,7 +97,7 @@ def next_batch(num, data, labels):
 # TODO: consider early-stops
 @ease_target(model_dir="./data/models", name='convnet')
 def train(epoch_num, params, logger=None):
-    import tensorflow as tf
+    x_train, y_train, x_test, y_test = load_dataset()
 
     # training hyperparameters
     learning_rate = params['learning_rate']
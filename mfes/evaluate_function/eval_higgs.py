@@ -2,12 +2,15 @@ from __future__ import division, print_function, absolute_import
 
 import os
 import numpy as np
+from functools import lru_cache
 import pandas as pd
-import xgboost as xgb
 from sklearn.metrics import accuracy_score
 from sklearn.model_selection import train_test_split
 
 from mfes.utils.ease import ease_target
+from mfes.utils.lazy_import import lazy_import
+
+xgb = lazy_import('xgboost')
 
 
 def load_higgs():
@@ -27,21 +30,26 @@ def load_higgs():
     return x, y
 
 
-X, y = load_higgs()
 num_cls = 2
-x_train, x_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
-print('x_train shape:', x_train.shape, x_train.dtype)
-print('x_train shape:', x_test.shape, x_test.dtype)
-s_max = x_train.shape[0]
-resource_unit = s_max // 27
+
+
+@lru_cache(maxsize=None)
+def load_dataset():
+    """Load and split the dataset once per process, on the first trial instead of at import."""
+    X, y = load_higgs()
+    x_train, x_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+    print('x_train shape:', x_train.shape, x_train.dtype)
+    print('x_train shape:', x_test.shape, x_test.dtype)
+    return x_train, y_train, x_test, y_test
 
 
 @ease_target(model_dir="./data/models", name='higgs')
 def train(resource_num, params, logger=None):
     resource_num = int(resource_num)
     print(resource_num, params)
-    global x_train, y_train
+    x_train, y_train, x_test, y_test = load_dataset()
     s_max = x_train.shape[0]
+    resource_unit = s_max // 27
     # Create the subset of the full dataset.
     subset_size = resource_num * resource_unit
     shuffle = np.random.permutation(np.arange(s_max))
@@ -2,6 +2,7 @@ from __future__ import division, print_function, absolute_import
 
 import time
 import numpy as np
+from functools import lru_cache
 import pandas as pd
 from sklearn.metrics import accuracy_score
 from sklearn.model_selection import train_test_split
@@ -18,15 +19,19 @@ def load_mnist():
     return x, y
 
 
-X, y = load_mnist()
 num_cls = 10
-x_train, x_test, y_train, y_test = train_test_split(X, y, test_size=1 / 7, stratify=y, random_state=1)
-x_train, x_valid, y_train, y_valid = train_test_split(x_train, y_train, test_size=0.2, stratify=y_train,
-                                                      random_state=1)
-print('x_train shape:', x_train.shape)
-print('x_valid shape:', x_valid.shape)
-s_max = x_train.shape[0]
-resource_unit = s_max // 27
+
+
+@lru_cache(maxsize=None)
+def load_dataset():
+    """Load and split the dataset once per process, on the first trial instead of at import."""
+    X, y = load_mnist()
+    x_train, x_test, y_train, y_test = train_test_split(X, y, test_size=1 / 7, stratify=y, random_state=1)
+    x_train, x_valid, y_train, y_valid = train_test_split(x_train, y_train, test_size=0.2, stratify=y_train,
+                                                          random_state=1)
+    print('x_train shape:', x_train.shape)
+    print('x_valid shape:', x_valid.shape)
+    return x_train, y_train, x_valid, y_valid
 
 
 @ease_target(model_dir="./data/models", name='mnist_svm')
@@ -34,8 +39,9 @@ def train(resource_num, params, logger=None):
     start_time = time.time()
     resource_num = int(resource_num)
     print(resource_num, params)
-    global x_train, y_train
+    x_train, y_train, x_valid, y_valid = load_dataset()
     s_max = x_train.shape[0]
+    resource_unit = s_max // 27
     # Create the subset of the full dataset.
     subset_size = resource_num * resource_unit
     shuffle = np.random.permutation(np.arange(s_max))
@@ -4,6 +4,7 @@ import sys
 import time
 import pickle as pkl
 import numpy as np
+from functools import lru_cache
 from sklearn.metrics.scorer import balanced_accuracy_scorer
 from sklearn.preprocessing import OneHotEncoder
 
@@ -90,19 +91,28 @@ def get_fit_params(y, estimator):
     return _init_params, _fit_params
 
 
-tmp_node = load_data('letter(1)', data_dir='./', task_type=0, datanode_returned=True)
-tmp_evaluator = ClassificationEvaluator(None)
-tmp_bo = AnotherBayesianOptimizationOptimizer(0, tmp_node, tmp_evaluator, 'adaboost', 1, 1, 1)
+@lru_cache(maxsize=None)
+def get_fe_parser():
+    # Built on the first trial of each process instead of at import.
+    tmp_node = load_data('letter(1)', data_dir='./', task_type=0, datanode_returned=True)
+    tmp_evaluator = ClassificationEvaluator(None)
+    return AnotherBayesianOptimizationOptimizer(0, tmp_node, tmp_evaluator, 'adaboost', 1, 1, 1)
+
+
+@lru_cache(maxsize=None)
+def get_train_node(dataset):
+    train_node, _ = load_train_test_data(dataset, data_dir='./', task_type=0)
+    return train_node
 
 
 @ease_target(model_dir="./data/models", name='sys')
-def train(resource_num, params, data_node):
+def train(resource_num, params, kargs):
     print(resource_num, params)
     start_time = time.time()
     resource_num = resource_num * 1.0 / 27
     # Prepare data node.
-    data_node = data_node['data_node']
-    _data_node = tmp_bo._parse(data_node, params)
+    data_node = get_train_node(kargs['dataset'])
+    _data_node = get_fe_parser()._parse(data_node, params)
 
     X_train, y_train = _data_node.data
 
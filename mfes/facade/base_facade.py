@@ -5,10 +5,8 @@ import dill
 import os
 import numpy as np
 from concurrent.futures import ProcessPoolExecutor
-from matplotlib import pyplot as plt
 from mfes.utils.logging_utils import get_logger, setup_logger
-
-plt.switch_backend('agg')
+from mfes.utils.lazy_import import get_pyplot
 
 
 def evaluate_func(params):
@@ -176,6 +174,7 @@ class BaseFacade(object):
             stage_y = np.array(self.stage_history['performance'])
             np.save('data/%s' % stage_file_name, np.array([stage_x, stage_y]))
 
+        plt = get_pyplot()
         plt.plot(x, y)
         plt.xlabel('Time elapsed (sec)')
         plt.ylabel('Validation error')
@@ -8,6 +8,7 @@ from mfes.optimizer.random_sampling import RandomSampling
 from mfes.config_space import convert_configurations_to_array, sample_configurations
 from mfes.facade.base_facade import BaseFacade
 from mfes.config_space.util import expand_configurations
+from mfes.utils.run_history import RunHistory
 from mfes.utils.util_funcs import minmax_normalization
 from math import log, ceil
 
@@ -37,13 +38,11 @@ class BaseIID(BaseFacade):
         self.iterate_id = 0
         self.iterate_r = []
 
-        self.target_x = dict()
-        self.target_y = dict()
+        self.run_history = dict()
         for index, item in enumerate(np.logspace(0, self.s_max, self.s_max+1, base=self.eta)):
             r = int(item)
             self.iterate_r.append(r)
-            self.target_x[r] = []
-            self.target_y[r] = []
+            self.run_history[r] = RunHistory(self.config_space, start_time=self.global_start_time)
 
     def iterate(self, skip_last=0):
 
@@ -83,8 +82,7 @@ class BaseIID(BaseFacade):
                 val_losses = [item['loss'] for item in ret_val]
                 ref_list = [item['ref_id'] for item in ret_val]
 
-                self.target_x[int(n_iterations)].extend(T)
-                self.target_y[int(n_iterations)].extend(val_losses)
+                self.run_history[int(n_iterations)].add_batch(T, val_losses)
 
                 if int(n_iterations) == self.R:
                     self.incumbent_configs.extend(T)
@@ -127,19 +125,19 @@ class BaseIID(BaseFacade):
             self.remove_immediate_model()
 
     def choose_next(self, num_config):
-        if len(self.target_y[self.iterate_r[-1]]) == 0:
+        if len(self.run_history[self.iterate_r[-1]]) == 0:
             return sample_configurations(self.config_space, num_config)
 
         train_x = []
         train_y = []
         for item in self.iterate_r:
             # objective value normalization: min-max linear normalization
-            normalized_y = minmax_normalization(self.target_y[item])
+            normalized_y = minmax_normalization(self.run_history[item].perfs)
             train_y.extend(normalized_y)
-            train_x.extend(self.target_x[item])
+            train_x.append(self.run_history[item].X)
+        train_x = np.vstack(train_x)
 
-        self.surrogate.train(convert_configurations_to_array(train_x),
-                                      np.array(train_y, dtype=np.float64))
+        self.surrogate.train(train_x, np.array(train_y, dtype=np.float64))
 
         self.logger.info('train feature is: %s' % str(train_x[:10]))
         self.logger.info('train data size is: %d' % len(train_y))
@@ -151,8 +149,7 @@ class BaseIID(BaseFacade):
         while conf_cnt < num_config and total_cnt < 2 * num_config:
             incumbent = dict()
             max_r = self.iterate_r[-1]
-            best_index = np.argmin(self.target_y[max_r])
-            incumbent['config'] = self.target_x[max_r][best_index]
+            incumbent['config'], _ = self.run_history[max_r].get_incumbent()
             approximate_obj = self.surrogate.predict(convert_configurations_to_array([incumbent['config']]))[0]
             incumbent['obj'] = approximate_obj
 
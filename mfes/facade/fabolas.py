@@ -7,7 +7,8 @@ from robo.fmin import fabolas
 from sklearn.metrics import accuracy_score
 from sklearn.model_selection import train_test_split
 from sklearn.svm import SVC
-from matplotlib import pyplot as plt
+
+from mfes.utils.lazy_import import get_pyplot
 
 logging.basicConfig(level=logging.INFO)
 
@@ -88,6 +89,7 @@ class FABOLAS(object):
         self.inc_list.append(self.inc)
         np.save(self.file_path, np.array([self.time_cost, self.inc_list]))
 
+        plt = get_pyplot()
         plt.plot(self.time_cost, self.inc_list)
         plt.xlabel('time_elapsed (s)')
         plt.ylabel('validation error')
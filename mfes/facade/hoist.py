@@ -9,6 +9,7 @@ from mfes.optimizer.random_sampling import RandomSampling
 from mfes.config_space import convert_configurations_to_array, sample_configurations
 from mfes.facade.base_facade import BaseFacade
 from mfes.config_space.util import expand_configurations
+from mfes.utils.run_history import RunHistory
 from mfes.utils.util_funcs import minmax_normalization
 from math import log, ceil
 
@@ -65,13 +66,11 @@ class XFHB(BaseFacade):
         self.iterate_r = []
         self.hist_weights = list()
 
-        self.target_x = dict()
-        self.target_y = dict()
+        self.run_history = dict()
         for index, item in enumerate(np.logspace(0, self.s_max, self.s_max+1, base=self.eta)):
             r = int(item)
             self.iterate_r.append(r)
-            self.target_x[r] = []
-            self.target_y[r] = []
+            self.run_history[r] = RunHistory(self.config_space, start_time=self.global_start_time)
 
     def iterate(self, skip_last=0):
 
@@ -118,8 +117,7 @@ class XFHB(BaseFacade):
                 val_losses = [item['loss'] for item in ret_val]
                 ref_list = [item['ref_id'] for item in ret_val]
 
-                self.target_x[int(n_iterations)].extend(T)
-                self.target_y[int(n_iterations)].extend(val_losses)
+                self.run_history[int(n_iterations)].add_batch(T, val_losses)
 
                 if int(n_iterations) == self.R:
                     self.incumbent_configs.extend(T)
@@ -146,8 +144,8 @@ class XFHB(BaseFacade):
             if self.info_type == 'Weighted':
                 for item in self.iterate_r[self.iterate_r.index(r):]:
                     # objective value normalization: min-max linear normalization
-                    normalized_y = minmax_normalization(self.target_y[item])
-                    self.weighted_surrogate.train(convert_configurations_to_array(self.target_x[item]),
+                    normalized_y = minmax_normalization(self.run_history[item].perfs)
+                    self.weighted_surrogate.train(self.run_history[item].X,
                                                   np.array(normalized_y, dtype=np.float64), r=item)
         # TODO: trade off value: decay (bayesian optimization did? do we need trade off e&e again?)
         self.init_tradeoff *= self.tradeoff_dec_rate
@@ -196,15 +194,14 @@ class XFHB(BaseFacade):
                 r = self.R
 
         # TODO: in different types, this condition may not needed any more.
-        n_exp = len(self.target_y[r])
+        n_exp = len(self.run_history[r])
         if n_exp < 2*self.num_config:
             return sample_configurations(self.config_space, num_config)
 
-        self.logger.info('train feature is: %s' % str(self.target_x[r]))
-        self.logger.info('train target is: %s' % str(self.target_y[r]))
+        self.logger.info('train feature is: %s' % str(self.run_history[r].X))
+        self.logger.info('train target is: %s' % str(self.run_history[r].perfs))
 
-        self.surrogate.train(convert_configurations_to_array(self.target_x[r]),
-                             np.array(self.target_y[r], dtype=np.float64))
+        self.surrogate.train(self.run_history[r].X, self.run_history[r].perfs)
 
         conf_cnt = 0
         next_configs = []
@@ -217,8 +214,7 @@ class XFHB(BaseFacade):
             else:
                 # print('use surrogate to produce candidate.')
                 incumbent = dict()
-                incumbent['obj'] = np.min(self.target_y[r])
-                incumbent['config'] = self.target_x[r][np.argmin(self.target_y[r])]
+                incumbent['config'], incumbent['obj'] = self.run_history[r].get_incumbent()
 
                 self.acquisition_func.update(model=self.surrogate, eta=incumbent)
                 rand_config = self.acq_optimizer.maximize(batch_size=1)[0]
@@ -233,7 +229,7 @@ class XFHB(BaseFacade):
         return next_configs
 
     def choose_next_weighted(self, num_config):
-        if len(self.target_y[self.iterate_r[-1]]) == 0:
+        if len(self.run_history[self.iterate_r[-1]]) == 0:
             return sample_configurations(self.config_space, num_config)
 
         conf_cnt = 0
@@ -246,8 +242,7 @@ class XFHB(BaseFacade):
             # TODO: problem-->use the best in maximal resource.
             # TODO: smac's optmization algorithm.
             max_r = self.iterate_r[-1]
-            best_index = np.argmin(self.target_y[max_r])
-            incumbent['config'] = self.target_x[max_r][best_index]
+            incumbent['config'], _ = self.run_history[max_r].get_incumbent()
             approximate_obj = self.weighted_surrogate.predict(convert_configurations_to_array([incumbent['config']]))[0]
             incumbent['obj'] = approximate_obj
 
@@ -266,9 +261,8 @@ class XFHB(BaseFacade):
     def update_weight_vector(self):
         rho = self.rho
         max_r = self.iterate_r[-1]
-        incumbent_configs = self.target_x[max_r]
-        test_x = convert_configurations_to_array(incumbent_configs)
-        test_y = minmax_normalization(self.target_y[max_r])
+        test_x = self.run_history[max_r].X
+        test_y = minmax_normalization(self.run_history[max_r].perfs)
 
         r_list = self.weighted_surrogate.surrogate_r
         cur_confidence = self.weighted_surrogate.surrogate_weight
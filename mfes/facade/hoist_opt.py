@@ -8,6 +8,7 @@ from mfes.facade.base_facade import BaseFacade
 from mfes.acquisition_function.acquisition import EI
 from mfes.utils.util_funcs import minmax_normalization
 from mfes.config_space.util import expand_configurations
+from mfes.utils.run_history import RunHistory
 from mfes.optimizer.random_sampling import RandomSampling
 from mfes.model.rf_with_instances import RandomForestWithInstances
 from mfes.model.weighted_rf_ensemble import WeightedRandomForestCluster
@@ -43,13 +44,11 @@ class HOIST(BaseFacade):
         self.iterate_r = []
 
         # Store the multi-fidelity evaluation data: D_1, ..., D_K.
-        self.target_x = dict()
-        self.target_y = dict()
+        self.run_history = dict()
         for index, item in enumerate(np.logspace(0, self.s_max, self.s_max+1, base=self.eta)):
             r = int(item)
             self.iterate_r.append(r)
-            self.target_x[r] = []
-            self.target_y[r] = []
+            self.run_history[r] = RunHistory(self.config_space, start_time=self.global_start_time)
 
     @BaseFacade.process_manage
     def run(self):
@@ -103,8 +102,7 @@ class HOIST(BaseFacade):
                 val_losses = [item['loss'] for item in ret_val]
                 ref_list = [item['ref_id'] for item in ret_val]
 
-                self.target_x[int(n_iterations)].extend(T)
-                self.target_y[int(n_iterations)].extend(val_losses)
+                self.run_history[int(n_iterations)].add_batch(T, val_losses)
 
                 if int(n_iterations) == self.R:
                     self.incumbent_configs.extend(T)
@@ -131,15 +129,15 @@ class HOIST(BaseFacade):
             # Augment the intermediate evaluation data.
             for item in self.iterate_r[self.iterate_r.index(r):]:
                 # objective value normalization: min-max linear normalization
-                normalized_y = minmax_normalization(self.target_y[item])
-                self.weighted_surrogate.train(convert_configurations_to_array(self.target_x[item]),
+                normalized_y = minmax_normalization(self.run_history[item].perfs)
+                self.weighted_surrogate.train(self.run_history[item].X,
                                               np.array(normalized_y, dtype=np.float64), r=item)
             # Update the parameter in the ensemble model.
-            if len(self.target_y[self.iterate_r[-1]]) >= 2:
+            if len(self.run_history[self.iterate_r[-1]]) >= 2:
                 self.update_weight()
 
     def choose_next(self, num_config):
-        if len(self.target_y[self.iterate_r[-1]]) == 0:
+        if len(self.run_history[self.iterate_r[-1]]) == 0:
             return sample_configurations(self.config_space, num_config)
 
         conf_cnt = 0
@@ -148,8 +146,7 @@ class HOIST(BaseFacade):
 
         incumbent = dict()
         max_r = self.iterate_r[-1]
-        best_index = np.argmin(self.target_y[max_r])
-        incumbent['config'] = self.target_x[max_r][best_index]
+        incumbent['config'], _ = self.run_history[max_r].get_incumbent()
         approximate_obj = self.weighted_surrogate.predict(convert_configurations_to_array([incumbent['config']]))[0]
         incumbent['obj'] = approximate_obj
         self.weighted_acquisition_func.update(model=self.weighted_surrogate, eta=incumbent)
@@ -168,9 +165,8 @@ class HOIST(BaseFacade):
         max_r = self.iterate_r[-1]
         r_list = self.iterate_r
 
-        incumbent_configs = self.target_x[max_r]
-        test_x = convert_configurations_to_array(incumbent_configs)
-        test_y = minmax_normalization(self.target_y[max_r])
+        test_x = self.run_history[max_r].X
+        test_y = minmax_normalization(self.run_history[max_r].perfs)
 
         predictions = []
         for i, r in enumerate(r_list[:-1]):
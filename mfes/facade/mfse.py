@@ -12,7 +12,8 @@ from mfes.utils.util_funcs import minmax_normalization, std_normalization
 from mfes.config_space.util import expand_configurations
 from mfes.model.rf_with_instances import RandomForestWithInstances
 from mfes.model.weighted_rf_ensemble import WeightedRandomForestCluster
-from mfes.config_space import convert_configurations_to_array, sample_configurations
+from mfes.config_space import sample_configurations
+from mfes.utils.run_history import RunHistory
 
 from litebo.utils.history_container import HistoryContainer
 from litebo.model.rf_with_instances import RandomForestWithInstances
@@ -70,13 +71,11 @@ class MFSE(BaseFacade):
         self.hist_weights = list()
 
         # Saving evaluation statistics in Hyperband.
-        self.target_x = dict()
-        self.target_y = dict()
+        self.run_history = dict()
         for index, item in enumerate(np.logspace(0, self.s_max, self.s_max + 1, base=self.eta)):
             r = int(item)
             self.iterate_r.append(r)
-            self.target_x[r] = []
-            self.target_y[r] = []
+            self.run_history[r] = RunHistory(self.config_space, start_time=self.global_start_time)
 
         # BO optimizer settings.
         self.configs = list()
@@ -140,8 +139,7 @@ class MFSE(BaseFacade):
                 val_losses = [item['loss'] for item in ret_val]
                 ref_list = [item['ref_id'] for item in ret_val]
 
-                self.target_x[int(n_iterations)].extend(T)
-                self.target_y[int(n_iterations)].extend(val_losses)
+                self.run_history[int(n_iterations)].add_batch(T, val_losses)
 
                 if int(n_iterations) == self.R:
                     self.incumbent_configs.extend(T)
@@ -171,8 +169,8 @@ class MFSE(BaseFacade):
 
             for item in self.iterate_r[self.iterate_r.index(r):]:
                 # NORMALIZE Objective value: normalization
-                normalized_y = std_normalization(self.target_y[item])
-                self.weighted_surrogate.train(convert_configurations_to_array(self.target_x[item]),
+                normalized_y = std_normalization(self.run_history[item].perfs)
+                self.weighted_surrogate.train(self.run_history[item].X,
                                               np.array(normalized_y, dtype=np.float64), r=item)
 
     @BaseFacade.process_manage
@@ -195,7 +193,7 @@ class MFSE(BaseFacade):
 
     def get_bo_candidates(self, num_configs):
         incumbent = dict()
-        incumbent_value = np.min(std_normalization(self.target_y[self.iterate_r[-1]]))
+        incumbent_value = np.min(std_normalization(self.run_history[self.iterate_r[-1]].perfs))
         incumbent['config'] = self.history_container.get_incumbents()[0][1]
         incumbent['obj'] = incumbent_value
         print('Current inc', incumbent)
@@ -212,7 +210,7 @@ class MFSE(BaseFacade):
         return challengers.challengers[:num_configs]
 
     def choose_next_batch(self, num_config):
-        if len(self.target_y[self.iterate_r[-1]]) == 0:
+        if len(self.run_history[self.iterate_r[-1]]) == 0:
             configs = [self.config_space.sample_configuration()]
             configs.extend(sample_configurations(self.config_space, num_config - 1))
             self.configs.extend(configs)
@@ -272,9 +270,8 @@ class MFSE(BaseFacade):
 
     def update_weight(self):
         max_r = self.iterate_r[-1]
-        incumbent_configs = self.target_x[max_r]
-        test_x = convert_configurations_to_array(incumbent_configs)
-        test_y = np.array(self.target_y[max_r], dtype=np.float64)
+        test_x = self.run_history[max_r].X
+        test_y = self.run_history[max_r].perfs
 
         r_list = self.weighted_surrogate.surrogate_r
         K = len(r_list)
@@ -4,7 +4,6 @@ import pickle
 import numpy as np
 import xgboost as xgb
 from sklearn.metrics import accuracy_score
-from matplotlib import pyplot as plt
 from sklearn.model_selection import train_test_split
 from sklearn.svm import SVC
 
@@ -15,8 +14,7 @@ from mfes.acquisition_function.acquisition import EI
 from mfes.optimizer.random_sampling import RandomSampling
 from mfes.config_space import convert_configurations_to_array
 from mfes.config_space import ConfigurationSpace, sample_configurations
-
-plt.switch_backend('agg')
+from mfes.utils.lazy_import import get_pyplot
 
 
 class TSE(object):
@@ -311,6 +309,7 @@ class TSE(object):
 
             # Save the result.
             np.save(self.file_path, np.transpose(np.array(c)))
+            plt = get_pyplot()
             plt.plot(np.array(c)[:, 0], np.array(c)[:, 1])
             plt.xlabel('time_elapsed (s)')
             plt.ylabel('validation error')
@@ -0,0 +1,45 @@
+import importlib
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access.
+
+    Heavy frameworks (tensorflow, keras, xgboost, matplotlib) are only needed
+    once a trial actually trains or plots. Binding them through this proxy keeps
+    them out of the import path of the master process and freshly spawned
+    workers, while the module-level name can still be used as usual.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lock'] = threading.Lock()
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def get_pyplot():
+    """Import pyplot with the non-interactive backend on first plotting call."""
+    from matplotlib import pyplot as plt
+    plt.switch_backend('agg')
+    return plt
@@ -0,0 +1,107 @@
+import time
+import numpy as np
+from typing import List
+
+from mfes.config_space import Configuration, ConfigurationSpace
+from mfes.config_space.util import impute_default_values
+
+
+class RunHistory(object):
+    """Columnar run history for the evaluations on one resource level.
+
+    Configurations are stored as rows of an encoded float64 matrix (inactive
+    hyperparameters imputed with their default, as expected by the EPMs),
+    together with losses, costs and timestamps in NumPy arrays. The buffers
+    grow geometrically, so appending is amortized O(1) and the surrogate can
+    consume `X`/`perfs` as views without re-encoding the whole history.
+    `Configuration` objects are only rebuilt on access.
+    """
+
+    def __init__(self, config_space: ConfigurationSpace, initial_capacity=64, start_time=None):
+        self.config_space = config_space
+        self.start_time = time.time() if start_time is None else start_time
+        self.n_dims = len(config_space.get_hyperparameters())
+        self._size = 0
+        self._capacity = max(1, int(initial_capacity))
+        self._X = np.empty((self._capacity, self.n_dims), dtype=np.float64)
+        self._inactive = np.empty((self._capacity, self.n_dims), dtype=np.bool_)
+        self._perfs = np.empty(self._capacity, dtype=np.float64)
+        self._costs = np.empty(self._capacity, dtype=np.float64)
+        self._timestamps = np.empty(self._capacity, dtype=np.float64)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, idx):
+        return self.get_config(idx)
+
+    def _reserve(self, n_rows):
+        if n_rows <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < n_rows:
+            capacity *= 2
+        for name in ['_X', '_inactive', '_perfs', '_costs', '_timestamps']:
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+        self._capacity = capacity
+
+    def add(self, config: Configuration, perf, cost=0.):
+        self.add_batch([config], [perf], [cost])
+
+    def add_batch(self, configs: List[Configuration], perfs, costs=None):
+        n = len(configs)
+        if n == 0:
+            return
+        if len(perfs) != n:
+            raise ValueError('Got %d configurations but %d performances!' % (n, len(perfs)))
+        if costs is None:
+            costs = np.zeros(n)
+        self._reserve(self._size + n)
+        start, end = self._size, self._size + n
+
+        configs_array = np.array([config.get_array() for config in configs], dtype=np.float64)
+        self._inactive[start:end] = ~np.isfinite(configs_array)
+        self._X[start:end] = impute_default_values(self.config_space, configs_array)
+        self._perfs[start:end] = perfs
+        self._costs[start:end] = costs
+        self._timestamps[start:end] = time.time() - self.start_time
+        self._size = end
+
+    def get_config(self, idx) -> Configuration:
+        if idx < 0:
+            idx += self._size
+        if not 0 <= idx < self._size:
+            raise IndexError('History index %d out of range!' % idx)
+        vector = self._X[idx].copy()
+        vector[self._inactive[idx]] = np.nan
+        return Configuration(self.config_space, vector=vector)
+
+    @property
+    def configs(self) -> List[Configuration]:
+        return [self.get_config(idx) for idx in range(self._size)]
+
+    @property
+    def X(self) -> np.ndarray:
+        return self._X[:self._size]
+
+    @property
+    def perfs(self) -> np.ndarray:
+        return self._perfs[:self._size]
+
+    @property
+    def costs(self) -> np.ndarray:
+        return self._costs[:self._size]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[:self._size]
+
+    def get_incumbent(self):
+        """Return the (configuration, performance) pair with the lowest loss."""
+        if self._size == 0:
+            return None, None
+        best_index = int(np.argmin(self.perfs))
+        return self.get_config(best_index), self._perfs[best_index]
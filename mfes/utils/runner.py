@@ -4,8 +4,6 @@ import dill
 import os
 import numpy as np
 from concurrent.futures import ProcessPoolExecutor
-from matplotlib import pyplot as plt
-plt.switch_backend('agg')
 
 
 def evaluate_func(params):
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from ConfigSpace import ConfigurationSpace, EqualsCondition, CategoricalHyperparameter, \
+    UniformFloatHyperparameter, UniformIntegerHyperparameter
+
+from mfes.config_space import convert_configurations_to_array
+from mfes.utils.run_history import RunHistory
+
+
+def get_config_space():
+    cs = ConfigurationSpace(seed=1)
+    kernel = CategoricalHyperparameter('kernel', ['rbf', 'poly'], default_value='rbf')
+    c = UniformFloatHyperparameter('C', 0.03125, 32768, log=True, default_value=1.0)
+    degree = UniformIntegerHyperparameter('degree', 2, 5, default_value=3)
+    cs.add_hyperparameters([kernel, c, degree])
+    # Inactive for the rbf kernel, so that the history has to impute it.
+    cs.add_condition(EqualsCondition(degree, kernel, 'poly'))
+    return cs
+
+
+def test_matches_list_history():
+    cs = get_config_space()
+    configs = cs.sample_configuration(50)
+    perfs = np.random.RandomState(1).rand(50)
+
+    # A small capacity, so that the buffers grow several times.
+    history = RunHistory(cs, initial_capacity=2)
+    history.add(configs[0], perfs[0], cost=1.)
+    history.add_batch(configs[1:20], perfs[1:20])
+    for config, perf in zip(configs[20:], perfs[20:]):
+        history.add(config, perf)
+
+    assert len(history) == 50
+    np.testing.assert_array_equal(history.X, convert_configurations_to_array(configs))
+    np.testing.assert_array_equal(history.perfs, perfs)
+    assert history.costs[0] == 1.
+    assert np.all(history.costs[1:] == 0.)
+    assert np.all(np.diff(history.timestamps) >= 0)
+    assert history.configs == list(configs)
+    assert history[-1] == configs[-1]
+
+
+def test_incumbent():
+    cs = get_config_space()
+    history = RunHistory(cs)
+    assert history.get_incumbent() == (None, None)
+
+    configs = cs.sample_configuration(10)
+    perfs = np.random.RandomState(1).rand(10)
+    history.add_batch(configs, perfs)
+    config, perf = history.get_incumbent()
+    assert config == configs[int(np.argmin(perfs))]
+    assert perf == perfs.min()
+
+
+def test_invalid_input():
+    cs = get_config_space()
+    history = RunHistory(cs)
+    with pytest.raises(ValueError):
+        history.add_batch(cs.sample_configuration(3), [0.1, 0.2])
+    with pytest.raises(IndexError):
+        history.get_config(0)
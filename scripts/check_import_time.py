@@ -0,0 +1,53 @@
+"""
+Measure the cold import time of the modules every worker and CLI run pays for,
+and fail if any of them exceeds its budget.
+
+Usage: python scripts/check_import_time.py [--repeat 3] [--scale 1.0]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+# Budgets in seconds for a cold import in a fresh interpreter.
+IMPORT_BUDGETS = {
+    'mfes.facade.base_facade': 1.0,
+    'mfes.facade.mfse': 3.0,
+    'mfes.evaluate_function.eval_convnet_tf': 1.0,
+    'mfes.evaluate_function.eval_covtype': 2.0,
+    'solnml.components.models.classification': 1.5,
+    'solnml.estimators': 6.0,
+}
+
+_TIMER = "import time; _t = time.perf_counter(); import %s; print(time.perf_counter() - _t)"
+
+
+def measure(module_name, repeat):
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timings = list()
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', _TIMER % module_name], cwd=root_dir)
+        timings.append(float(output.decode().strip().split('\n')[-1]))
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier applied to every budget')
+    args = parser.parse_args()
+
+    violations = list()
+    for module_name, budget in IMPORT_BUDGETS.items():
+        budget *= args.scale
+        try:
+            elapsed = measure(module_name, args.repeat)
+        except subprocess.CalledProcessError:
+            print('%-50s import failed' % module_name)
+            violations.append(module_name)
+            continue
+        status = 'ok' if elapsed <= budget else 'OVER BUDGET'
+        print('%-50s %.3fs / %.3fs  %s' % (module_name, elapsed, budget, status))
+        if elapsed > budget:
+            violations.append(module_name)
+    sys.exit(1 if violations else 0)
@@ -9,8 +9,8 @@ from solnml.components.feature_engineering.transformation_graph import DataNode
 from solnml.components.models.regression import _regressors
 from solnml.components.models.classification import _classifiers
 from solnml.components.models.imbalanced_classification import _imb_classifiers
-from solnml.components.meta_learning.algorithm_recomendation.ranknet_advisor import RankNetAdvisor
 from solnml.bandits.first_layer_bandit import FirstLayerBandit
+from solnml.components.computation.batch_inference import batch_predict
 from solnml.utils.functions import is_unbalanced_dataset
 from solnml.components.feature_engineering.transformations.preprocessor.data_balancer import DataBalancer
 
@@ -35,7 +35,8 @@ class AutoML(object):
                  output_dir="logs",
                  logging_config=None,
                  random_state=1,
-                 n_jobs=1):
+                 n_jobs=1,
+                 fetcher_backend='thread'):
         self.metric_id = metric
         self.metric = get_metric(self.metric_id)
 
@@ -57,6 +58,8 @@ class AutoML(object):
         self.enable_fe = enable_fe
         self.task_type = task_type
         self.n_jobs = n_jobs
+        # 'process' fits the candidate members of the ensemble on a process pool.
+        self.fetcher_backend = fetcher_backend
         self.solver = None
 
         if include_algorithms is not None:
@@ -137,23 +140,44 @@ class AutoML(object):
                                        seed=self.seed,
                                        time_limit=self.time_limit,
                                        eval_type=self.evaluation_type,
-                                       output_dir=self.output_dir)
+                                       output_dir=self.output_dir,
+                                       fetcher_backend=self.fetcher_backend)
         self.solver.optimize()
 
     def refit(self):
         self.solver.refit()
 
-    def predict_proba(self, test_data: DataNode):
-        return self.solver.predict_proba(test_data)
+    def predict_proba(self, test_data: DataNode, batch_size=None, n_jobs=1, output_path=None):
+        if batch_size is None and output_path is None:
+            return self.solver.predict_proba(test_data)
+        return batch_predict(self.solver.predict_proba, test_data, batch_size, n_jobs=n_jobs,
+                             output_path=output_path)
 
-    def predict(self, test_data: DataNode):
-        return self.solver.predict(test_data)
+    def predict(self, test_data: DataNode, batch_size=None, n_jobs=1, output_path=None):
+        """
+        :param batch_size: if set, the test data is streamed through FE and the models in blocks of
+            batch_size rows, so peak memory depends on the block size instead of the test-set size.
+        :param n_jobs: number of blocks predicted concurrently.
+        :param output_path: if set, predictions are written block by block to this .npy file and
+            returned as a memmap.
+        """
+        if batch_size is None and output_path is None:
+            return self.solver.predict(test_data)
+        return batch_predict(self.solver.predict, test_data, batch_size, n_jobs=n_jobs,
+                             output_path=output_path)
 
     def score(self, test_data: DataNode, metric_func=None):
         if metric_func is None:
             metric_func = self.metric
         return metric_func(self, test_data, test_data.data[1])
 
+    def export_inference_artifact(self, path):
+        """
+        Save only what predict needs (fitted transformers and weighted base models) to a single file;
+        InferenceArtifact.load(path) memory-maps its arrays.
+        """
+        return self.solver.export_inference_artifact(path)
+
     def get_ens_model_info(self):
         if self.ensemble_method is not None:
             return self.solver.es.get_ens_model_info()
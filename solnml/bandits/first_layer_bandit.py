@@ -13,6 +13,10 @@ from solnml.utils.logging_utils import get_logger
 from solnml.components.utils.constants import CLS_TASKS
 from solnml.utils.combined_evaluator import fetch_ensemble_members
 from solnml.components.evaluators.cls_evaluator import ClassificationEvaluator
+from solnml.components.evaluators.evaluation_cache import EvaluationCache
+from solnml.components.evaluators.prediction_store import PredictionStore
+from solnml.components.computation.inference_artifact import InferenceArtifact
+from solnml.components.computation.parallel_predictor import ModelCache
 from solnml.components.fe_optimizers.ano_bo_optimizer import AnotherBayesianOptimizationOptimizer
 
 
@@ -31,11 +35,19 @@ class FirstLayerBandit(object):
                  enable_fe=True,
                  fe_algo='bo',
                  n_jobs=1,
-                 seed=1):
+                 seed=1,
+                 eval_cache_dir=None,
+                 prediction_dir=None,
+                 fetcher_backend='thread'):
         """
         :param classifier_ids: subset of {'adaboost','bernoulli_nb','decision_tree','extra_trees','gaussian_nb','gradient_boosting',
         'gradient_boosting','k_nearest_neighbors','lda','liblinear_svc','libsvm_svc','multinomial_nb','passive_aggressive','qda',
         'random_forest','sgd'}
+        :param eval_cache_dir: if set, evaluation results are memoized in this directory and reused
+        across arms, repeated runs and worker processes.
+        :param prediction_dir: if set, the validation predictions of evaluated trials are stored in this
+        directory and the ensemble reads them back instead of refitting its candidate members.
+        :param fetcher_backend: 'thread' or 'process', the pool on which the ensemble fits its candidate members.
         """
         self.timestamp = time.time()
         self.task_type = task_type
@@ -48,6 +60,7 @@ class FirstLayerBandit(object):
         self.alpha = 4
         self.seed = seed
         self.output_dir = output_dir
+        self.fetcher_backend = fetcher_backend
         # np.random.seed(self.seed)
 
         # Best configuration.
@@ -74,6 +87,10 @@ class FirstLayerBandit(object):
         self.enable_fe = enable_fe
         self.fe_algo = fe_algo
         self.inner_opt_algorithm = inner_opt_algorithm
+        self.eval_cache = EvaluationCache(eval_cache_dir) if eval_cache_dir is not None else None
+        self.prediction_store = PredictionStore(prediction_dir) if prediction_dir is not None else None
+        # The best model is unpickled once, not for every block that batch_predict streams through _predict.
+        self.model_cache = ModelCache()
 
         # Record the execution cost for each arm.
         if not (self.time_limit is None) ^ (self.trial_num is None):
@@ -98,6 +115,8 @@ class FirstLayerBandit(object):
                 n_jobs=self.n_jobs,
                 fe_algo=fe_algo,
                 mth=self.inner_opt_algorithm,
+                eval_cache=self.eval_cache,
+                prediction_store=self.prediction_store
             )
 
         self.action_sequence = list()
@@ -115,6 +134,8 @@ class FirstLayerBandit(object):
             self.optimize_equal_resource()
         else:
             raise ValueError('Unsupported optimization method: %s!' % self.inner_opt_algorithm)
+        for _arm in self.arms:
+            self.sub_bandits[_arm].gc()
 
         scores = list()
         for _arm in self.arms:
@@ -189,13 +210,18 @@ class FirstLayerBandit(object):
                                       ensemble_size=self.ensemble_size,
                                       task_type=self.task_type,
                                       metric=self.metric,
-                                      output_dir=self.output_dir)
+                                      output_dir=self.output_dir,
+                                      prediction_store=self.prediction_store,
+                                      fetcher_backend=self.fetcher_backend)
             self.es.fit(data=self.original_data)
 
     def refit(self):
         if self.ensemble_method is not None:
             self.es.refit()
 
+    def load_best_model(self):
+        return self.model_cache.load(os.path.join(self.output_dir, '%s-best_model' % self.timestamp))
+
     def _best_predict(self, test_data: DataNode):
         # Check the validity of feature engineering.
         if self.inner_opt_algorithm == 'combined':
@@ -207,8 +233,7 @@ class FirstLayerBandit(object):
         _train_data = fe_optimizer.apply(self.original_data, node, phase='train')
         # assert _train_data == self.best_data_node
         test_data_node = fe_optimizer.apply(test_data, node)
-        with open(os.path.join(self.output_dir, '%s-best_model' % self.timestamp), 'rb') as f:
-            estimator = pkl.load(f)
+        estimator = self.load_best_model()
         return estimator.predict(test_data_node.data[0])
 
     def _es_predict(self, test_data: DataNode):
@@ -242,8 +267,7 @@ class FirstLayerBandit(object):
                 fe_optimizer = self.fe_optimizer
                 node = self.best_data_node
             test_data_node = fe_optimizer.apply(test_data, node)
-            with open(os.path.join(self.output_dir, '%s-best_model' % self.timestamp), 'rb') as f:
-                estimator = pkl.load(f)
+            estimator = self.load_best_model()
             if self.task_type in CLS_TASKS:
                 return estimator.predict_proba(test_data_node.data[0])
             else:
@@ -268,6 +292,48 @@ class FirstLayerBandit(object):
         y_pred = self.predict(test_data)
         return metric_func(test_data.data[1], y_pred)
 
+    def export_inference_artifact(self, path):
+        """
+        Save the fitted transformers and models used by predict to a single file at path;
+        load it with InferenceArtifact.load to predict without the optimizers and the search history.
+        """
+        self._check_export_support()
+        if self.ensemble_method is not None:
+            if self.inner_opt_algorithm == 'combined':
+                args = self.tmp_bo
+            else:
+                args = self.sub_bandits
+            members = self.es.get_inference_members(args)
+        else:
+            if self.inner_opt_algorithm == 'combined':
+                fe_optimizer = self.tmp_bo
+                node = self.best_node
+            else:
+                fe_optimizer = self.fe_optimizer
+                node = self.best_data_node
+            estimator = self.load_best_model()
+            members = [(1., fe_optimizer.get_transformers(node), estimator)]
+        return InferenceArtifact(self.task_type, members).save(path)
+
+    def _check_export_support(self):
+        """Fail before any model is loaded if the solution cannot be exported."""
+        if self.ensemble_method is not None:
+            if self.es is None:
+                raise AttributeError("AutoML is not fitted!")
+            if self.ensemble_method not in ['ensemble_selection', 'bagging']:
+                raise ValueError('Exporting an inference artifact is not supported for the %s ensemble; '
+                                 'use ensemble_selection or bagging.' % self.ensemble_method)
+        if self.inner_opt_algorithm == 'combined':
+            return
+        if self.ensemble_method is not None:
+            fe_optimizers = [self.sub_bandits[_arm].optimizer['fe'] for _arm in self.arms]
+        else:
+            fe_optimizers = [self.fe_optimizer]
+        for fe_optimizer in fe_optimizers:
+            if not hasattr(fe_optimizer, 'node_dict'):
+                raise ValueError('Exporting an inference artifact is not supported for fe_algo=%s (%s); '
+                                 'use fe_algo=\'bo\'.' % (self.fe_algo, fe_optimizer.__class__.__name__))
+
     def optimize_explore_first(self):
         # Initialize the parameters.
         arm_num = len(self.arms)
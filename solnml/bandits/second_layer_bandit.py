@@ -1,3 +1,4 @@
+import os
 import copy
 import numpy as np
 from solnml.components.evaluators.cls_evaluator import ClassificationEvaluator
@@ -24,7 +25,9 @@ class SecondLayerBandit(object):
                  n_jobs=1, seed=1,
                  enable_fe=True, fe_algo='bo',
                  number_of_unit_resource=2,
-                 total_resource=30):
+                 total_resource=30,
+                 eval_cache=None,
+                 prediction_store=None):
         self.task_type = task_type
         self.metric = metric
         self.number_of_unit_resource = number_of_unit_resource
@@ -42,6 +45,8 @@ class SecondLayerBandit(object):
         self.mth = mth
         self.seed = seed
         self.sliding_window_size = sw_size
+        self.eval_cache = eval_cache
+        self.prediction_store = prediction_store
         task_id = '%s-%d-%s' % (dataset_id, seed, estimator_id)
         self.logger = get_logger(self.__class__.__name__ + '-' + task_id)
 
@@ -80,6 +85,7 @@ class SecondLayerBandit(object):
                 clf_class = _addons.components[estimator_id]
             else:
                 raise ValueError("Algorithm %s not supported!" % estimator_id)
+            estimator_class = clf_class
             cs = clf_class.get_hyperparameter_search_space()
             model = UnParametrizedHyperparameter("estimator", estimator_id)
             cs.add_hyperparameter(model)
@@ -91,6 +97,7 @@ class SecondLayerBandit(object):
                 reg_class = _addons.components[estimator_id]
             else:
                 raise ValueError("Algorithm %s not supported!" % estimator_id)
+            estimator_class = reg_class
             cs = reg_class.get_hyperparameter_search_space()
             model = UnParametrizedHyperparameter("estimator", estimator_id)
             cs.add_hyperparameter(model)
@@ -98,6 +105,11 @@ class SecondLayerBandit(object):
             raise ValueError("Unknown task type %s!" % self.task_type)
 
         self.config_space = cs
+        # Under multi-fidelity HPO the resource of an iterative estimator is its number of iterations:
+        # a promoted configuration continues training from the model saved at the previous rung.
+        self.continue_training = self.evaluation_type in ['partial', 'partial_bohb'] and \
+            hasattr(estimator_class, 'iterative_fit')
+        self.model_dir = os.path.join(self.output_dir, 'models')
         self.default_config = cs.get_default_configuration()
         self.config_space.seed(self.seed)
 
@@ -105,19 +117,25 @@ class SecondLayerBandit(object):
         if self.task_type in CLS_TASKS:
             fe_evaluator = ClassificationEvaluator(self.default_config, scorer=self.metric,
                                                    name='fe', resampling_strategy=self.evaluation_type,
-                                                   seed=self.seed)
+                                                   seed=self.seed, eval_cache=self.eval_cache,
+                                                   n_jobs=self.n_jobs, prediction_store=self.prediction_store)
             hpo_evaluator = ClassificationEvaluator(self.default_config, scorer=self.metric,
                                                     data_node=self.original_data, name='hpo',
                                                     resampling_strategy=self.evaluation_type,
-                                                    seed=self.seed)
+                                                    seed=self.seed, eval_cache=self.eval_cache,
+                                                    n_jobs=self.n_jobs, continue_training=self.continue_training,
+                                                    model_dir=self.model_dir, prediction_store=self.prediction_store)
         elif self.task_type in REG_TASKS:
             fe_evaluator = RegressionEvaluator(self.default_config, scorer=self.metric,
                                                name='fe', resampling_strategy=self.evaluation_type,
-                                               seed=self.seed)
+                                               seed=self.seed, n_jobs=self.n_jobs,
+                                               prediction_store=self.prediction_store)
             hpo_evaluator = RegressionEvaluator(self.default_config, scorer=self.metric,
                                                 data_node=self.original_data, name='hpo',
                                                 resampling_strategy=self.evaluation_type,
-                                                seed=self.seed)
+                                                seed=self.seed, n_jobs=self.n_jobs,
+                                                continue_training=self.continue_training,
+                                                model_dir=self.model_dir, prediction_store=self.prediction_store)
         else:
             raise ValueError('Invalid task type!')
 
@@ -318,12 +336,14 @@ class SecondLayerBandit(object):
                     _perf = ClassificationEvaluator(
                         self.local_inc['hpo'], data_node=self.local_inc['fe'], scorer=self.metric,
                         name='fe', resampling_strategy=self.evaluation_type,
-                        seed=self.seed)(self.local_inc['hpo'])
+                        seed=self.seed, eval_cache=self.eval_cache,
+                        n_jobs=self.n_jobs, prediction_store=self.prediction_store)(self.local_inc['hpo'])
                 else:
                     _perf = RegressionEvaluator(
                         self.local_inc['hpo'], data_node=self.local_inc['fe'], scorer=self.metric,
                         name='fe', resampling_strategy=self.evaluation_type,
-                        seed=self.seed)(self.local_inc['hpo'])
+                        seed=self.seed, n_jobs=self.n_jobs,
+                        prediction_store=self.prediction_store)(self.local_inc['hpo'])
         except Exception as e:
             self.logger.error(str(e))
         # Update INC.
@@ -354,8 +374,17 @@ class SecondLayerBandit(object):
         self.final_rewards.append(self.incumbent_perf)
         return self.incumbent_perf
 
+    def gc(self):
+        """Release the worker pools of the optimizers once this bandit is done."""
+        optimizers = self.optimizer.values() if isinstance(self.optimizer, dict) else [self.optimizer]
+        for optimizer in optimizers:
+            optimizer.gc()
+
     def prepare_optimizer(self, _arm):
         trials_per_iter = self.one_unit_of_resource * self.number_of_unit_resource
+        if _arm in self.optimizer:
+            # The replaced optimizer does not evaluate anything anymore.
+            self.optimizer[_arm].gc()
         if _arm == 'fe':
             # Build the Feature Engineering component.
             self.original_data._node_id = -1
@@ -363,11 +392,13 @@ class SecondLayerBandit(object):
             if self.task_type in CLS_TASKS:
                 fe_evaluator = ClassificationEvaluator(inc_hpo, scorer=self.metric,
                                                        name='fe', resampling_strategy=self.evaluation_type,
-                                                       seed=self.seed)
+                                                       seed=self.seed, eval_cache=self.eval_cache,
+                                                       n_jobs=self.n_jobs, prediction_store=self.prediction_store)
             elif self.task_type in REG_TASKS:
                 fe_evaluator = RegressionEvaluator(inc_hpo, scorer=self.metric,
                                                    name='fe', resampling_strategy=self.evaluation_type,
-                                                   seed=self.seed)
+                                                   seed=self.seed, n_jobs=self.n_jobs,
+                                                   prediction_store=self.prediction_store)
             else:
                 raise ValueError('Invalid task type!')
             self.optimizer[_arm] = build_fe_optimizer(self.fe_algo, self.evaluation_type,
@@ -384,12 +415,18 @@ class SecondLayerBandit(object):
                 hpo_evaluator = ClassificationEvaluator(self.default_config, scorer=self.metric,
                                                         data_node=self.inc['fe'].copy_(), name='hpo',
                                                         resampling_strategy=self.evaluation_type,
-                                                        seed=self.seed)
+                                                        seed=self.seed, eval_cache=self.eval_cache,
+                                                        n_jobs=self.n_jobs, continue_training=self.continue_training,
+                                                        model_dir=self.model_dir,
+                                                        prediction_store=self.prediction_store)
             elif self.task_type in REG_TASKS:
                 hpo_evaluator = RegressionEvaluator(self.default_config, scorer=self.metric,
                                                     data_node=self.inc['fe'].copy_(), name='hpo',
                                                     resampling_strategy=self.evaluation_type,
-                                                    seed=self.seed)
+                                                    seed=self.seed, n_jobs=self.n_jobs,
+                                                    continue_training=self.continue_training,
+                                                    model_dir=self.model_dir,
+                                                    prediction_store=self.prediction_store)
             else:
                 raise ValueError('Invalid task type!')
 
@@ -4,10 +4,13 @@ import traceback
 import numpy as np
 import pandas as pd
 
+from typing import TYPE_CHECKING
 from solnml.automl import AutoML
-from solnml.autodl import AutoDL
 from solnml.components.feature_engineering.transformation_graph import DataNode
-from solnml.datasets.base_dl_dataset import DLDataset
+
+if TYPE_CHECKING:
+    # The deep-learning stack (torch) is only imported once a DL estimator is used.
+    from solnml.datasets.base_dl_dataset import DLDataset
 
 
 class BaseEstimator(object):
@@ -26,7 +29,8 @@ class BaseEstimator(object):
             random_state=1,
             n_jobs=1,
             evaluation='holdout',
-            output_dir="/tmp/"):
+            output_dir="/tmp/",
+            fetcher_backend='thread'):
         self.dataset_name = dataset_name
         self.metric = metric
         self.task_type = None
@@ -42,6 +46,7 @@ class BaseEstimator(object):
         self.n_jobs = n_jobs
         self.evaluation = evaluation
         self.output_dir = output_dir
+        self.fetcher_backend = fetcher_backend
         self._ml_engine = None
         # Create output directory.
         if not os.path.exists(output_dir):
@@ -64,7 +69,8 @@ class BaseEstimator(object):
             random_state=self.random_state,
             n_jobs=self.n_jobs,
             evaluation=self.evaluation,
-            output_dir=self.output_dir
+            output_dir=self.output_dir,
+            fetcher_backend=self.fetcher_backend
         )
         return engine
 
@@ -74,8 +80,8 @@ class BaseEstimator(object):
         self._ml_engine.fit(data, **kwargs)
         return self
 
-    def predict(self, X: DataNode, batch_size=None, n_jobs=1):
-        return self._ml_engine.predict(X)
+    def predict(self, X: DataNode, batch_size=None, n_jobs=1, output_path=None):
+        return self._ml_engine.predict(X, batch_size=batch_size, n_jobs=n_jobs, output_path=output_path)
 
     def score(self, data: DataNode):
         return self._ml_engine.score(data)
@@ -83,8 +89,8 @@ class BaseEstimator(object):
     def refit(self):
         return self._ml_engine.refit()
 
-    def predict_proba(self, X: DataNode, batch_size=None, n_jobs=1):
-        return self._ml_engine.predict_proba(X)
+    def predict_proba(self, X: DataNode, batch_size=None, n_jobs=1, output_path=None):
+        return self._ml_engine.predict_proba(X, batch_size=batch_size, n_jobs=n_jobs, output_path=output_path)
 
     def get_automl(self):
         return AutoML
@@ -178,6 +184,9 @@ class BaseEstimator(object):
     def get_ens_model_info(self):
         return self._ml_engine.get_ens_model_info()
 
+    def export_inference_artifact(self, path):
+        return self._ml_engine.export_inference_artifact(path)
+
 
 class BaseDLEstimator(object):
     def __init__(
@@ -234,7 +243,8 @@ class BaseDLEstimator(object):
         )
         return engine
 
-    def fit(self, data: DLDataset, **kwargs):
+    def fit(self, data: 'DLDataset', **kwargs):
+        from solnml.datasets.base_dl_dataset import DLDataset
         try:
             assert data is not None and isinstance(data, DLDataset)
             self._ml_engine = self.build_engine()
@@ -246,20 +256,21 @@ class BaseDLEstimator(object):
             print("-" * 60)
         return self
 
-    def predict(self, X: DLDataset, mode='test', batch_size=1, n_jobs=1):
+    def predict(self, X: 'DLDataset', mode='test', batch_size=1, n_jobs=1):
         return self._ml_engine.predict(X, mode=mode, batch_size=batch_size, n_jobs=n_jobs)
 
-    def score(self, data: DLDataset, mode='test'):
+    def score(self, data: 'DLDataset', mode='test'):
         return self._ml_engine.score(data, mode=mode)
 
-    def refit(self, data: DLDataset):
+    def refit(self, data: 'DLDataset'):
         return self._ml_engine.refit(data)
 
-    def predict_proba(self, X: DLDataset, mode='test', batch_size=1, n_jobs=1):
+    def predict_proba(self, X: 'DLDataset', mode='test', batch_size=1, n_jobs=1):
         return self._ml_engine.predict_proba(X, mode=mode, batch_size=batch_size, n_jobs=n_jobs)
 
     def get_runtime_history(self):
         return self._ml_engine._get_runtime_info()
 
     def get_automl(self):
+        from solnml.autodl import AutoDL
         return AutoDL
@@ -21,3 +21,7 @@ class ProcessPool(multiprocessing.pool.Pool):
     def __init__(self, *args, **kwargs):
         kwargs['context'] = NoDaemonContext()
         super(ProcessPool, self).__init__(*args, **kwargs)
+
+    def get_workers(self):
+        """The current worker processes; the pool silently replaces the ones that exit."""
+        return list(self._pool)
@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+
+from solnml.components.feature_engineering.transformation_graph import DataNode
+
+
+def get_row_batch(data_node: DataNode, start, end):
+    """A node holding rows [start, end) of data_node; the rows are views where the container allows it."""
+    X, y = data_node.data[:2]
+    X_batch = X.iloc[start:end] if hasattr(X, 'iloc') else X[start:end]
+    y_batch = None
+    if y is not None:
+        y_batch = y.iloc[start:end] if hasattr(y, 'iloc') else y[start:end]
+    batch_node = DataNode([X_batch, y_batch], data_node.feature_types.copy(), data_node.task_type)
+    batch_node.enable_balance = data_node.enable_balance
+    batch_node.data_balance = data_node.data_balance
+    return batch_node
+
+
+def batch_predict(predict_func, data_node: DataNode, batch_size, n_jobs=1, output_path=None):
+    """
+    Stream data_node through predict_func in blocks of batch_size rows.
+
+    The FE pipeline and the models then only hold the intermediate copies of one
+    block (n_jobs blocks when predicting blocks concurrently), and every block is
+    written to the output as soon as it is predicted.
+
+    :param predict_func: maps a DataNode to an array with one prediction per row.
+    :param output_path: if set, the predictions are written to a .npy file at this path,
+        and a read/write memmap of it is returned instead of an in-memory array.
+    """
+    n_samples = data_node.shape[0]
+    batch_size = n_samples if batch_size is None else max(1, int(batch_size))
+    starts = list(range(0, n_samples, batch_size))
+    if len(starts) == 0:
+        raise ValueError('Cannot predict on an empty dataset!')
+
+    # The first block runs alone: it fixes the output shape and loads models and caches once.
+    first_pred = np.asarray(predict_func(get_row_batch(data_node, 0, min(batch_size, n_samples))))
+    shape = (n_samples,) + first_pred.shape[1:]
+    if output_path is not None:
+        output = np.lib.format.open_memmap(output_path, mode='w+', dtype=first_pred.dtype, shape=shape)
+    else:
+        output = np.empty(shape, dtype=first_pred.dtype)
+    output[:len(first_pred)] = first_pred
+
+    def predict_batch(start):
+        end = min(start + batch_size, n_samples)
+        return start, end, predict_func(get_row_batch(data_node, start, end))
+
+    if n_jobs == 1:
+        for start in starts[1:]:
+            start, end, pred = predict_batch(start)
+            output[start:end] = pred
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            pending = set()
+            for start in starts[1:]:
+                pending.add(pool.submit(predict_batch, start))
+                # Keep at most n_jobs blocks in flight, so memory does not grow with the test set.
+                if len(pending) >= n_jobs:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        start, end, pred = future.result()
+                        output[start:end] = pred
+            for future in pending:
+                start, end, pred = future.result()
+                output[start:end] = pred
+
+    if output_path is not None:
+        output.flush()
+    return output
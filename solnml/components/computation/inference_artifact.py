@@ -0,0 +1,92 @@
+import numpy as np
+
+from solnml.utils.file_utils import atomic_dump
+from solnml.components.utils.constants import CLS_TASKS
+from solnml.components.feature_engineering.transformation_graph import DataNode
+
+
+class InferenceArtifact(object):
+    """
+    The part of a fitted solution needed to predict: the fitted FE transformers and the
+    weighted base models, without the optimizers, their node history or the ensemble stats.
+
+    It is saved as a single uncompressed joblib file. Loading it with mmap_mode memory-maps
+    the numpy arrays held as attributes by the transformers and the models (e.g., the
+    coefficients of linear models) instead of reading them into memory. Fitted sklearn trees
+    are the exception: Tree.__setstate__ copies its node arrays, so tree-based models are
+    read into memory whatever the mmap_mode.
+    """
+
+    def __init__(self, task_type, members):
+        """
+        :param members: list of (weight, fitted transformers in the order they are applied, estimator).
+        """
+        if len(members) == 0:
+            raise ValueError('An inference artifact needs at least one model!')
+        self.task_type = task_type
+        weights = np.asarray([member[0] for member in members], dtype=np.float64)
+        self.weights = weights / weights.sum()
+        # Members built from the same fitted transformers keep pointing at one copy of them.
+        self.pipelines = list()
+        pipeline_ids = dict()
+        self.members = list()
+        for weight, trans_list, estimator in members:
+            key = tuple(id(tran) for tran in trans_list)
+            if key not in pipeline_ids:
+                pipeline_ids[key] = len(self.pipelines)
+                self.pipelines.append(list(trans_list))
+            self.members.append((pipeline_ids[key], estimator))
+
+    def transform(self, data_node: DataNode, pipeline_id, transform_cache=None):
+        input_node = data_node.copy_()
+        trans_key = tuple()
+        for tran in self.pipelines[pipeline_id]:
+            trans_key += (id(tran),)
+            if transform_cache is not None and trans_key in transform_cache:
+                input_node = transform_cache[trans_key].copy_()
+                continue
+            input_node = tran.operate(input_node)
+            if transform_cache is not None:
+                transform_cache[trans_key] = input_node.copy_()
+        return input_node
+
+    def _predict(self, data_node: DataNode):
+        # Pipelines sharing a fitted prefix share the transformed data.
+        transform_cache = dict()
+        pred = None
+        for weight, (pipeline_id, estimator) in zip(self.weights, self.members):
+            X = self.transform(data_node, pipeline_id, transform_cache=transform_cache).data[0]
+            if self.task_type in CLS_TASKS:
+                member_pred = estimator.predict_proba(X)
+            else:
+                member_pred = estimator.predict(X)
+            pred = weight * member_pred if pred is None else pred + weight * member_pred
+        return pred
+
+    def predict_proba(self, data_node: DataNode):
+        if self.task_type not in CLS_TASKS:
+            raise AttributeError("predict_proba is not supported in regression")
+        return self._predict(data_node)
+
+    def predict(self, data_node: DataNode):
+        pred = self._predict(data_node)
+        if self.task_type in CLS_TASKS:
+            return np.argmax(pred, axis=-1)
+        return pred
+
+    def save(self, path):
+        """
+        Dump the artifact to path. The file is written without compression on purpose:
+        joblib can only memory-map the arrays of an uncompressed file, so load(mmap_mode=...)
+        would silently read everything into memory otherwise.
+        """
+        import joblib
+        return atomic_dump(self, path, dump_func=lambda artifact, f: joblib.dump(artifact, f, compress=0))
+
+    @staticmethod
+    def load(path, mmap_mode='r'):
+        import joblib
+        artifact = joblib.load(path, mmap_mode=mmap_mode)
+        if not isinstance(artifact, InferenceArtifact):
+            raise ValueError('%s is not an inference artifact!' % path)
+        return artifact
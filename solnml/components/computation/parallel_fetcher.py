@@ -1,37 +1,130 @@
+import os
 import time
-from concurrent.futures import ThreadPoolExecutor
+import shutil
+import tempfile
+import pickle as pkl
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 from solnml.components.evaluators.base_evaluator import fetch_predict_estimator
 
 
-def execute_func(params):
-    estimator = fetch_predict_estimator(*params)
+def _take_rows(X, y, train_index):
+    if train_index is None:
+        return X, y
+    return X[train_index], y[train_index]
+
+
+def execute_func(params, train_index=None):
+    task_type, config, X_train, y_train = params[:4]
+    X_train, y_train = _take_rows(X_train, y_train, train_index)
+    estimator = fetch_predict_estimator(task_type, config, X_train, y_train, *params[4:])
     return estimator
 
 
+def execute_func_in_process(params, data_paths, model_path, train_index=None):
+    import joblib
+    # Copy-on-write maps: the workers share the pages of the training data until an estimator writes to it.
+    X_train, y_train = [joblib.load(path, mmap_mode='c') for path in data_paths]
+    X_train, y_train = _take_rows(X_train, y_train, train_index)
+    task_type, config = params[:2]
+    estimator = fetch_predict_estimator(task_type, config, X_train, y_train, *params[2:])
+    # The model goes through the file store instead of the result pipe of the pool.
+    with open(model_path, 'wb') as f:
+        pkl.dump(estimator, f)
+    return model_path
+
+
 class ParallelFetcher(object):
-    def __init__(self, n_worker=1):
+    """
+    Fit estimators concurrently with fetch_predict_estimator.
+
+    backend='thread' runs the fits on a thread pool. backend='process' runs them on a process
+    pool, which scales for estimators that hold the GIL: the training arrays of a batch are
+    dumped once to a temporary directory and memory-mapped by the workers, and the fitted
+    models are written to the same directory and read back by wait_tasks_finish.
+    Arrays are recognized by identity, so callers that fit several models on subsets of
+    the same data pass the full arrays with train_index instead of slicing them.
+    """
+
+    def __init__(self, n_worker=1, backend='thread'):
+        if backend not in ['thread', 'process']:
+            raise ValueError('Unsupported backend: %s!' % backend)
         self.n_worker = n_worker
-        self.thread_pool = ThreadPoolExecutor(max_workers=n_worker)
+        self.backend = backend
+        if backend == 'thread':
+            self.pool = ThreadPoolExecutor(max_workers=n_worker)
+        else:
+            self.pool = ProcessPoolExecutor(max_workers=n_worker)
         self.execution_stats = list()
         self.estimators = list()
+        self.store_dir = None
+        # Arrays dumped in the current batch; they are kept referenced so that their ids stay unique.
+        self._dumped_arrays = dict()
+
+    def _get_store_dir(self):
+        if self.store_dir is None:
+            self.store_dir = tempfile.mkdtemp(prefix='solnml-fetcher-')
+        return self.store_dir
+
+    def _dump_array(self, array):
+        import joblib
+        if id(array) not in self._dumped_arrays:
+            path = os.path.join(self._get_store_dir(), 'data%d.pkl' % len(self._dumped_arrays))
+            joblib.dump(array, path)
+            self._dumped_arrays[id(array)] = (array, path)
+        return self._dumped_arrays[id(array)][1]
 
     def wait_tasks_finish(self):
-        all_completed = False
-        while not all_completed:
-            all_completed = True
+        try:
+            all_completed = False
+            while not all_completed:
+                all_completed = True
+                for trial in self.execution_stats:
+                    if not trial.done():
+                        all_completed = False
+                        time.sleep(0.1)
+                        break
+            estimators = list()
             for trial in self.execution_stats:
-                if not trial.done():
-                    all_completed = False
-                    time.sleep(0.1)
-                    break
-        for trial in self.execution_stats:
-            assert (trial.done())
-            estimator = trial.result()
-            self.estimators.append(estimator)
-        return self.estimators
-
-    def submit(self, task_type, config, X_train, y_train, weight_balance, data_balance, combined=False):
-        self.execution_stats.append(self.thread_pool.submit(execute_func,
-                                                            (task_type, config, X_train, y_train, weight_balance,
-                                                             data_balance, combined)))
+                assert (trial.done())
+                if self.backend == 'thread':
+                    estimators.append(trial.result())
+                else:
+                    model_path = trial.result()
+                    with open(model_path, 'rb') as f:
+                        estimators.append(pkl.load(f))
+        finally:
+            # Start a new batch, so that the fetcher can be reused, also after a failed fit.
+            self.execution_stats = list()
+            self._clear_store()
+        self.estimators.extend(estimators)
+        return estimators
+
+    def submit(self, task_type, config, X_train, y_train, weight_balance, data_balance, combined=False,
+               train_index=None):
+        """
+        Fit a model on (X_train, y_train), or on their rows in train_index if it is given.
+        """
+        if self.backend == 'thread':
+            self.execution_stats.append(self.pool.submit(execute_func,
+                                                         (task_type, config, X_train, y_train, weight_balance,
+                                                          data_balance, combined), train_index))
+            return
+        data_paths = [self._dump_array(X_train), self._dump_array(y_train)]
+        model_path = os.path.join(self._get_store_dir(), 'model%d.pkl' % len(self.execution_stats))
+        self.execution_stats.append(self.pool.submit(execute_func_in_process,
+                                                     (task_type, config, weight_balance, data_balance, combined),
+                                                     data_paths, model_path, train_index))
+
+    def _clear_store(self):
+        self._dumped_arrays = dict()
+        if self.store_dir is not None:
+            shutil.rmtree(self.store_dir, ignore_errors=True)
+            self.store_dir = None
+
+    def __del__(self):
+        try:
+            self.pool.shutdown(wait=False)
+            self._clear_store()
+        except Exception:
+            pass
@@ -0,0 +1,68 @@
+import os
+import pickle as pkl
+from concurrent.futures import ThreadPoolExecutor
+
+from solnml.components.utils.constants import CLS_TASKS
+
+
+class ModelCache(object):
+    """
+    Keep unpickled models in memory so that repeated predictions do not reload
+    them from disk. An entry is reloaded when its file is rewritten (e.g., by refit).
+
+    With mmap_mode set, models are loaded with joblib, and the numpy arrays of
+    models dumped by joblib are memory-mapped instead of read into memory.
+    """
+
+    def __init__(self, mmap_mode=None):
+        self.mmap_mode = mmap_mode
+        self._models = dict()
+
+    def load(self, path):
+        mtime = os.path.getmtime(path)
+        if path in self._models and self._models[path][0] == mtime:
+            return self._models[path][1]
+        if self.mmap_mode is not None:
+            import joblib
+            model = joblib.load(path, mmap_mode=self.mmap_mode)
+        else:
+            with open(path, 'rb') as f:
+                model = pkl.load(f)
+        self._models[path] = (mtime, model)
+        return model
+
+    def clear(self):
+        self._models.clear()
+
+    def __contains__(self, path):
+        return path in self._models
+
+    def __len__(self):
+        return len(self._models)
+
+    def __getstate__(self):
+        # Loaded models are not pickled along with their owner.
+        state = self.__dict__.copy()
+        state['_models'] = dict()
+        return state
+
+
+def _predict(estimator, X, task_type):
+    if task_type in CLS_TASKS:
+        return estimator.predict_proba(X)
+    return estimator.predict(X)
+
+
+def predict_in_parallel(estimators, X_list, task_type, n_jobs=1):
+    """
+    Predict X_list[i] with estimators[i] for every i, running up to n_jobs predictions at once.
+
+    Threads are used so that models and data are shared instead of copied; most
+    estimators release the GIL in their prediction routines.
+    """
+    n_jobs = max(1, min(n_jobs, len(estimators), os.cpu_count() or 1))
+    if n_jobs == 1:
+        return [_predict(estimator, X, task_type) for estimator, X in zip(estimators, X_list)]
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [pool.submit(_predict, estimator, X, task_type) for estimator, X in zip(estimators, X_list)]
+        return [future.result() for future in futures]
@@ -1,12 +1,28 @@
 import time
 import numpy as np
+import multiprocessing
 from ConfigSpace import Configuration
-from multiprocessing import Manager
 from .base.nondaemonic_processpool import ProcessPool
 
+# Evaluator and lock of a pool worker, set once by the pool initializer.
+_worker_evaluator = None
+_worker_rw_lock = None
 
-def execute_func(evaluator, config, resource_ratio, eta, first_iter, rw_lock):
+
+def init_worker(evaluator, rw_lock):
+    global _worker_evaluator, _worker_rw_lock
+    _worker_evaluator = evaluator
+    _worker_rw_lock = rw_lock
+
+
+def execute_func(evaluator, config, resource_ratio, eta, first_iter, rw_lock, topk_threshold=None):
     start_time = time.time()
+    if evaluator is None:
+        evaluator, rw_lock = _worker_evaluator, _worker_rw_lock
+    # Models saved for the top-k of a DL evaluator are ranked by the master (see TopKModelSaver).
+    topk_saver = getattr(evaluator, 'topk_model_saver', None)
+    if topk_saver is not None and topk_threshold is not None:
+        topk_saver.set_threshold(topk_threshold)
     try:
         if isinstance(config, Configuration):
             score = evaluator(config, name='hpo', resource_ratio=resource_ratio, eta=eta, first_iter=first_iter,
@@ -19,43 +35,120 @@ def execute_func(evaluator, config, resource_ratio, eta, first_iter, rw_lock):
         score = np.inf
 
     time_taken = time.time() - start_time
-    return score, time_taken
+    topk_candidates = topk_saver.pop_candidates() if topk_saver is not None else list()
+    return score, time_taken, topk_candidates
 
 
 class ParallelProcessEvaluator(object):
-    def __init__(self, evaluator, n_worker=1):
-        self.evaluator = evaluator
+    """
+    Evaluate configurations in a pool of worker processes.
+
+    The pool is started on first use and kept alive across calls, so an optimizer
+    can hold one executor for all of its brackets. The evaluator (and the data it
+    carries) is handed to the workers once through the pool initializer instead of
+    being pickled with every task; the pool is only restarted when the evaluator
+    changes or a worker dies. Callers that modify the evaluator after the pool has
+    started must hand it to `update_evaluator`, which bumps the evaluator version.
+    The owner of the executor is expected to call `shutdown` when it is done.
+    """
+
+    def __init__(self, evaluator, n_worker=1, health_check_interval=1.):
         self.n_worker = n_worker
+        self.health_check_interval = health_check_interval
+        self.evaluator = None
+        self.evaluator_version = 0
         self.process_pool = None
-        self.rwlock = Manager().Lock()
+        self.rwlock = multiprocessing.Lock()
+        self._pool_version = None
+        self._workers = list()
+        self.update_evaluator(evaluator)
 
     def update_evaluator(self, evaluator):
         self.evaluator = evaluator
+        self.evaluator_version += 1
+        # Let fold-level parallelism inside a trial know how many trials share the CPUs.
+        if hasattr(self.evaluator, 'n_concurrent_trials'):
+            self.evaluator.n_concurrent_trials = self.n_worker
 
-    def parallel_execute(self, param_list, resource_ratio=1., eta=3, first_iter=False):
-        evaluation_result = list()
-        apply_results = list()
+    def start(self):
+        self.shutdown()
+        self._pool_version = self.evaluator_version
+        self.process_pool = ProcessPool(processes=self.n_worker, initializer=init_worker,
+                                        initargs=(self.evaluator, self.rwlock))
+        self._workers = self.process_pool.get_workers()
 
-        for _param in param_list:
-            apply_results.append(self.process_pool.apply_async(execute_func,
-                                                               (self.evaluator, _param, resource_ratio, eta,
-                                                                first_iter, self.rwlock)))
-        for res in apply_results:
-            res.wait()
-            perf = res.get()[0]
-            evaluation_result.append(perf)
+    def shutdown(self):
+        if self.process_pool is not None:
+            self.process_pool.terminate()
+            self.process_pool.join()
+            self.process_pool = None
 
-            # return_dict=res.get()[0]
-            # evaluation_result.append(return_dict)
+    def is_healthy(self):
+        if self.process_pool is None:
+            return False
+        # The pool replaces dead workers silently, and the tasks they were running never finish.
+        workers = self.process_pool.get_workers()
+        return all(process.is_alive() for process in workers) and \
+            [process.pid for process in workers] == [process.pid for process in self._workers]
 
+    def _prepare_pool(self):
+        if self.process_pool is None or not self.is_healthy() or self._pool_version != self.evaluator_version:
+            # Either a worker died or the workers hold a stale copy of the evaluator.
+            self.start()
+
+    def parallel_execute(self, param_list, resource_ratio=1., eta=3, first_iter=False):
+        self._prepare_pool()
+        evaluation_result = [np.inf] * len(param_list)
+        pending = list(range(len(param_list)))
+        topk_saver = getattr(self.evaluator, 'topk_model_saver', None)
+
+        # Tasks lost with a dead worker are re-submitted once to a fresh pool.
+        for _ in range(2):
+            apply_results = dict()
+            topk_threshold = topk_saver.get_threshold() if topk_saver is not None else None
+            for idx in pending:
+                apply_results[idx] = self.process_pool.apply_async(execute_func,
+                                                                   (None, param_list[idx], resource_ratio, eta,
+                                                                    first_iter, None, topk_threshold))
+            worker_lost = False
+            for idx, res in apply_results.items():
+                while not res.ready() and not worker_lost:
+                    res.wait(self.health_check_interval)
+                    worker_lost = not res.ready() and not self.is_healthy()
+                if res.ready():
+                    evaluation_result[idx], _, topk_candidates = res.get()
+                    if topk_saver is not None:
+                        topk_saver.add_candidates(topk_candidates)
+
+            pending = [idx for idx, res in apply_results.items() if not res.ready()]
+            if len(pending) == 0:
+                break
+            self.start()
         return evaluation_result
 
-    # def shutdown(self):
-    #     self.process_pool.close()
+    def __getstate__(self):
+        # The pool and the lock belong to this process; a pickled executor starts without them.
+        state = self.__dict__.copy()
+        for name in ['evaluator', 'process_pool', 'rwlock']:
+            state[name] = None
+        state['_workers'] = list()
+        state['_pool_version'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.rwlock = multiprocessing.Lock()
 
     def __enter__(self):
-        self.process_pool = ProcessPool(processes=self.n_worker)
+        if self.process_pool is None:
+            self.start()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.process_pool.close()
+        self.shutdown()
+
+    def __del__(self):
+        try:
+            self.shutdown()
+        except Exception:
+            pass
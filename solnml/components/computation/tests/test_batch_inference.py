@@ -0,0 +1,92 @@
+import os
+import numpy as np
+import pickle as pkl
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from solnml.components.utils.constants import NUMERICAL, MULTICLASS_CLS
+from solnml.components.feature_engineering.transformation_graph import DataNode
+from solnml.components.computation import parallel_predictor
+from solnml.components.computation.batch_inference import batch_predict
+from solnml.components.computation.parallel_predictor import ModelCache
+from solnml.bandits.first_layer_bandit import FirstLayerBandit
+
+
+def get_node(n_rows=50, seed=1):
+    rng = np.random.RandomState(seed)
+    X = rng.rand(n_rows, 4)
+    y = (X[:, 0] + X[:, 1] > 1).astype(int) + (X[:, 2] > 0.5).astype(int)
+    return DataNode(data=[X, y], feature_type=[NUMERICAL] * 4)
+
+
+def get_predict_func(node):
+    estimator = LogisticRegression().fit(*node.data)
+    n_rows = list()
+
+    def predict_proba(data_node):
+        n_rows.append(data_node.shape[0])
+        return estimator.predict_proba(data_node.data[0])
+
+    return predict_proba, n_rows
+
+
+@pytest.mark.parametrize('batch_size', [None, 1, 7, 50, 64])
+@pytest.mark.parametrize('n_jobs', [1, 3])
+def test_matches_single_shot(batch_size, n_jobs):
+    node, test_node = get_node(), get_node(n_rows=23, seed=2)
+    predict_func, n_rows = get_predict_func(node)
+    expected = predict_func(test_node)
+    del n_rows[:]
+
+    pred = batch_predict(predict_func, test_node, batch_size, n_jobs=n_jobs)
+    np.testing.assert_allclose(pred, expected)
+    assert sum(n_rows) == 23
+    assert max(n_rows) == (23 if batch_size is None else min(batch_size, 23))
+
+
+def test_output_path(tmp_path):
+    node, test_node = get_node(), get_node(n_rows=23, seed=2)
+    predict_func, _ = get_predict_func(node)
+    output_path = str(tmp_path / 'pred.npy')
+
+    pred = batch_predict(predict_func, test_node, 5, n_jobs=2, output_path=output_path)
+    assert isinstance(pred, np.memmap)
+    np.testing.assert_allclose(pred, predict_func(test_node))
+    # The file is a regular .npy file that outlives the returned memmap.
+    np.testing.assert_allclose(np.load(output_path), predict_func(test_node))
+
+
+def test_empty_dataset():
+    node = get_node()
+    predict_func, _ = get_predict_func(node)
+    with pytest.raises(ValueError):
+        batch_predict(predict_func, get_node(n_rows=0), 5)
+
+
+class IdentityFEOptimizer(object):
+    def apply(self, data_node, node):
+        return data_node
+
+
+def test_best_model_is_loaded_once(tmp_path, monkeypatch):
+    node, test_node = get_node(), get_node(n_rows=23, seed=2)
+    estimator = LogisticRegression().fit(*node.data)
+    # A fitted bandit without an ensemble, reduced to what _predict reads.
+    bandit = FirstLayerBandit.__new__(FirstLayerBandit)
+    bandit.task_type, bandit.ensemble_method, bandit.inner_opt_algorithm = MULTICLASS_CLS, None, 'fixed'
+    bandit.fe_optimizer, bandit.best_data_node = IdentityFEOptimizer(), None
+    bandit.output_dir, bandit.timestamp, bandit.model_cache = str(tmp_path), 1., ModelCache()
+    with open(os.path.join(str(tmp_path), '1.0-best_model'), 'wb') as f:
+        pkl.dump(estimator, f)
+
+    n_loads = list()
+    load = parallel_predictor.pkl.load
+
+    def counting_load(f):
+        n_loads.append(f)
+        return load(f)
+
+    monkeypatch.setattr(parallel_predictor.pkl, 'load', counting_load)
+    pred = batch_predict(bandit.predict_proba, test_node, 5, n_jobs=2)
+    np.testing.assert_allclose(pred, estimator.predict_proba(test_node.data[0]))
+    assert len(n_loads) == 1
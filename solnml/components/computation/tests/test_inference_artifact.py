@@ -0,0 +1,122 @@
+import os
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.ensemble import RandomForestClassifier
+
+from solnml.components.utils.constants import NUMERICAL, MULTICLASS_CLS, REGRESSION
+from solnml.components.feature_engineering.transformation_graph import DataNode
+from solnml.components.computation.inference_artifact import InferenceArtifact
+
+
+class ShiftTransformer(object):
+    """Fitted stand-in for an FE transformer; counts its calls to check the shared transforms."""
+    n_calls = 0
+
+    def __init__(self, shift):
+        self.shift = np.full(4, shift)
+
+    def operate(self, input_node):
+        ShiftTransformer.n_calls += 1
+        output_node = input_node.copy_()
+        output_node.data = [input_node.data[0] + self.shift, input_node.data[1]]
+        return output_node
+
+
+def get_node(n_rows=60, seed=1):
+    rng = np.random.RandomState(seed)
+    X = rng.rand(n_rows, 4)
+    y = (X[:, 0] + X[:, 1] > 1).astype(int) + (X[:, 2] > 0.5).astype(int)
+    return DataNode(data=[X, y], feature_type=[NUMERICAL] * 4)
+
+
+def get_members(estimator_class, node):
+    first, second = ShiftTransformer(1.), ShiftTransformer(-2.)
+    members = list()
+    for weight, trans_list in [(2., [first]), (1., [first]), (1., [first, second])]:
+        X = node.data[0]
+        for tran in trans_list:
+            X = X + tran.shift
+        members.append((weight, trans_list, estimator_class().fit(X, node.data[1])))
+    return members
+
+
+def predict_members(members, node, predict_method):
+    weights = np.array([member[0] for member in members])
+    weights = weights / weights.sum()
+    pred = 0.
+    for weight, (_, trans_list, estimator) in zip(weights, members):
+        X = node.data[0]
+        for tran in trans_list:
+            X = X + tran.shift
+        pred = pred + weight * getattr(estimator, predict_method)(X)
+    return pred
+
+
+def test_predict_matches_members():
+    node, test_node = get_node(), get_node(n_rows=20, seed=2)
+    members = get_members(LogisticRegression, node)
+    artifact = InferenceArtifact(MULTICLASS_CLS, members)
+    # The first two members share one pipeline.
+    assert len(artifact.pipelines) == 2
+
+    ShiftTransformer.n_calls = 0
+    proba = artifact.predict_proba(test_node)
+    # The fitted prefix shared by all members is applied once.
+    assert ShiftTransformer.n_calls == 2
+    np.testing.assert_allclose(proba, predict_members(members, test_node, 'predict_proba'))
+    np.testing.assert_array_equal(artifact.predict(test_node), np.argmax(proba, axis=-1))
+    # The input node is left untouched.
+    np.testing.assert_array_equal(test_node.data[0], get_node(n_rows=20, seed=2).data[0])
+
+
+def test_regression():
+    node, test_node = get_node(), get_node(n_rows=20, seed=2)
+    members = get_members(Ridge, node)
+    artifact = InferenceArtifact(REGRESSION, members)
+    np.testing.assert_allclose(artifact.predict(test_node), predict_members(members, test_node, 'predict'))
+    with pytest.raises(AttributeError):
+        artifact.predict_proba(test_node)
+
+
+def test_save_and_load(tmp_path):
+    node, test_node = get_node(), get_node(n_rows=20, seed=2)
+    artifact = InferenceArtifact(MULTICLASS_CLS, get_members(LogisticRegression, node))
+    path = str(tmp_path / 'artifact.pkl')
+    assert artifact.save(path) == path
+    assert os.listdir(str(tmp_path)) == ['artifact.pkl']
+
+    loaded = InferenceArtifact.load(path)
+    # The arrays are memory-mapped from the file instead of being read into memory.
+    assert isinstance(loaded.members[0][1].coef_, np.memmap)
+    assert isinstance(loaded.pipelines[0][0].shift, np.memmap)
+    # Members of one pipeline still share its transformers after loading.
+    assert len(loaded.pipelines) == 2
+    np.testing.assert_allclose(loaded.predict_proba(test_node), artifact.predict_proba(test_node))
+
+    loaded = InferenceArtifact.load(path, mmap_mode=None)
+    assert not isinstance(loaded.members[0][1].coef_, np.memmap)
+    np.testing.assert_allclose(loaded.predict_proba(test_node), artifact.predict_proba(test_node))
+
+
+def test_save_and_load_trees(tmp_path):
+    node, test_node = get_node(), get_node(n_rows=20, seed=2)
+    artifact = InferenceArtifact(MULTICLASS_CLS,
+                                 get_members(lambda: RandomForestClassifier(n_estimators=5, random_state=1), node))
+    path = artifact.save(str(tmp_path / 'artifact.pkl'))
+
+    loaded = InferenceArtifact.load(path)
+    np.testing.assert_allclose(loaded.predict_proba(test_node), artifact.predict_proba(test_node))
+    # The transformers are still memory-mapped, but sklearn copies the nodes of the unpickled trees.
+    assert isinstance(loaded.pipelines[0][0].shift, np.memmap)
+    assert not isinstance(loaded.members[0][1].estimators_[0].tree_.value, np.memmap)
+
+
+def test_invalid_input(tmp_path):
+    with pytest.raises(ValueError):
+        InferenceArtifact(MULTICLASS_CLS, [])
+    path = str(tmp_path / 'other.pkl')
+    joblib.dump({'weights': np.ones(3)}, path)
+    with pytest.raises(ValueError):
+        InferenceArtifact.load(path)
@@ -0,0 +1,65 @@
+import os
+import numpy as np
+import pytest
+from ConfigSpace.hyperparameters import UnParametrizedHyperparameter
+
+from solnml.components.utils.constants import MULTICLASS_CLS
+from solnml.components.computation.parallel_fetcher import ParallelFetcher
+
+
+def get_config(estimator_id='random_forest'):
+    from solnml.components.models.classification import _classifiers
+    cs = _classifiers[estimator_id].get_hyperparameter_search_space()
+    cs.add_hyperparameter(UnParametrizedHyperparameter('estimator', estimator_id))
+    return cs.get_default_configuration()
+
+
+def get_data(n_rows=90):
+    rng = np.random.RandomState(1)
+    X = rng.rand(n_rows, 4)
+    y = (X[:, 0] + X[:, 1] > 1).astype(int) + (X[:, 2] > 0.5).astype(int)
+    return X, y
+
+
+def fetch(backend, X, y):
+    fetcher = ParallelFetcher(n_worker=2, backend=backend)
+    config = get_config()
+    fetcher.submit(MULTICLASS_CLS, config, X, y, 0, 0)
+    fetcher.submit(MULTICLASS_CLS, config, X, y, 0, 0, train_index=np.arange(0, len(y), 2))
+    store_dir = fetcher.store_dir
+    return fetcher, store_dir, fetcher.wait_tasks_finish()
+
+
+def test_process_backend_matches_thread_backend():
+    X, y = get_data()
+    _, _, thread_estimators = fetch('thread', X, y)
+    fetcher, store_dir, process_estimators = fetch('process', X, y)
+
+    assert len(process_estimators) == len(thread_estimators) == 2
+    for thread_estimator, process_estimator in zip(thread_estimators, process_estimators):
+        np.testing.assert_allclose(process_estimator.predict_proba(X), thread_estimator.predict_proba(X))
+
+    # The arrays and the models of the batch are removed once they are read back.
+    assert store_dir is not None and not os.path.exists(store_dir)
+    assert fetcher.store_dir is None and fetcher._dumped_arrays == dict()
+    assert fetcher.estimators == process_estimators
+
+
+def test_process_backend_dumps_shared_arrays_once():
+    X, y = get_data()
+    fetcher = ParallelFetcher(n_worker=2, backend='process')
+    for _ in range(3):
+        fetcher.submit(MULTICLASS_CLS, get_config(), X, y, 0, 0)
+    # X and y are dumped once for the whole batch.
+    assert len(fetcher._dumped_arrays) == 2
+    fetcher.wait_tasks_finish()
+    assert fetcher.store_dir is None
+
+    # The fetcher can be reused for another batch.
+    fetcher.submit(MULTICLASS_CLS, get_config(), X, y, 0, 0)
+    assert len(fetcher.wait_tasks_finish()) == 1
+
+
+def test_invalid_backend():
+    with pytest.raises(ValueError):
+        ParallelFetcher(backend='mpi')
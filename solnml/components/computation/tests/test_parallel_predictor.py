@@ -0,0 +1,105 @@
+import os
+import time
+import threading
+import numpy as np
+import pickle as pkl
+import joblib
+from sklearn.linear_model import LogisticRegression
+
+from solnml.components.utils.constants import MULTICLASS_CLS, REGRESSION
+from solnml.components.computation.parallel_predictor import ModelCache, predict_in_parallel
+
+
+class SlowEstimator(object):
+    """Predicts its id after a delay; the first estimators are the slowest, so they finish last."""
+
+    def __init__(self, model_id, delay):
+        self.model_id = model_id
+        self.delay = delay
+        self.thread_ids = list()
+
+    def _predict(self, X):
+        time.sleep(self.delay)
+        self.thread_ids.append(threading.get_ident())
+        return np.full(len(X), self.model_id, dtype=float)
+
+    def predict(self, X):
+        return self._predict(X) + X[:, 0]
+
+    def predict_proba(self, X):
+        pred = self._predict(X)
+        return np.stack([pred, -pred], axis=1)
+
+
+def dump(obj, path):
+    with open(path, 'wb') as f:
+        pkl.dump(obj, f)
+
+
+def test_model_cache_reloads_rewritten_file(tmp_path):
+    path = str(tmp_path / 'model')
+    dump({'version': 1}, path)
+    cache = ModelCache()
+    model = cache.load(path)
+    assert model == {'version': 1}
+    # Loaded once, then served from memory.
+    assert cache.load(path) is model
+    assert path in cache and len(cache) == 1
+
+    # A refit rewrites the file: the new mtime invalidates the entry.
+    dump({'version': 2}, path)
+    mtime = os.path.getmtime(path)
+    os.utime(path, (mtime + 10, mtime + 10))
+    assert cache.load(path) == {'version': 2}
+    assert len(cache) == 1
+
+    cache.clear()
+    assert path not in cache and len(cache) == 0
+
+
+def test_model_cache_is_not_pickled_with_its_models(tmp_path):
+    path = str(tmp_path / 'model')
+    dump({'version': 1}, path)
+    cache = ModelCache()
+    cache.load(path)
+    assert len(pkl.loads(pkl.dumps(cache))) == 0
+
+
+def test_model_cache_mmap(tmp_path):
+    rng = np.random.RandomState(1)
+    X, y = rng.rand(40, 4), rng.randint(3, size=40)
+    estimator = LogisticRegression().fit(X, y)
+    path = str(tmp_path / 'model')
+    joblib.dump(estimator, path)
+
+    model = ModelCache(mmap_mode='r').load(path)
+    assert isinstance(model.coef_, np.memmap)
+    np.testing.assert_allclose(model.predict_proba(X), estimator.predict_proba(X))
+
+
+def test_predict_in_parallel_keeps_order():
+    n_models = 6
+    estimators = [SlowEstimator(idx, delay=0.02 * (n_models - idx)) for idx in range(n_models)]
+    X_list = [np.full((idx + 1, 2), idx, dtype=float) for idx in range(n_models)]
+
+    preds = predict_in_parallel(estimators, X_list, MULTICLASS_CLS, n_jobs=3)
+    assert len(preds) == n_models
+    for idx, pred in enumerate(preds):
+        # Prediction i comes from estimator i on X_list[i], whatever the completion order.
+        assert pred.shape == (idx + 1, 2)
+        np.testing.assert_array_equal(pred[:, 0], idx)
+    if (os.cpu_count() or 1) > 1:
+        # The predictions ran on more than one thread.
+        assert len(set(thread_id for estimator in estimators for thread_id in estimator.thread_ids)) > 1
+
+    preds = predict_in_parallel(estimators, X_list, REGRESSION, n_jobs=3)
+    for idx, pred in enumerate(preds):
+        np.testing.assert_array_equal(pred, 2 * idx)
+
+
+def test_predict_in_parallel_serial():
+    estimators = [SlowEstimator(idx, delay=0.) for idx in range(3)]
+    X_list = [np.zeros((2, 2))] * 3
+    preds = predict_in_parallel(estimators, X_list, REGRESSION, n_jobs=1)
+    assert [pred.tolist() for pred in preds] == [[0., 0.], [1., 1.], [2., 2.]]
+    assert set(estimators[0].thread_ids) == {threading.get_ident()}
@@ -0,0 +1,114 @@
+import os
+import time
+import signal
+from ConfigSpace import ConfigurationSpace, UniformFloatHyperparameter
+
+from solnml.components.computation.parallel_process import ParallelProcessEvaluator
+from solnml.components.hpo_optimizer.base.hyperband import HyperbandBase
+
+
+class VersionEvaluator(object):
+    """Evaluates a data node to (version, node, pid) so that tests see which copy of the evaluator ran."""
+
+    def __init__(self, version):
+        self.version = version
+        self.n_concurrent_trials = 1
+
+    def __call__(self, config, **kwargs):
+        return self.version, kwargs['data_node'], os.getpid()
+
+
+class KillOnceEvaluator(object):
+    """Kills its worker the first time it evaluates node 0, leaving a marker file behind."""
+
+    def __init__(self, marker_path):
+        self.marker_path = marker_path
+
+    def __call__(self, config, **kwargs):
+        if kwargs['data_node'] == 0 and not os.path.exists(self.marker_path):
+            open(self.marker_path, 'w').close()
+            os.kill(os.getpid(), signal.SIGKILL)
+        return kwargs['data_node']
+
+
+def get_pids(executor):
+    return [process.pid for process in executor.process_pool.get_workers()]
+
+
+def wait_until_unhealthy(executor, timeout=10.):
+    start_time = time.time()
+    while executor.is_healthy() and time.time() - start_time < timeout:
+        time.sleep(0.05)
+    return not executor.is_healthy()
+
+
+def test_pool_is_kept_across_calls():
+    with ParallelProcessEvaluator(VersionEvaluator(1), n_worker=2) as executor:
+        pids = get_pids(executor)
+        result = executor.parallel_execute([1, 2, 3])
+        assert [item[:2] for item in result] == [(1, 1), (1, 2), (1, 3)]
+        assert set(item[2] for item in result) <= set(pids)
+
+        executor.parallel_execute([4, 5], resource_ratio=0.5)
+        assert get_pids(executor) == pids
+    assert executor.process_pool is None
+
+
+def test_update_evaluator_restarts_pool():
+    evaluator = VersionEvaluator(1)
+    with ParallelProcessEvaluator(evaluator, n_worker=2) as executor:
+        assert evaluator.n_concurrent_trials == 2
+        executor.parallel_execute([1])
+        pids = get_pids(executor)
+
+        # The workers hold the copy of the evaluator they were started with.
+        evaluator.version = 2
+        assert executor.parallel_execute([1])[0][0] == 1
+
+        executor.update_evaluator(evaluator)
+        assert executor.evaluator_version == 2
+        assert executor.parallel_execute([1])[0][0] == 2
+        assert not set(get_pids(executor)) & set(pids)
+
+
+def test_is_healthy():
+    executor = ParallelProcessEvaluator(VersionEvaluator(1), n_worker=2)
+    assert not executor.is_healthy()
+    executor.start()
+    assert executor.is_healthy()
+
+    os.kill(get_pids(executor)[0], signal.SIGKILL)
+    assert wait_until_unhealthy(executor)
+    # The next call starts a fresh pool.
+    assert [item[1] for item in executor.parallel_execute([1, 2])] == [1, 2]
+    assert executor.is_healthy()
+    executor.shutdown()
+    assert not executor.is_healthy()
+
+
+def test_lost_task_is_resubmitted(tmp_path):
+    marker_path = str(tmp_path / 'killed')
+    with ParallelProcessEvaluator(KillOnceEvaluator(marker_path), n_worker=2,
+                                  health_check_interval=0.1) as executor:
+        assert executor.parallel_execute([0, 1, 2, 3]) == [0, 1, 2, 3]
+        # Node 0 killed its worker once and was evaluated again on the new pool.
+        assert os.path.exists(marker_path)
+        assert executor.is_healthy()
+
+
+def test_brackets_share_one_pool_until_shutdown_executor():
+    cs = ConfigurationSpace()
+    cs.add_hyperparameter(UniformFloatHyperparameter('x', 0., 1.))
+    optimizer = HyperbandBase(VersionEvaluator(1), cs, n_jobs=2)
+
+    executor = optimizer.get_executor()
+    executor.parallel_execute([1, 2], resource_ratio=1. / 3, first_iter=True)
+    pids = get_pids(executor)
+    assert optimizer.get_executor() is executor
+    optimizer.get_executor().parallel_execute([3, 4], resource_ratio=1.)
+    assert get_pids(executor) == pids
+
+    optimizer.shutdown_executor()
+    assert optimizer.executor is None and executor.process_pool is None
+    # Shutting down twice is harmless.
+    optimizer.shutdown_executor()
@@ -10,9 +10,21 @@ from solnml.components.evaluators.base_evaluator import fetch_predict_estimator
 from solnml.components.ensemble.unnamed_ensemble import choose_base_models_classification, \
     choose_base_models_regression
 from solnml.components.computation.parallel_fetcher import ParallelFetcher
+from solnml.components.evaluators.prediction_store import get_trial_hash
+from solnml.components.computation.parallel_predictor import ModelCache, predict_in_parallel
 from solnml.utils.logging_utils import get_logger
 
 
+def _fit_and_save(task_type, config, X, y, weight_balance, data_balance, model_path, n_jobs):
+    estimator = fetch_predict_estimator(task_type, config, X, y,
+                                        weight_balance=weight_balance,
+                                        data_balance=data_balance,
+                                        n_jobs=n_jobs)
+    # Saved by the worker, so that the fitted model is not sent back.
+    with open(model_path, 'wb') as f:
+        pkl.dump(estimator, f)
+
+
 class BaseEnsembleModel(object):
     """Base class for model ensemble"""
 
@@ -21,15 +33,23 @@ class BaseEnsembleModel(object):
                  task_type: int,
                  metric: _BaseScorer,
                  base_save=False,
-                 output_dir=None):
+                 output_dir=None,
+                 n_jobs=4,
+                 prediction_store=None,
+                 fetcher_backend='thread'):
         self.stats = stats
         self.ensemble_method = ensemble_method
         self.ensemble_size = ensemble_size
         self.task_type = task_type
         self.metric = metric
         self.output_dir = output_dir
-        # TODO: n_workers
-        self.fetcher = ParallelFetcher(n_worker=4)
+        self.n_jobs = n_jobs
+        # 'process' fits the members on a process pool, for estimators that hold the GIL.
+        self.fetcher = ParallelFetcher(n_worker=n_jobs, backend=fetcher_backend)
+        self.model_cache = ModelCache()
+        # Validation predictions recorded by the evaluators; members found there are not refit.
+        self.prediction_store = prediction_store
+        self.unsaved_models = dict()
 
         self.train_predictions = []
         self.config_list = []
@@ -40,7 +60,8 @@ class BaseEnsembleModel(object):
         logger_name = 'EnsembleBuilder'
         self.logger = get_logger(logger_name)
 
-        X_valid_list = list()
+        X_valid_dict = dict()
+        model_cnt = 0
         for algo_id in self.stats["include_algorithms"]:
             model_to_eval = self.stats[algo_id]['model_to_eval']
             for idx, (node, config) in enumerate(model_to_eval):
@@ -55,30 +76,44 @@ class BaseEnsembleModel(object):
                     ss = ShuffleSplit(n_splits=1, test_size=test_size, random_state=1)
 
                 for train_index, test_index in ss.split(X, y):
-                    X_train, X_valid = X[train_index], X[test_index]
-                    y_train, y_valid = y[train_index], y[test_index]
+                    X_valid, y_valid = X[test_index], y[test_index]
 
                 if self.train_labels is not None:
                     assert (self.train_labels == y_valid).all()
                 else:
                     self.train_labels = y_valid
-                X_valid_list.append(X_valid)
-                self.fetcher.submit(self.task_type, config, X_train, y_train,
-                                    weight_balance=node.enable_balance,
-                                    data_balance=node.data_balance)
+
+                y_valid_pred = self.load_stored_prediction(node, config, test_index)
+                if y_valid_pred is not None:
+                    self.train_predictions.append(y_valid_pred)
+                    if base_save:
+                        # Only fit once the ensemble knows whether it keeps this member.
+                        self.unsaved_models[model_cnt] = (node, config, train_index)
+                else:
+                    self.train_predictions.append(None)
+                    X_valid_dict[model_cnt] = X_valid
+                    # The node arrays are passed whole, so the process backend dumps them once per node.
+                    self.fetcher.submit(self.task_type, config, X, y,
+                                        weight_balance=node.enable_balance,
+                                        data_balance=node.data_balance,
+                                        train_index=train_index)
+                model_cnt += 1
 
         estimator_list = self.fetcher.wait_tasks_finish()
-        for model_cnt, estimator in enumerate(estimator_list):
+        for model_id, estimator in zip(X_valid_dict.keys(), estimator_list):
             if base_save:  # For ensemble selection
-                with open(os.path.join(self.output_dir, '%s-model%d' % (self.timestamp, model_cnt)),
+                with open(os.path.join(self.output_dir, '%s-model%d' % (self.timestamp, model_id)),
                           'wb') as f:
                     pkl.dump(estimator, f)
 
             if self.task_type in CLS_TASKS:
-                y_valid_pred = estimator.predict_proba(X_valid_list[model_cnt])
+                y_valid_pred = estimator.predict_proba(X_valid_dict[model_id])
             else:
-                y_valid_pred = estimator.predict(X_valid_list[model_cnt])
-            self.train_predictions.append(y_valid_pred)
+                y_valid_pred = estimator.predict(X_valid_dict[model_id])
+            self.train_predictions[model_id] = y_valid_pred
+        if len(X_valid_dict) < model_cnt:
+            self.logger.info('Read the validation predictions of %d models from the prediction store.'
+                             % (model_cnt - len(X_valid_dict)))
 
         if len(self.train_predictions) < self.ensemble_size:
             self.ensemble_size = len(self.train_predictions)
@@ -94,6 +129,65 @@ class BaseEnsembleModel(object):
                                                                  self.ensemble_size)
         self.ensemble_size = sum(self.base_model_mask)
 
+    def load_stored_prediction(self, node, config, test_index):
+        if self.prediction_store is None:
+            return None
+        y_valid_pred = self.prediction_store.load_rows(get_trial_hash(node, config), test_index)
+        if y_valid_pred is None:
+            return None
+        if self.task_type in CLS_TASKS and len(y_valid_pred.shape) != 2:
+            return None
+        return y_valid_pred
+
+    def save_base_models(self, model_ids):
+        """Fit and save the given members whose validation predictions came from the prediction store."""
+        model_ids = [model_id for model_id in model_ids if model_id in self.unsaved_models]
+        for model_id in model_ids:
+            node, config, train_index = self.unsaved_models[model_id]
+            X, y = node.data
+            self.fetcher.submit(self.task_type, config, X, y,
+                                weight_balance=node.enable_balance,
+                                data_balance=node.data_balance,
+                                train_index=train_index)
+        estimator_list = self.fetcher.wait_tasks_finish()
+        for model_id, estimator in zip(model_ids, estimator_list):
+            with open(os.path.join(self.output_dir, '%s-model%d' % (self.timestamp, model_id)), 'wb') as f:
+                pkl.dump(estimator, f)
+            self.unsaved_models.pop(model_id)
+
+    def fit_base_models(self, members):
+        """
+        Fit the members on the full training data and save them, several at a time.
+
+        :param members: list of (model name, node, config).
+
+        The members share a budget of n_jobs CPUs: up to n_jobs of them are fit in worker processes,
+        and each gets an equal share of the CPUs for its own threads (estimator n_jobs, BLAS, OpenMP).
+        """
+        if len(members) == 0:
+            return
+        n_workers = max(1, min(self.n_jobs, len(members), os.cpu_count() or 1))
+        n_threads = max(1, self.n_jobs // n_workers)
+        for model_name, _, _ in members:
+            self.logger.info("Fit model %s on the full training data" % model_name)
+
+        # Training arrays above max_nbytes are memory-mapped once and shared by the workers.
+        from joblib import Parallel, delayed, parallel_backend
+        with parallel_backend('loky', inner_max_num_threads=n_threads):
+            Parallel(n_jobs=n_workers, max_nbytes='1M')(
+                delayed(_fit_and_save)(self.task_type, config, node.data[0], node.data[1],
+                                       node.enable_balance, node.data_balance,
+                                       os.path.join(self.output_dir, model_name), n_threads)
+                for model_name, node, config in members)
+
+    def load_model(self, model_name):
+        return self.model_cache.load(os.path.join(self.output_dir, model_name))
+
+    def predict_base_models(self, model_names, X_list):
+        """Predict X_list[i] with the saved base model model_names[i], using up to n_jobs threads."""
+        estimators = [self.load_model(model_name) for model_name in model_names]
+        return predict_in_parallel(estimators, X_list, self.task_type, n_jobs=self.n_jobs)
+
     def fit(self, data):
         raise NotImplementedError
 
@@ -103,6 +197,9 @@ class BaseEnsembleModel(object):
     def get_ens_model_info(self):
         raise NotImplementedError
 
+    def get_inference_members(self, solvers):
+        raise NotImplementedError
+
     def refit(self):
         pass
 
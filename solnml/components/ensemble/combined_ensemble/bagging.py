@@ -1,12 +1,9 @@
 from sklearn.metrics.scorer import _BaseScorer
 import numpy as np
 import os
-import pickle as pkl
 
 from solnml.components.utils.constants import CLS_TASKS
-from solnml.components.evaluators.base_evaluator import fetch_predict_estimator
 from solnml.components.ensemble.combined_ensemble.base_ensemble import BaseEnsembleModel
-from functools import reduce
 
 
 class Bagging(BaseEnsembleModel):
@@ -14,57 +11,62 @@ class Bagging(BaseEnsembleModel):
                  ensemble_size: int,
                  task_type: int,
                  metric: _BaseScorer,
-                 output_dir=None):
+                 output_dir=None,
+                 prediction_store=None,
+                 fetcher_backend='thread'):
         super().__init__(stats=stats,
                          ensemble_method='bagging',
                          ensemble_size=ensemble_size,
                          task_type=task_type,
                          metric=metric,
-                         output_dir=output_dir)
+                         output_dir=output_dir,
+                         prediction_store=prediction_store,
+                         fetcher_backend=fetcher_backend)
 
     def fit(self, datanode):
+        members = list()
         model_cnt = 0
         for algo_id in self.stats["include_algorithms"]:
             model_to_eval = self.stats[algo_id]['model_to_eval']
             for idx, (node, config) in enumerate(model_to_eval):
-                X, y = node.data
                 if self.base_model_mask[model_cnt] == 1:
-                    estimator = fetch_predict_estimator(self.task_type, config, X, y,
-                                                        weight_balance=node.enable_balance,
-                                                        data_balance=node.data_balance,
-                                                        combined=True)
-                    with open(os.path.join(self.output_dir, '%s-bagging-model%d' % (self.timestamp, model_cnt)),
-                              'wb') as f:
-                        pkl.dump(estimator, f)
+                    members.append(('%s-bagging-model%d' % (self.timestamp, model_cnt), node, config))
                 model_cnt += 1
+        self.fit_base_models(members)
         return self
 
     def predict(self, data, record_op):
-        model_pred_list = []
-        final_pred = []
+        # Members sharing an FE pipeline, or a fitted prefix of it, share the transformed test data.
+        transform_cache = dict()
+        model_names, X_list = list(), list()
         # Get predictions from each model
         model_cnt = 0
         for algo_id in self.stats["include_algorithms"]:
             model_to_eval = self.stats[algo_id]['model_to_eval']
             for idx, (node, config) in enumerate(model_to_eval):
-                test_node = record_op.apply(data, node)
                 if self.base_model_mask[model_cnt] == 1:
-                    with open(os.path.join(self.output_dir, '%s-bagging-model%d' % (self.timestamp, model_cnt)),
-                              'rb') as f:
-                        estimator = pkl.load(f)
-                        if self.task_type in CLS_TASKS:
-                            model_pred_list.append(estimator.predict_proba(test_node.data[0]))
-                        else:
-                            model_pred_list.append(estimator.predict(test_node.data[0]))
+                    test_node = record_op.apply(data, node, transform_cache=transform_cache)
+                    model_names.append('%s-bagging-model%d' % (self.timestamp, model_cnt))
+                    X_list.append(test_node.data[0])
                 model_cnt += 1
+        model_pred_list = self.predict_base_models(model_names, X_list)
 
         # Calculate the average of predictions
-        for i in range(len(data.data[0])):
-            sample_pred_list = [model_pred[i] for model_pred in model_pred_list]
-            pred_average = reduce(lambda x, y: x + y, sample_pred_list) / len(sample_pred_list)
-            final_pred.append(pred_average)
+        return np.mean(np.asarray(model_pred_list), axis=0)
 
-        return np.array(final_pred)
+    def get_inference_members(self, solvers):
+        """(weight, fitted FE transformers, estimator) of the members; all of them weigh the same."""
+        members = list()
+        model_cnt = 0
+        for algo_id in self.stats["include_algorithms"]:
+            model_to_eval = self.stats[algo_id]['model_to_eval']
+            for idx, (node, config) in enumerate(model_to_eval):
+                if self.base_model_mask[model_cnt] == 1:
+                    trans_list = solvers.get_transformers(node)
+                    estimator = self.load_model('%s-bagging-model%d' % (self.timestamp, model_cnt))
+                    members.append((1., trans_list, estimator))
+                model_cnt += 1
+        return members
 
     def get_ens_model_info(self):
         model_cnt = 0
@@ -16,13 +16,17 @@ class Blending(BaseEnsembleModel):
                  task_type: int,
                  metric: _BaseScorer,
                  output_dir=None,
-                 meta_learner='lightgbm'):
+                 meta_learner='lightgbm',
+                 prediction_store=None,
+                 fetcher_backend='thread'):
         super().__init__(stats=stats,
                          ensemble_method='blending',
                          ensemble_size=ensemble_size,
                          task_type=task_type,
                          metric=metric,
-                         output_dir=output_dir)
+                         output_dir=output_dir,
+                         prediction_store=prediction_store,
+                         fetcher_backend=fetcher_backend)
         try:
             from lightgbm import LGBMClassifier
         except:
@@ -106,42 +110,37 @@ class Blending(BaseEnsembleModel):
         return self
 
     def get_feature(self, data, record_op):
+        # Members sharing an FE pipeline, or a fitted prefix of it, share the transformed test data.
+        transform_cache = dict()
         # Predict the labels via blending
-        feature_p2 = None
+        model_names, X_list = list(), list()
         model_cnt = 0
-        suc_cnt = 0
         for algo_id in self.stats["include_algorithms"]:
             model_to_eval = self.stats[algo_id]['model_to_eval']
             for idx, (node, config) in enumerate(model_to_eval):
-                test_node = record_op.apply(data, node)
                 if self.base_model_mask[model_cnt] == 1:
-                    with open(os.path.join(self.output_dir, '%s-blending-model%d' % (self.timestamp, model_cnt)),
-                              'rb') as f:
-                        estimator = pkl.load(f)
-                    if self.task_type in CLS_TASKS:
-                        pred = estimator.predict_proba(test_node.data[0])
-                        n_dim = np.array(pred).shape[1]
-                        if n_dim == 2:
-                            # Binary classificaion
-                            n_dim = 1
-                        # Initialize training matrix for phase 2
-                        if feature_p2 is None:
-                            num_samples = len(data.data[0])
-                            feature_p2 = np.zeros((num_samples, self.ensemble_size * n_dim))
-                        if n_dim == 1:
-                            feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = pred[:, 1:2]
-                        else:
-                            feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = pred
-                    else:
-                        pred = estimator.predict(test_node.data[0]).reshape(-1, 1)
-                        n_dim = 1
-                        # Initialize training matrix for phase 2
-                        if feature_p2 is None:
-                            num_samples = len(data.data[0])
-                            feature_p2 = np.zeros((num_samples, self.ensemble_size * n_dim))
-                        feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = pred
-                    suc_cnt += 1
+                    test_node = record_op.apply(data, node, transform_cache=transform_cache)
+                    model_names.append('%s-blending-model%d' % (self.timestamp, model_cnt))
+                    X_list.append(test_node.data[0])
                 model_cnt += 1
+        preds = self.predict_base_models(model_names, X_list)
+
+        feature_p2 = None
+        for suc_cnt, pred in enumerate(preds):
+            if self.task_type in CLS_TASKS:
+                n_dim = np.array(pred).shape[1]
+                if n_dim == 2:
+                    # Binary classificaion
+                    n_dim = 1
+                    pred = pred[:, 1:2]
+            else:
+                pred = pred.reshape(-1, 1)
+                n_dim = 1
+            # Initialize training matrix for phase 2
+            if feature_p2 is None:
+                num_samples = len(data.data[0])
+                feature_p2 = np.zeros((num_samples, self.ensemble_size * n_dim))
+            feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = pred
 
         return feature_p2
 
@@ -1,13 +1,12 @@
 from collections import Counter
 import os
 import numpy as np
-import pickle as pkl
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.metrics.scorer import _BaseScorer, _PredictScorer, _ThresholdScorer
 
+from solnml.components.metrics.batch_metrics import get_batch_score_func, MAX_CANDIDATE_BYTES
 from solnml.components.utils.constants import *
 from solnml.components.ensemble.combined_ensemble.base_ensemble import BaseEnsembleModel
-from solnml.components.evaluators.base_evaluator import fetch_predict_estimator
 
 
 class EnsembleSelection(BaseEnsembleModel):
@@ -19,7 +18,9 @@ class EnsembleSelection(BaseEnsembleModel):
             output_dir=None,
             sorted_initialization: bool = False,
             bagging: bool = False,
-            mode: str = 'fast'
+            mode: str = 'fast',
+            prediction_store=None,
+            fetcher_backend='thread'
     ):
         super().__init__(stats=stats,
                          ensemble_method='ensemble_selection',
@@ -27,7 +28,9 @@ class EnsembleSelection(BaseEnsembleModel):
                          task_type=task_type,
                          metric=metric,
                          base_save=True,
-                         output_dir=output_dir)
+                         output_dir=output_dir,
+                         prediction_store=prediction_store,
+                         fetcher_backend=fetcher_backend)
         self.model_idx = list()
         self.sorted_initialization = sorted_initialization
         self.bagging = bagging
@@ -73,6 +76,7 @@ class EnsembleSelection(BaseEnsembleModel):
                 if self.weights_[model_cnt] != 0:
                     self.model_idx.append(model_cnt)
                 model_cnt += 1
+        self.save_base_models(self.model_idx)
 
         return self
 
@@ -87,53 +91,31 @@ class EnsembleSelection(BaseEnsembleModel):
         """Fast version of Rich Caruana's ensemble selection method."""
         self.num_input_models_ = len(predictions)
 
-        ensemble = []
         trajectory = []
         order = []
 
         ensemble_size = self.ensemble_size
+        # Stack to (n_models, n_samples[, n_classes]) so that the candidates of a step are built at once.
+        predictions = np.asarray(predictions)
+        ensemble_sum = np.zeros(predictions.shape[1:])
 
         if self.sorted_initialization:
             n_best = 20
             indices = self._sorted_initialization(predictions, labels, n_best)
             for idx in indices:
-                ensemble.append(predictions[idx])
+                ensemble_sum += predictions[idx]
                 order.append(idx)
-                ensemble_ = np.array(ensemble).mean(axis=0)
-                ensemble_performance = self.calculate_score(pred=ensemble_, y_true=labels)
+                ensemble_performance = self.calculate_score(pred=ensemble_sum / len(order), y_true=labels)
                 trajectory.append(ensemble_performance)
             ensemble_size -= n_best
 
         for i in range(ensemble_size):
-            scores = np.zeros((len(predictions)))
-            s = len(ensemble)
-            if s == 0:
-                weighted_ensemble_prediction = np.zeros(predictions[0].shape)
-            else:
-                # Memory-efficient averaging!
-                ensemble_prediction = np.zeros(ensemble[0].shape)
-                for pred in ensemble:
-                    ensemble_prediction += pred
-                ensemble_prediction /= s
-
-                weighted_ensemble_prediction = (s / float(s + 1)) * \
-                                               ensemble_prediction
-            fant_ensemble_prediction = np.zeros(weighted_ensemble_prediction.shape)
-            for j, pred in enumerate(predictions):
-                # TODO: this could potentially be vectorized! - let's profile
-                # the script first!
-                if self.task_type in CLS_TASKS:
-                    fant_ensemble_prediction[:, :] = weighted_ensemble_prediction + \
-                                                     (1. / float(s + 1)) * pred
-                else:
-                    fant_ensemble_prediction[:] = weighted_ensemble_prediction + \
-                                                  (1. / float(s + 1)) * pred
-
-                scores[j] = -self.calculate_score(pred=fant_ensemble_prediction, y_true=labels)
+            # Candidate j is the current ensemble with model j added once more.
+            scores = -self._score_candidates(ensemble_sum, predictions, len(order) + 1, labels)
 
             all_best = np.argwhere(scores == np.nanmin(scores)).flatten()
             best = self.random_state.choice(all_best)
-            ensemble.append(predictions[best])
+            ensemble_sum += predictions[best]
             trajectory.append(scores[best])
             order.append(best)
 
@@ -145,6 +127,20 @@ class EnsembleSelection(BaseEnsembleModel):
         self.trajectory_ = trajectory
         self.train_score_ = trajectory[-1]
 
+    def _score_candidates(self, ensemble_sum, predictions, n_members, labels):
+        """Score (ensemble_sum + predictions[j]) / n_members for every model j."""
+        batch_score_func = get_batch_score_func(self.metric, self.task_type)
+        scores = np.zeros(len(predictions))
+        chunk_size = max(1, int(MAX_CANDIDATE_BYTES // max(ensemble_sum.nbytes, 1)))
+        for start in range(0, len(predictions), chunk_size):
+            candidates = (ensemble_sum[np.newaxis] + predictions[start:start + chunk_size]) / float(n_members)
+            if batch_score_func is not None:
+                scores[start:start + len(candidates)] = batch_score_func(candidates, labels)
+            else:
+                for j, candidate in enumerate(candidates):
+                    scores[start + j] = self.calculate_score(pred=candidate, y_true=labels)
+        return scores
+
     def _slow(self, predictions, labels):
         """Rich Caruana's ensemble selection method."""
         self.num_input_models_ = len(predictions)
@@ -199,45 +195,30 @@ class EnsembleSelection(BaseEnsembleModel):
         self.weights_ = weights
 
     def _sorted_initialization(self, predictions, labels, n_best):
-        perf = np.zeros([predictions.shape[0]])
-
-        for idx, prediction in enumerate(predictions):
-            perf[idx] = self.calculate_score(pred=predictions, y_true=labels)
+        predictions = np.asarray(predictions)
+        perf = self._score_candidates(np.zeros(predictions.shape[1:]), predictions, 1, labels)
 
         indices = np.argsort(perf)[perf.shape[0] - n_best:]
         return indices
 
     def predict(self, data, record_op):
-        predictions = []
+        # Members sharing an FE pipeline, or a fitted prefix of it, share the transformed test data.
+        transform_cache = dict()
+        model_names, X_list = list(), list()
         cur_idx = 0
         for algo_id in self.stats["include_algorithms"]:
             model_to_eval = self.stats[algo_id]['model_to_eval']
             for idx, (node, config) in enumerate(model_to_eval):
-                test_node = record_op.apply(data, node)
-                X_test, _ = test_node.data
+                # Models with zero weight do not contribute, so they are neither transformed nor evaluated.
                 if cur_idx in self.model_idx:
-                    with open(os.path.join(self.output_dir, '%s-model%d' % (self.timestamp, cur_idx)), 'rb') as f:
-                        estimator = pkl.load(f)
-                        if self.task_type in CLS_TASKS:
-                            predictions.append(estimator.predict_proba(X_test))
-                        else:
-                            predictions.append(estimator.predict(X_test))
-                else:
-                    if len(self.shape) == 1:
-                        predictions.append(np.zeros(len(test_node.data[0])))
-                    else:
-                        predictions.append(np.zeros((len(test_node.data[0]), self.shape[1])))
+                    test_node = record_op.apply(data, node, transform_cache=transform_cache)
+                    model_names.append('%s-model%d' % (self.timestamp, cur_idx))
+                    X_list.append(test_node.data[0])
                 cur_idx += 1
-        predictions = np.asarray(predictions)
+        predictions = np.asarray(self.predict_base_models(model_names, X_list))
 
-        # if predictions.shape[0] == len(self.weights_),
-        # predictions include those of zero-weight models.
-        if predictions.shape[0] == len(self.weights_):
-            return np.average(predictions, axis=0, weights=self.weights_)
-
-        # if prediction model.shape[0] == len(non_null_weights),
         # predictions do not include those of zero-weight models.
-        elif predictions.shape[0] == np.count_nonzero(self.weights_):
+        if predictions.shape[0] == np.count_nonzero(self.weights_):
             non_null_weights = [w for w in self.weights_ if w > 0]
             return np.average(predictions, axis=0, weights=non_null_weights)
 
@@ -246,6 +227,20 @@ class EnsembleSelection(BaseEnsembleModel):
             raise ValueError("The dimensions of ensemble predictions"
                              " and ensemble weights do not match!")
 
+    def get_inference_members(self, solvers):
+        """(weight, fitted FE transformers, estimator) of the members with non-zero weight."""
+        members = list()
+        cur_idx = 0
+        for algo_id in self.stats["include_algorithms"]:
+            model_to_eval = self.stats[algo_id]['model_to_eval']
+            for idx, (node, config) in enumerate(model_to_eval):
+                if cur_idx in self.model_idx:
+                    trans_list = solvers.get_transformers(node)
+                    estimator = self.load_model('%s-model%d' % (self.timestamp, cur_idx))
+                    members.append((self.weights_[cur_idx], trans_list, estimator))
+                cur_idx += 1
+        return members
+
     def __str__(self):
         return 'Ensemble Selection:\n\tTrajectory: %s\n\tMembers: %s' \
                '\n\tWeights: %s\n\tIdentifiers: %s' % \
@@ -257,23 +252,16 @@ class EnsembleSelection(BaseEnsembleModel):
                           if self.weights_[idx] > 0]))
 
     def refit(self):
-        # Refit models on whole training data
+        # Refit the models with non-zero weight on whole training data
+        members = list()
         model_cnt = 0
         for algo_id in self.stats["include_algorithms"]:
             model_to_eval = self.stats[algo_id]['model_to_eval']
             for idx, (node, config) in enumerate(model_to_eval):
-                X, y = node.data
                 if self.weights_[model_cnt] != 0:
-                    self.logger.info("Refit model %d" % model_cnt)
-                    estimator = fetch_predict_estimator(self.task_type, config, X, y,
-                                                        weight_balance=node.enable_balance,
-                                                        data_balance=node.data_balance,
-                                                        combined=True,
-                                                        )
-                    with open(os.path.join(self.output_dir, '%s-model%d' % (self.timestamp, model_cnt)),
-                              'wb') as f:
-                        pkl.dump(estimator, f)
+                    members.append(('%s-model%d' % (self.timestamp, model_cnt), node, config))
                 model_cnt += 1
+        self.fit_base_models(members)
 
     def get_models_with_weights(self, models):
         output = []
@@ -7,7 +7,6 @@ from solnml.components.evaluators.base_dl_evaluator import get_estimator_with_pa
 from solnml.components.ensemble.dl_ensemble.base_ensemble import BaseEnsembleModel
 from solnml.components.models.img_classification.nn_utils.nn_aug.aug_hp_space import get_test_transforms
 
-from functools import reduce
 
 
 class Bagging(BaseEnsembleModel):
@@ -38,7 +37,6 @@ class Bagging(BaseEnsembleModel):
 
     def predict(self, test_data: DLDataset, mode='test'):
         model_pred_list = list()
-        final_pred = list()
 
         model_cnt = 0
         for algo_id in self.stats["include_algorithms"]:
@@ -82,12 +80,7 @@ class Bagging(BaseEnsembleModel):
                 model_cnt += 1
 
         # Calculate the average of predictions
-        for i in range(len(model_pred_list[0])):
-            sample_pred_list = [model_pred[i] for model_pred in model_pred_list]
-            pred_average = reduce(lambda x, y: x + y, sample_pred_list) / len(sample_pred_list)
-            final_pred.append(pred_average)
-
-        return np.array(final_pred)
+        return np.mean(np.asarray(model_pred_list), axis=0)
 
     def get_ens_model_info(self):
         raise NotImplementedError
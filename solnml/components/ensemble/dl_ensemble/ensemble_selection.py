@@ -5,6 +5,7 @@ from sklearn.preprocessing import OneHotEncoder
 from torch.utils.data import DataLoader
 from sklearn.metrics.scorer import _BaseScorer, _PredictScorer, _ThresholdScorer
 
+from solnml.components.metrics.batch_metrics import get_batch_score_func, MAX_CANDIDATE_BYTES
 from solnml.components.utils.constants import CLS_TASKS, TASK_TYPES, IMG_CLS
 from solnml.datasets.base_dl_dataset import DLDataset
 from solnml.components.ensemble.dl_ensemble.base_ensemble import BaseEnsembleModel
@@ -140,53 +141,31 @@ class EnsembleSelection(BaseEnsembleModel):
         """Fast version of Rich Caruana's ensemble selection method."""
         self.num_input_models_ = len(predictions)
 
-        ensemble = []
         trajectory = []
         order = []
 
         ensemble_size = self.ensemble_size
+        # Stack to (n_models, n_samples[, n_classes]) so that the candidates of a step are built at once.
+        predictions = np.asarray(predictions)
+        ensemble_sum = np.zeros(predictions.shape[1:])
 
         if self.sorted_initialization:
             n_best = 20
             indices = self._sorted_initialization(predictions, labels, n_best)
             for idx in indices:
-                ensemble.append(predictions[idx])
+                ensemble_sum += predictions[idx]
                 order.append(idx)
-                ensemble_ = np.array(ensemble).mean(axis=0)
-                ensemble_performance = self.calculate_score(pred=ensemble_, y_true=labels)
+                ensemble_performance = self.calculate_score(pred=ensemble_sum / len(order), y_true=labels)
                 trajectory.append(ensemble_performance)
             ensemble_size -= n_best
 
         for i in range(ensemble_size):
-            scores = np.zeros((len(predictions)))
-            s = len(ensemble)
-            if s == 0:
-                weighted_ensemble_prediction = np.zeros(predictions[0].shape)
-            else:
-                # Memory-efficient averaging!
-                ensemble_prediction = np.zeros(ensemble[0].shape)
-                for pred in ensemble:
-                    ensemble_prediction += pred
-                ensemble_prediction /= s
-
-                weighted_ensemble_prediction = (s / float(s + 1)) * \
-                                               ensemble_prediction
-            fant_ensemble_prediction = np.zeros(weighted_ensemble_prediction.shape)
-            for j, pred in enumerate(predictions):
-                # TODO: this could potentially be vectorized! - let's profile
-                # the script first!
-                if self.task_type in CLS_TASKS:
-                    fant_ensemble_prediction[:, :] = weighted_ensemble_prediction + \
-                                                     (1. / float(s + 1)) * pred
-                else:
-                    fant_ensemble_prediction[:] = weighted_ensemble_prediction + \
-                                                  (1. / float(s + 1)) * pred
-
-                scores[j] = -self.calculate_score(pred=fant_ensemble_prediction, y_true=labels)
+            # Candidate j is the current ensemble with model j added once more.
+            scores = -self._score_candidates(ensemble_sum, predictions, len(order) + 1, labels)
 
             all_best = np.argwhere(scores == np.nanmin(scores)).flatten()
             best = self.random_state.choice(all_best)
-            ensemble.append(predictions[best])
+            ensemble_sum += predictions[best]
             trajectory.append(scores[best])
             order.append(best)
 
@@ -198,6 +177,20 @@ class EnsembleSelection(BaseEnsembleModel):
         self.trajectory_ = trajectory
         self.train_score_ = trajectory[-1]
 
+    def _score_candidates(self, ensemble_sum, predictions, n_members, labels):
+        """Score (ensemble_sum + predictions[j]) / n_members for every model j."""
+        batch_score_func = get_batch_score_func(self.metric, self.task_type)
+        scores = np.zeros(len(predictions))
+        chunk_size = max(1, int(MAX_CANDIDATE_BYTES // max(ensemble_sum.nbytes, 1)))
+        for start in range(0, len(predictions), chunk_size):
+            candidates = (ensemble_sum[np.newaxis] + predictions[start:start + chunk_size]) / float(n_members)
+            if batch_score_func is not None:
+                scores[start:start + len(candidates)] = batch_score_func(candidates, labels)
+            else:
+                for j, candidate in enumerate(candidates):
+                    scores[start + j] = self.calculate_score(pred=candidate, y_true=labels)
+        return scores
+
     def _slow(self, predictions, labels):
         """Rich Caruana's ensemble selection method."""
         self.num_input_models_ = len(predictions)
@@ -252,10 +245,8 @@ class EnsembleSelection(BaseEnsembleModel):
         self.weights_ = weights
 
     def _sorted_initialization(self, predictions, labels, n_best):
-        perf = np.zeros([predictions.shape[0]])
-
-        for idx, prediction in enumerate(predictions):
-            perf[idx] = self.calculate_score(pred=predictions, y_true=labels)
+        predictions = np.asarray(predictions)
+        perf = self._score_candidates(np.zeros(predictions.shape[1:]), predictions, 1, labels)
 
         indices = np.argsort(perf)[perf.shape[0] - n_best:]
         return indices
@@ -14,32 +14,42 @@ class EnsembleBuilder:
                  ensemble_size: int,
                  task_type: int,
                  metric: _BaseScorer,
-                 output_dir=None):
+                 output_dir=None,
+                 prediction_store=None,
+                 fetcher_backend='thread'):
         self.model = None
         if ensemble_method == 'bagging':
             self.model = Bagging(stats=stats,
                                  ensemble_size=ensemble_size,
                                  task_type=task_type,
                                  metric=metric,
-                                 output_dir=output_dir)
+                                 output_dir=output_dir,
+                                 prediction_store=prediction_store,
+                                 fetcher_backend=fetcher_backend)
         elif ensemble_method == 'blending':
             self.model = Blending(stats=stats,
                                   ensemble_size=ensemble_size,
                                   task_type=task_type,
                                   metric=metric,
-                                  output_dir=output_dir)
+                                  output_dir=output_dir,
+                                  prediction_store=prediction_store,
+                                  fetcher_backend=fetcher_backend)
         elif ensemble_method == 'stacking':
             self.model = Stacking(stats=stats,
                                   ensemble_size=ensemble_size,
                                   task_type=task_type,
                                   metric=metric,
-                                  output_dir=output_dir)
+                                  output_dir=output_dir,
+                                  prediction_store=prediction_store,
+                                  fetcher_backend=fetcher_backend)
         elif ensemble_method == 'ensemble_selection':
             self.model = EnsembleSelection(stats=stats,
                                            ensemble_size=ensemble_size,
                                            task_type=task_type,
                                            metric=metric,
-                                           output_dir=output_dir)
+                                           output_dir=output_dir,
+                                           prediction_store=prediction_store,
+                                           fetcher_backend=fetcher_backend)
         else:
             raise ValueError("%s is not supported for ensemble!" % ensemble_method)
 
@@ -54,3 +64,6 @@ class EnsembleBuilder:
 
     def get_ens_model_info(self):
         return self.model.get_ens_model_info()
+
+    def get_inference_members(self, solvers):
+        return self.model.get_inference_members(solvers)
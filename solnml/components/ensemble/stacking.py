@@ -10,6 +10,20 @@ from solnml.components.utils.constants import CLS_TASKS
 from solnml.components.evaluators.base_evaluator import fetch_predict_estimator
 
 
+def _fit_fold_and_predict(task_type, config, X, y, train_index, test_index, weight_balance, data_balance,
+                          model_path, combined=False):
+    estimator = fetch_predict_estimator(task_type, config, X[train_index], y[train_index],
+                                        weight_balance=weight_balance,
+                                        data_balance=data_balance,
+                                        combined=combined)
+    # Saved by the worker, so that only the predictions are sent back.
+    with open(model_path, 'wb') as f:
+        pkl.dump(estimator, f)
+    if task_type in CLS_TASKS:
+        return estimator.predict_proba(X[test_index])
+    return estimator.predict(X[test_index])
+
+
 class Stacking(BaseEnsembleModel):
     def __init__(self, stats,
                  ensemble_size: int,
@@ -17,13 +31,19 @@ class Stacking(BaseEnsembleModel):
                  metric: _BaseScorer,
                  output_dir=None,
                  meta_learner='lightgbm',
-                 kfold=5):
+                 kfold=5,
+                 n_jobs=4,
+                 prediction_store=None,
+                 fetcher_backend='thread'):
         super().__init__(stats=stats,
                          ensemble_method='stacking',
                          ensemble_size=ensemble_size,
                          task_type=task_type,
                          metric=metric,
-                         output_dir=output_dir)
+                         output_dir=output_dir,
+                         n_jobs=n_jobs,
+                         prediction_store=prediction_store,
+                         fetcher_backend=fetcher_backend)
 
         self.kfold = kfold
         try:
@@ -61,96 +81,86 @@ class Stacking(BaseEnsembleModel):
         else:
             kf = KFold(n_splits=self.kfold)
 
-        # Train basic models using a part of training data
+        members = list()
         model_cnt = 0
-        suc_cnt = 0
-        feature_p2 = None
         for algo_id in self.stats["include_algorithms"]:
             model_to_eval = self.stats[algo_id]['model_to_eval']
             for idx, (node, config) in enumerate(model_to_eval):
-                X, y = node.data
                 if self.base_model_mask[model_cnt] == 1:
-                    for j, (train, test) in enumerate(kf.split(X, y)):
-                        x_p1, x_p2, y_p1, _ = X[train], X[test], y[train], y[test]
-                        estimator = fetch_predict_estimator(self.task_type, config, x_p1, y_p1,
-                                                            weight_balance=data.enable_balance,
-                                                            data_balance=data.data_balance
-                                                            )
-                        with open(
-                                os.path.join(self.output_dir, '%s-model%d_part%d' % (self.timestamp, model_cnt, j)),
-                                'wb') as f:
-                            pkl.dump(estimator, f)
-                        if self.task_type in CLS_TASKS:
-                            pred = estimator.predict_proba(x_p2)
-                            n_dim = np.array(pred).shape[1]
-                            if n_dim == 2:
-                                # Binary classificaion
-                                n_dim = 1
-                            # Initialize training matrix for phase 2
-                            if feature_p2 is None:
-                                num_samples = len(train) + len(test)
-                                feature_p2 = np.zeros((num_samples, self.ensemble_size * n_dim))
-                            if n_dim == 1:
-                                feature_p2[test, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = pred[:, 1:2]
-                            else:
-                                feature_p2[test, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = pred
-                        else:
-                            pred = estimator.predict(x_p2).reshape(-1, 1)
-                            n_dim = 1
-                            # Initialize training matrix for phase 2
-                            if feature_p2 is None:
-                                num_samples = len(train) + len(test)
-                                feature_p2 = np.zeros((num_samples, self.ensemble_size * n_dim))
-                            feature_p2[test, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = pred
-                    suc_cnt += 1
+                    members.append((model_cnt, node, config))
                 model_cnt += 1
+
+        # All the base models share the labels, so the folds are computed once and used for every
+        # (model, fold) fit as well as for the training matrix of the meta-learner.
+        y = members[0][1].data[1]
+        self.folds = list(kf.split(np.zeros((len(y), 1)), y))
+
+        # Train basic models using a part of training data; the (model, fold) fits are independent.
+        # Arrays above max_nbytes are memory-mapped once and shared by the worker processes.
+        from joblib import Parallel, delayed
+        preds = Parallel(n_jobs=self.n_jobs, max_nbytes='1M')(
+            delayed(_fit_fold_and_predict)(self.task_type, config, node.data[0], node.data[1], train, test,
+                                           data.enable_balance, data.data_balance,
+                                           os.path.join(self.output_dir,
+                                                        '%s-model%d_part%d' % (self.timestamp, model_cnt, j)))
+            for model_cnt, node, config in members for j, (train, test) in enumerate(self.folds))
+
+        feature_p2 = None
+        for pred_idx, pred in enumerate(preds):
+            suc_cnt, j = divmod(pred_idx, self.kfold)
+            test = self.folds[j][1]
+            if self.task_type in CLS_TASKS:
+                n_dim = np.array(pred).shape[1]
+                if n_dim == 2:
+                    # Binary classificaion
+                    n_dim = 1
+                    pred = pred[:, 1:2]
+            else:
+                pred = pred.reshape(-1, 1)
+                n_dim = 1
+            # Initialize training matrix for phase 2
+            if feature_p2 is None:
+                feature_p2 = np.zeros((len(y), self.ensemble_size * n_dim))
+            feature_p2[test, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = pred
         # Train model for stacking using the other part of training data
         self.meta_learner.fit(feature_p2, y)
         return self
 
     def get_feature(self, data, solvers):
+        # Members sharing an FE pipeline, or a fitted prefix of it, share the transformed test data.
+        transform_cache = dict()
         # Predict the labels via stacking
-        feature_p2 = None
+        model_names, X_list = list(), list()
         model_cnt = 0
-        suc_cnt = 0
         for algo_id in self.stats["include_algorithms"]:
             model_to_eval = self.stats[algo_id]['model_to_eval']
             for idx, (node, config) in enumerate(model_to_eval):
-                test_node = solvers[algo_id].optimizer['fe'].apply(data, node)
                 if self.base_model_mask[model_cnt] == 1:
+                    test_node = solvers[algo_id].optimizer['fe'].apply(data, node, transform_cache=transform_cache)
                     for j in range(self.kfold):
-                        with open(
-                                os.path.join(self.output_dir, '%s-model%d_part%d' % (self.timestamp, model_cnt, j)),
-                                'rb') as f:
-                            estimator = pkl.load(f)
-                        if self.task_type in CLS_TASKS:
-                            pred = estimator.predict_proba(test_node.data[0])
-                            n_dim = np.array(pred).shape[1]
-                            if n_dim == 2:
-                                n_dim = 1
-                            if feature_p2 is None:
-                                num_samples = len(test_node.data[0])
-                                feature_p2 = np.zeros((num_samples, self.ensemble_size * n_dim))
-                            # Get average predictions
-                            if n_dim == 1:
-                                feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = \
-                                    feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] + pred[:,
-                                                                                           1:2] / self.kfold
-                            else:
-                                feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = \
-                                    feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] + pred / self.kfold
-                        else:
-                            pred = estimator.predict(test_node.data[0]).reshape(-1, 1)
-                            n_dim = 1
-                            # Initialize training matrix for phase 2
-                            if feature_p2 is None:
-                                num_samples = len(test_node.data[0])
-                                feature_p2 = np.zeros((num_samples, self.ensemble_size * n_dim))
-                            # Get average predictions
-                            feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] = \
-                                feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] + pred / self.kfold
-                    suc_cnt += 1
+                        model_names.append('%s-model%d_part%d' % (self.timestamp, model_cnt, j))
+                        X_list.append(test_node.data[0])
                 model_cnt += 1
+        preds = self.predict_base_models(model_names, X_list)
+
+        feature_p2 = None
+        for pred_idx, pred in enumerate(preds):
+            # The k fold models of a base model are stored consecutively.
+            suc_cnt = pred_idx // self.kfold
+            if self.task_type in CLS_TASKS:
+                n_dim = np.array(pred).shape[1]
+                if n_dim == 2:
+                    # Binary classificaion
+                    n_dim = 1
+                    pred = pred[:, 1:2]
+            else:
+                pred = pred.reshape(-1, 1)
+                n_dim = 1
+            if feature_p2 is None:
+                num_samples = len(pred)
+                feature_p2 = np.zeros((num_samples, self.ensemble_size * n_dim))
+            # Get average predictions
+            feature_p2[:, suc_cnt * n_dim:(suc_cnt + 1) * n_dim] += pred / self.kfold
         return feature_p2
 
     def predict(self, data, solvers):
@@ -0,0 +1,78 @@
+import os
+import joblib
+import numpy as np
+import pickle as pkl
+from ConfigSpace.hyperparameters import UnParametrizedHyperparameter
+
+from solnml.components.utils.constants import NUMERICAL, MULTICLASS_CLS
+from solnml.components.feature_engineering.transformation_graph import DataNode
+from solnml.components.evaluators.base_evaluator import fetch_predict_estimator
+from solnml.components.ensemble.base_ensemble import BaseEnsembleModel
+from solnml.utils.logging_utils import get_logger
+
+
+def get_node(seed=1, n_rows=90):
+    rng = np.random.RandomState(seed)
+    X = rng.rand(n_rows, 4)
+    y = (X[:, 0] + X[:, 1] > 1).astype(int) + (X[:, 2] > 0.5).astype(int)
+    return DataNode(data=[X, y], feature_type=[NUMERICAL] * 4)
+
+
+def get_config(estimator_id):
+    from solnml.components.models.classification import _classifiers
+    cs = _classifiers[estimator_id].get_hyperparameter_search_space()
+    cs.add_hyperparameter(UnParametrizedHyperparameter('estimator', estimator_id))
+    return cs.get_default_configuration()
+
+
+def get_ensemble(output_dir, n_jobs):
+    # A fitted ensemble reduced to what fit_base_models reads.
+    ensemble = BaseEnsembleModel.__new__(BaseEnsembleModel)
+    ensemble.task_type, ensemble.n_jobs, ensemble.output_dir = MULTICLASS_CLS, n_jobs, output_dir
+    ensemble.logger = get_logger('EnsembleBuilder')
+    return ensemble
+
+
+def spy_joblib(monkeypatch):
+    calls = dict()
+    parallel_backend, parallel = joblib.parallel_backend, joblib.Parallel
+
+    def spy_backend(backend, **kwargs):
+        calls['backend'] = (backend, kwargs)
+        return parallel_backend(backend, **kwargs)
+
+    def spy_parallel(n_jobs=None, **kwargs):
+        calls['n_jobs'] = n_jobs
+        return parallel(n_jobs=n_jobs, **kwargs)
+
+    monkeypatch.setattr(joblib, 'parallel_backend', spy_backend)
+    monkeypatch.setattr(joblib, 'Parallel', spy_parallel)
+    return calls
+
+
+def test_refit_matches_serial_fits(tmp_path, monkeypatch):
+    members = [('model%d' % idx, get_node(seed=idx), get_config(algo_id))
+               for idx, algo_id in enumerate(['random_forest', 'extra_trees', 'random_forest'])]
+    calls = spy_joblib(monkeypatch)
+    get_ensemble(str(tmp_path), n_jobs=4).fit_base_models(members)
+
+    # Up to n_jobs workers, each with an equal share of the CPUs for its own threads.
+    n_workers = min(4, len(members), os.cpu_count() or 1)
+    n_threads = max(1, 4 // n_workers)
+    assert calls['n_jobs'] == n_workers
+    assert calls['backend'] == ('loky', {'inner_max_num_threads': n_threads})
+
+    assert sorted(os.listdir(str(tmp_path))) == ['model0', 'model1', 'model2']
+    for model_name, node, config in members:
+        with open(os.path.join(str(tmp_path), model_name), 'rb') as f:
+            estimator = pkl.load(f)
+        assert estimator.n_jobs == n_threads
+        expected = fetch_predict_estimator(MULTICLASS_CLS, config, node.data[0], node.data[1])
+        X = get_node(seed=10).data[0]
+        np.testing.assert_allclose(estimator.predict_proba(X), expected.predict_proba(X))
+
+
+def test_no_members(tmp_path, monkeypatch):
+    calls = spy_joblib(monkeypatch)
+    get_ensemble(str(tmp_path), n_jobs=4).fit_base_models(list())
+    assert calls == dict() and os.listdir(str(tmp_path)) == list()
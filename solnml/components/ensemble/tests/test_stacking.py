@@ -0,0 +1,68 @@
+import os
+import numpy as np
+import pickle as pkl
+from sklearn.metrics.scorer import balanced_accuracy_scorer
+from ConfigSpace.hyperparameters import UnParametrizedHyperparameter
+
+from solnml.components.utils.constants import NUMERICAL, MULTICLASS_CLS
+from solnml.components.feature_engineering.transformation_graph import DataNode
+from solnml.components.ensemble.stacking import Stacking
+
+
+def get_node(n_rows=90):
+    rng = np.random.RandomState(1)
+    X = rng.rand(n_rows, 4)
+    y = (X[:, 0] + X[:, 1] > 1).astype(int) + (X[:, 2] > 0.5).astype(int)
+    return DataNode(data=[X, y], feature_type=[NUMERICAL] * 4)
+
+
+def get_config(estimator_id):
+    from solnml.components.models.classification import _classifiers
+    cs = _classifiers[estimator_id].get_hyperparameter_search_space()
+    cs.add_hyperparameter(UnParametrizedHyperparameter('estimator', estimator_id))
+    return cs.get_default_configuration()
+
+
+def get_stats(node):
+    algorithms = ['random_forest', 'extra_trees', 'k_nearest_neighbors']
+    stats = {'split_seed': 1, 'include_algorithms': algorithms}
+    for algo_id in algorithms:
+        stats[algo_id] = {'model_to_eval': [(node, get_config(algo_id))]}
+    return stats
+
+
+def fit_stacking(output_dir, n_jobs):
+    node = get_node()
+    os.makedirs(output_dir)
+    stacking = Stacking(get_stats(node), ensemble_size=2, task_type=MULTICLASS_CLS,
+                        metric=balanced_accuracy_scorer, output_dir=output_dir, meta_learner='linear',
+                        kfold=3, n_jobs=n_jobs)
+    return stacking.fit(node)
+
+
+def load_fold_models(stacking):
+    names = sorted(name for name in os.listdir(stacking.output_dir) if '_part' in name)
+    models = list()
+    for name in names:
+        with open(os.path.join(stacking.output_dir, name), 'rb') as f:
+            models.append(pkl.load(f))
+    return models
+
+
+def test_n_jobs_is_forwarded(tmp_path):
+    stacking = fit_stacking(str(tmp_path / 'parallel'), n_jobs=2)
+    assert stacking.n_jobs == 2 and stacking.fetcher.n_worker == 2
+
+
+def test_parallel_fit_matches_serial(tmp_path):
+    serial = fit_stacking(str(tmp_path / 'serial'), n_jobs=1)
+    parallel = fit_stacking(str(tmp_path / 'parallel'), n_jobs=2)
+    X = get_node().data[0]
+
+    serial_models, parallel_models = load_fold_models(serial), load_fold_models(parallel)
+    assert len(serial_models) == len(parallel_models) == 2 * 3
+    # The (model, fold) fits, hence the training matrix of the meta-learner, are the same.
+    for serial_model, parallel_model in zip(serial_models, parallel_models):
+        np.testing.assert_allclose(parallel_model.predict_proba(X), serial_model.predict_proba(X))
+    np.testing.assert_allclose(parallel.meta_learner.coef_, serial.meta_learner.coef_)
+    np.testing.assert_allclose(parallel.meta_learner.intercept_, serial.meta_learner.intercept_)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.cluster import AgglomerativeClustering
+
+from solnml.components.ensemble import unnamed_ensemble
+from solnml.components.ensemble.combined_ensemble import unnamed_ensemble as combined_unnamed_ensemble
+
+
+def get_distribution_features_loop(predictions, interval=20):
+    """The per-(model, class) pd.cut histograms that get_distribution_features replaced."""
+    num_class = predictions.shape[2]
+    bucket = np.arange(interval + 1) / interval
+    distribution = []
+    for prediction in predictions:
+        freq_array = []
+        for i in range(num_class):
+            group = pd.cut(prediction[:, i], bucket, right=False)
+            counts = group.value_counts()
+            freq_array += list(counts / counts.sum())
+        distribution.append(freq_array)
+    return np.array(distribution)
+
+
+def choose_base_models_loop(predictions, num_model, interval=20):
+    """The per-cluster center loop that choose_base_models_classification replaced."""
+    num_total_models = predictions.shape[0]
+    base_mask = [0] * len(predictions)
+    distribution = get_distribution_features_loop(predictions, interval)
+    cluster = AgglomerativeClustering(n_clusters=num_model, linkage="complete").fit(distribution)
+    for cluster_label in range(num_model):
+        cluster_center = np.zeros(distribution.shape[1])
+        count = 0
+        for i in range(num_total_models):
+            if cluster.labels_[i] == cluster_label:
+                count += 1
+                cluster_center += distribution[i]
+        cluster_center = cluster_center / count
+        distances = np.sqrt(np.sum(np.asarray(cluster_center - distribution) ** 2, axis=1))
+        base_mask[distances.argmin()] = 1
+    return base_mask
+
+
+def get_predictions(num_models=12, num_samples=200, num_class=3):
+    rng = np.random.RandomState(1)
+    predictions = rng.rand(num_models, num_samples, num_class)
+    predictions /= predictions.sum(axis=-1, keepdims=True)
+    # Probabilities on the bucket edges, including 1.0, which no right-open bucket holds.
+    predictions[0, :3, 0] = [0., 0.05, 0.5]
+    predictions[1, 0] = [1., 0., 0.]
+    return predictions
+
+
+@pytest.mark.parametrize('module', [unnamed_ensemble, combined_unnamed_ensemble])
+def test_distribution_features_match_pd_cut(module):
+    predictions = get_predictions()
+    for interval in [20, 7]:
+        np.testing.assert_allclose(module.get_distribution_features(predictions, interval),
+                                   get_distribution_features_loop(predictions, interval))
+
+
+@pytest.mark.parametrize('module', [unnamed_ensemble, combined_unnamed_ensemble])
+def test_choose_base_models_matches_loop(module):
+    predictions = get_predictions()
+    assert module.choose_base_models_classification(predictions, 4) == choose_base_models_loop(predictions, 4)
@@ -1,5 +1,4 @@
 import numpy as np
-import pandas as pd
 import scipy.spatial
 from sklearn.metrics.scorer import _BaseScorer
 from solnml.components.utils.constants import CLS_TASKS
@@ -22,44 +21,46 @@ def choose_base_models_regression(predictions, labels, num_model):
     return base_mask
 
 
+def get_distribution_features(predictions, interval=20):
+    """
+    Histogram of the predicted probabilities of every (model, class) pair over `interval`
+    equal-width buckets [k / interval, (k + 1) / interval), normalized per pair.
+
+    :param predictions: Shape: (num_models, num_samples, num_class)
+    :return: Shape: (num_models, interval * num_class)
+    """
+    num_total_models, _, num_class = predictions.shape
+    bucket = np.arange(interval + 1) / interval
+    # Bucket index of every probability; 1.0 falls outside the right-open buckets and is not counted.
+    bucket_idx = np.searchsorted(bucket, predictions, side='right') - 1
+    valid = (bucket_idx >= 0) & (bucket_idx < interval)
+    pair_idx = np.arange(num_total_models)[:, np.newaxis, np.newaxis] * num_class + np.arange(num_class)
+    bins = (np.broadcast_to(pair_idx, predictions.shape) * interval + bucket_idx)[valid]
+    counts = np.bincount(bins, minlength=num_total_models * num_class * interval)
+    counts = counts.reshape(num_total_models, num_class, interval).astype(np.float64)
+    freq = counts / counts.sum(axis=2, keepdims=True)
+    return freq.reshape(num_total_models, num_class * interval)
+
+
 def choose_base_models_classification(predictions, num_model, interval=20):
-    num_class = predictions.shape[2]
+    predictions = np.asarray(predictions)
     num_total_models = predictions.shape[0]
     base_mask = [0] * len(predictions)
-    bucket = np.arange(interval + 1) / interval
-    distribution = []
-    for prediction in predictions:
-        freq_array = []
-        for i in range(num_class):
-            class_i = prediction[:, i]
-            group = pd.cut(class_i, bucket, right=False)
-            counts = group.value_counts()
-            freq = list(counts / counts.sum())
-            freq_array += freq
-        distribution.append(freq_array)  # Shape: (num_total_models,20*num_class)
-    distribution = np.array(distribution)
+    distribution = get_distribution_features(predictions, interval)  # Shape: (num_total_models,20*num_class)
 
     # Apply the clustering algorithm
     model = AgglomerativeClustering(n_clusters=num_model, linkage="complete")
     cluster = model.fit(distribution)
     """
     Select models which are the most nearest to the clustering center
-    selected_models = []
     """
-    for cluster_label in range(num_model):
-        cluster_center = np.zeros(distribution.shape[1])
-        count = 0
-        """
-         Averaging the distribution which belong the same clustering class
-          and then get the corresponding distribution center
-        """
-        for i in range(num_total_models):
-            if cluster.labels_[i] == cluster_label:
-                count += 1
-                cluster_center += distribution[i]
-        cluster_center = cluster_center / count
-        distances = np.sqrt(np.sum(np.asarray(cluster_center - distribution) ** 2, axis=1))
-        selected_model = distances.argmin()
+    # Average the distributions that belong to the same cluster to get the cluster centers.
+    labels = cluster.labels_
+    membership = np.zeros((num_total_models, num_model))
+    membership[np.arange(num_total_models), labels] = 1.
+    cluster_centers = np.dot(membership.T, distribution) / np.bincount(labels, minlength=num_model)[:, np.newaxis]
+    distances = np.sqrt(np.sum((cluster_centers[:, np.newaxis, :] - distribution[np.newaxis, :, :]) ** 2, axis=2))
+    for selected_model in distances.argmin(axis=1):
         base_mask[selected_model] = 1
 
     return base_mask
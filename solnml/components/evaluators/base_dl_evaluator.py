@@ -1,9 +1,15 @@
 import os
+import time
+import heapq
 import torch
 import hashlib
+import itertools
+import numpy as np
 import pickle as pkl
 
 from solnml.components.utils.constants import IMG_CLS, TEXT_CLS, OBJECT_DET
+from solnml.utils.file_utils import atomic_dump
+from solnml.utils.logging_utils import get_logger
 
 
 def get_device(device=None):
@@ -78,12 +84,152 @@ def get_estimator_with_parameters(task_type, config, max_epoch, dataset, timesta
     return model
 
 
+class _TopKIndex(object):
+    """
+    The ranking behind TopKModelSaver, shared by all savers on the same index file and k.
+
+    The process that creates it (the master) owns an in-memory min-heap of the k best
+    (perf, config) entries and applies candidates synchronously, rewriting the index
+    file atomically when the top-k changes. Other processes (workers) only buffer the
+    candidates they produce; the executor returns them with the task result and the
+    master ranks them. Workers filter candidates with a threshold sent by the master,
+    which may be stale but never rejects a model that can enter the top-k.
+    """
+
+    def __init__(self, k, index_path):
+        self.k = k
+        self.index_path = index_path
+        self.owner_pid = os.getpid()
+        self.threshold = -np.inf
+        self.pending = list()
+        self._entries = dict()
+        self._heap = list()
+        self._counter = itertools.count()
+        self.logger = get_logger(self.__module__ + "." + self.__class__.__name__)
+        for config, perf, model_path in TopKModelSaver.load_topk_config(index_path):
+            self._push(config, perf, model_path)
+        self._update_threshold()
+
+    def __getstate__(self):
+        # A copy sent to a worker only carries the threshold; the entries stay in the master.
+        state = self.__dict__.copy()
+        state['_entries'] = dict()
+        state['_heap'] = list()
+        state['pending'] = list()
+        return state
+
+    @property
+    def is_master(self):
+        return os.getpid() == self.owner_pid
+
+    def admits(self, perf):
+        return perf > self.threshold
+
+    def submit(self, config, perf, candidate_path, model_path):
+        if self.is_master:
+            self.apply([(config, perf, candidate_path, model_path)])
+        else:
+            self.pending.append((config, perf, candidate_path, model_path))
+
+    def pop_pending(self):
+        pending, self.pending = self.pending, list()
+        return pending
+
+    def apply(self, candidates):
+        changed = False
+        for candidate in candidates:
+            try:
+                changed |= self._apply(*candidate)
+            except OSError as e:
+                self.logger.error('Failed to update the top-k models: %s' % str(e))
+        if changed:
+            try:
+                self._persist()
+            except OSError as e:
+                self.logger.error('Failed to save the top-k index: %s' % str(e))
+
+    def _push(self, config, perf, model_path):
+        config_id = TopKModelSaver.get_configuration_id(config)
+        seq = next(self._counter)
+        self._entries[config_id] = (perf, seq, config, model_path)
+        heapq.heappush(self._heap, (perf, seq, config_id))
+
+    def _pop_min(self):
+        while self._heap:
+            perf, seq, config_id = heapq.heappop(self._heap)
+            entry = self._entries.get(config_id)
+            # Skip heap items whose entry has been replaced by a better result.
+            if entry is not None and entry[1] == seq:
+                return self._entries.pop(config_id)
+        return None
+
+    def _update_threshold(self):
+        if len(self._entries) < self.k:
+            self.threshold = -np.inf
+            return
+        while self._heap and self._entries.get(self._heap[0][2], (None, None))[1] != self._heap[0][1]:
+            heapq.heappop(self._heap)
+        self.threshold = self._heap[0][0]
+
+    def _apply(self, config, perf, candidate_path, model_path):
+        config_id = TopKModelSaver.get_configuration_id(config)
+        existing = self._entries.get(config_id)
+        if (existing is not None and perf <= existing[0]) or \
+                (existing is None and len(self._entries) >= self.k and perf <= self.threshold):
+            _remove_file(candidate_path)
+            return False
+
+        os.replace(candidate_path, model_path)
+        self._push(config, perf, model_path)
+        while len(self._entries) > self.k:
+            _, _, _, removed_path = self._pop_min()
+            if removed_path != model_path:
+                _remove_file(removed_path)
+        self._update_threshold()
+        return True
+
+    def _persist(self):
+        sorted_list = sorted(((config, perf, model_path) for perf, _, config, model_path in self._entries.values()),
+                             key=lambda item: -item[1])
+        TopKModelSaver.save_topk_config(self.index_path, sorted_list)
+
+
+def _remove_file(path):
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except OSError:
+        pass
+
+
+# Indexes created in this process, one per (index file, k).
+_topk_indexes = dict()
+
+
+def get_topk_index(k, index_path):
+    if (index_path, k) not in _topk_indexes:
+        _topk_indexes[(index_path, k)] = _TopKIndex(k, index_path)
+    return _topk_indexes[(index_path, k)]
+
+
 class TopKModelSaver(object):
+    """
+    Keep the models of the k best configurations of a run in model_dir.
+
+    Evaluators call `admits` before saving a model, save it to `get_candidate_path`
+    and hand (config, perf, candidate path) to `add`. In the master the candidate is
+    ranked immediately; in a worker it is buffered until the executor collects it
+    with `pop_candidates` and passes it to `add_candidates` of the master's saver
+    (see _TopKIndex). The index file keeps the old
+    format: a list of (config, perf, model_path) in descending order of perf.
+    """
+
     def __init__(self, k, model_dir, identifier):
         self.k = k
         self.model_dir = model_dir
         self.identifier = identifier
         self.sorted_list_path = os.path.join(model_dir, '%s_topk_config.pkl' % identifier)
+        self.index = get_topk_index(k, self.sorted_list_path)
 
     @staticmethod
     def get_configuration_id(config):
@@ -102,67 +248,51 @@ class TopKModelSaver(object):
         return '%s_%s.pt' % (identifier, TopKModelSaver.get_configuration_id(config))
 
     @staticmethod
-    def get_topk_config(config_path):
+    def load_topk_config(config_path):
         if not os.path.exists(config_path):
             return list()
         with open(config_path, 'rb') as f:
             configs = pkl.load(f)
         return configs
 
+    @staticmethod
+    def get_topk_config(config_path):
+        # The master ranks candidates synchronously, so the index file is always up to date.
+        return TopKModelSaver.load_topk_config(config_path)
+
     @staticmethod
     def save_topk_config(config_path, configs):
-        with open(config_path, 'wb') as f:
-            pkl.dump(configs, f)
+        atomic_dump(configs, config_path)
+
+    def admits(self, perf: float):
+        """Whether a model with this perf (the larger, the better) may enter the current top-k."""
+        return self.index.admits(perf)
+
+    def get_candidate_path(self, config):
+        return os.path.join(self.model_dir, '%s.%d-%d.candidate' % (
+            self.get_path_by_config(config, self.identifier), os.getpid(), int(time.time() * 1e6)))
 
-    def add(self, config, perf: float):
+    def add(self, config, perf: float, candidate_path):
         """
             perf: the larger, the better.
         :param config:
         :param perf:
+        :param candidate_path: the saved model, moved to its final path if it enters the top-k.
         :return:
         """
+        model_path = os.path.join(self.model_dir, self.get_path_by_config(config, self.identifier))
+        self.index.submit(config, perf, candidate_path, model_path)
 
-        model_path_id = os.path.join(self.model_dir, '%s_%s.pt' % (self.identifier, self.get_configuration_id(config)))
-        model_path_removed = None
-        save_flag, delete_flag = False, False
-        sorted_list = self.get_topk_config(self.sorted_list_path)
-
-        # Update existed configs
-        for sorted_element in sorted_list:
-            if config == sorted_element[0]:
-                if perf > sorted_element[1]:
-                    sorted_list.remove(sorted_element)
-                    for idx, item in enumerate(sorted_list):
-                        if perf > item[1]:
-                            sorted_list.insert(idx, (config, perf, model_path_id))
-                            break
-                        if idx == len(sorted_list) - 1:
-                            sorted_list.append((config, perf, model_path_id))
-                            break
-                    self.save_topk_config(self.sorted_list_path, sorted_list)
-                    return True, model_path_id, False, model_path_removed
-                else:
-                    return False, model_path_id, False, model_path_removed
-
-        if len(sorted_list) == 0:
-            sorted_list.append((config, perf, model_path_id))
-        else:
-            # Sorted list is in a descending order.
-            for idx, item in enumerate(sorted_list):
-                if perf > item[1]:
-                    sorted_list.insert(idx, (config, perf, model_path_id))
-                    break
-                if idx == len(sorted_list) - 1:
-                    sorted_list.append((config, perf, model_path_id))
-                    break
-
-        if len(sorted_list) > self.k:
-            model_path_removed = sorted_list[-1][2]
-            delete_flag = True
-            sorted_list = sorted_list[:-1]
-        if model_path_id in [item[2] for item in sorted_list]:
-            save_flag = True
-
-        self.save_topk_config(self.sorted_list_path, sorted_list)
-
-        return save_flag, model_path_id, delete_flag, model_path_removed
+    def get_threshold(self):
+        return self.index.threshold
+
+    def set_threshold(self, threshold):
+        """Refresh the admission threshold of a worker with the one of the master."""
+        self.index.threshold = threshold
+
+    def pop_candidates(self):
+        """Candidates added in this worker since the last call, as (config, perf, candidate path, model path)."""
+        return self.index.pop_pending()
+
+    def add_candidates(self, candidates):
+        self.index.apply(candidates)
@@ -1,11 +1,16 @@
+import os
+import hashlib
 import warnings
 import numpy as np
+import pickle as pkl
 from abc import ABCMeta
 from collections.abc import Iterable
 from sklearn.utils.testing import ignore_warnings
 from sklearn.exceptions import ConvergenceWarning
 from sklearn.model_selection import KFold, train_test_split
+from solnml.utils.file_utils import atomic_dump
 from solnml.components.metrics.metric import get_metric
+from solnml.components.evaluators.evaluation_cache import get_config_hash
 from solnml.components.utils.constants import *
 
 
@@ -32,7 +37,8 @@ def holdout_validation(estimator, scorer, X, y, train_size=0.3, random_state=1):
         return scorer(estimator, X_test, y_test)
 
 
-def fetch_predict_estimator(task_type, config, X_train, y_train, weight_balance=0, data_balance=0, combined=False):
+def fetch_predict_estimator(task_type, config, X_train, y_train, weight_balance=0, data_balance=0, combined=False,
+                            n_jobs=None):
     # Build the ML estimator.
     from solnml.components.utils.balancing import get_weights, smote
     _fit_params = {}
@@ -52,6 +58,9 @@ def fetch_predict_estimator(task_type, config, X_train, y_train, weight_balance=
     else:
         from solnml.components.evaluators.reg_evaluator import get_estimator
     _, estimator = get_estimator(config_dict)
+    if n_jobs is not None and hasattr(estimator, 'n_jobs'):
+        # Share of the CPUs given to this fit when several models are fit at once.
+        estimator.n_jobs = n_jobs
 
     estimator.fit(X_train, y_train, **_fit_params)
     return estimator
@@ -74,3 +83,22 @@ class _BaseEvaluator(metaclass=ABCMeta):
 
     def __call__(self, *args, **kwargs):
         raise NotImplementedError()
+
+    # Models of iterative estimators kept between the rungs of a multi-fidelity optimizer; the
+    # subclass sets model_dir, timestamp and seed when it enables continue_training.
+    def get_tmp_model_path(self, config, data_node):
+        model_id = hashlib.sha1(('%s-%s-%d' % (get_config_hash(config), data_node.fingerprint,
+                                               self.seed)).encode('utf8')).hexdigest()
+        return os.path.join(self.model_dir, 'tmp_%s_%s.pkl' % (self.timestamp, model_id))
+
+    def load_tmp_model(self, model_path):
+        if not os.path.exists(model_path):
+            return None
+        try:
+            with open(model_path, 'rb') as f:
+                return pkl.load(f)
+        except (EOFError, pkl.UnpicklingError):
+            return None
+
+    def save_tmp_model(self, model_path, estimator):
+        atomic_dump(estimator, model_path)
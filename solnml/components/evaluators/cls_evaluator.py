@@ -1,3 +1,4 @@
+import os
 import sys
 import time
 import traceback
@@ -7,7 +8,16 @@ from sklearn.preprocessing import OneHotEncoder
 
 from solnml.utils.logging_utils import get_logger
 from solnml.components.evaluators.base_evaluator import _BaseEvaluator
-from solnml.components.evaluators.evaluate_func import holdout_validation, cross_validation, partial_validation
+from solnml.components.evaluators.evaluate_func import holdout_validation, cross_validation, partial_validation, \
+    get_fold_n_jobs, iterative_validation
+from solnml.components.evaluators.prediction_store import get_trial_hash
+
+
+def get_estimator_class(classifier_type):
+    from solnml.components.models.classification import _classifiers, _addons
+    if classifier_type in _classifiers:
+        return _classifiers[classifier_type]
+    return _addons.components[classifier_type]
 
 
 def get_estimator(config):
@@ -27,7 +37,8 @@ def get_estimator(config):
 
 class ClassificationEvaluator(_BaseEvaluator):
     def __init__(self, clf_config, scorer=None, data_node=None, name=None,
-                 resampling_strategy='cv', resampling_params=None, seed=1):
+                 resampling_strategy='cv', resampling_params=None, seed=1, eval_cache=None, n_jobs=1,
+                 continue_training=False, model_dir='data/models/', timestamp=None, prediction_store=None):
         self.resampling_strategy = resampling_strategy
         self.resampling_params = resampling_params
         self.hpo_config = clf_config
@@ -37,9 +48,27 @@ class ClassificationEvaluator(_BaseEvaluator):
         self.seed = seed
         self.eval_id = 0
         self.onehot_encoder = None
+        # Optional EvaluationCache shared across pulls, brackets and processes.
+        self.eval_cache = eval_cache
+        # CPU budget for fitting folds concurrently under cv, shared with the other running trials;
+        # -1 uses all CPUs.
+        self.n_jobs = n_jobs
+        self.n_concurrent_trials = 1
         self.logger = get_logger(self.__module__ + "." + self.__class__.__name__)
 
-        self.continue_training = False
+        # Resource as iterations (enabled by SecondLayerBandit for partial evaluation): iterative estimators
+        # promoted to the next rung continue training from the model saved at the previous rung.
+        # These estimators are always evaluated on a holdout split, whatever the resampling strategy.
+        self.continue_training = continue_training
+        self.model_dir = model_dir
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        if self.continue_training and not os.path.exists(self.model_dir):
+            os.makedirs(self.model_dir, exist_ok=True)
+        if self.continue_training and 'cv' in self.resampling_strategy:
+            self.logger.warning('continue_training evaluates iterative estimators on a holdout split '
+                                'instead of the %s strategy.' % self.resampling_strategy)
+        # Optional PredictionStore that keeps the validation predictions of full-fidelity trials for ensembling.
+        self.prediction_store = prediction_store
 
     def get_fit_params(self, y, estimator):
         from solnml.components.utils.balancing import get_weights
@@ -67,6 +96,29 @@ class ClassificationEvaluator(_BaseEvaluator):
         else:
             data_node = self.data_node
 
+        save_pred = self.prediction_store is not None and downsample_ratio == 1
+        trial_hash = get_trial_hash(data_node, config) if save_pred else None
+
+        # The next rung of an iterative estimator resumes from its saved model, so a cached
+        # low-fidelity score is only enough if that model exists.
+        iterative = self.continue_training and hasattr(get_estimator_class(config['estimator']), 'iterative_fit')
+        tmp_model_path = self.get_tmp_model_path(config, data_node) if iterative else None
+        needs_tmp_model = iterative and downsample_ratio != 1.0 and not os.path.exists(tmp_model_path)
+
+        cache_key = None
+        if self.eval_cache is not None:
+            # The resource ratio only changes the result under partial validation or iteration fidelity.
+            cache_ratio = downsample_ratio if 'partial' in self.resampling_strategy or self.continue_training else 1.0
+            cache_key = self.eval_cache.make_key(data_node, config, cache_ratio,
+                                                 self.resampling_strategy, self.resampling_params,
+                                                 extra=(str(self.scorer), self.seed))
+            cached_score = self.eval_cache.get(cache_key)
+            # A cached score is only enough if the predictions of the trial are stored as well.
+            if cached_score is not None and not needs_tmp_model and \
+                    (trial_hash is None or trial_hash in self.prediction_store):
+                self.eval_id += 1
+                return cached_score
+
         X_train, y_train = data_node.data
 
         config_dict = config.get_dictionary().copy()
@@ -92,8 +144,24 @@ class ClassificationEvaluator(_BaseEvaluator):
             y = np.reshape(y_train, (len(y_train), 1))
             self.onehot_encoder.fit(y)
 
+        if iterative and not kwargs.get('first_iter', False):
+            clf = self.load_tmp_model(tmp_model_path) or clf
+
         try:
-            if 'cv' in self.resampling_strategy:
+            if iterative:
+                if self.resampling_params is None or 'test_size' not in self.resampling_params:
+                    test_size = 0.33
+                else:
+                    test_size = self.resampling_params['test_size']
+                score = iterative_validation(clf, self.scorer, X_train, y_train, downsample_ratio,
+                                             test_size=test_size,
+                                             random_state=self.seed,
+                                             if_stratify=True,
+                                             onehot=self.onehot_encoder if isinstance(self.scorer,
+                                                                                      _ThresholdScorer) else None,
+                                             fit_params=fit_params,
+                                             return_pred=save_pred)
+            elif 'cv' in self.resampling_strategy:
                 if self.resampling_params is None or 'folds' not in self.resampling_params:
                     folds = 5
                 else:
@@ -104,7 +172,9 @@ class ClassificationEvaluator(_BaseEvaluator):
                                          if_stratify=True,
                                          onehot=self.onehot_encoder if isinstance(self.scorer,
                                                                                   _ThresholdScorer) else None,
-                                         fit_params=fit_params)
+                                         fit_params=fit_params,
+                                         n_jobs=get_fold_n_jobs(folds, self.n_jobs, self.n_concurrent_trials),
+                                         return_pred=save_pred)
             elif 'holdout' in self.resampling_strategy:
                 if self.resampling_params is None or 'test_size' not in self.resampling_params:
                     test_size = 0.33
@@ -116,7 +186,8 @@ class ClassificationEvaluator(_BaseEvaluator):
                                            if_stratify=True,
                                            onehot=self.onehot_encoder if isinstance(self.scorer,
                                                                                     _ThresholdScorer) else None,
-                                           fit_params=fit_params)
+                                           fit_params=fit_params,
+                                           return_pred=save_pred)
             elif 'partial' in self.resampling_strategy:
                 if self.resampling_params is None or 'test_size' not in self.resampling_params:
                     test_size = 0.33
@@ -128,9 +199,13 @@ class ClassificationEvaluator(_BaseEvaluator):
                                            if_stratify=True,
                                            onehot=self.onehot_encoder if isinstance(self.scorer,
                                                                                     _ThresholdScorer) else None,
-                                           fit_params=fit_params)
+                                           fit_params=fit_params,
+                                           return_pred=save_pred)
             else:
                 raise ValueError('Invalid resampling strategy: %s!' % self.resampling_strategy)
+            if save_pred:
+                score, (valid_index, valid_pred) = score
+                self.prediction_store.save(trial_hash, valid_index, valid_pred)
         except Exception as e:
             print(self.name)
             print(config)
@@ -147,6 +222,13 @@ class ClassificationEvaluator(_BaseEvaluator):
                            time.time() - start_time, X_train.shape))
         self.eval_id += 1
 
+        # Keep the partially trained model for the next rung.
+        if iterative and np.isfinite(score) and downsample_ratio != 1.0:
+            self.save_tmp_model(tmp_model_path, clf)
+
+        if cache_key is not None and np.isfinite(score):
+            self.eval_cache.set(cache_key, -score)
+
         # Turn it into a minimization problem.
         return_dict['score'] = -score
         return -score
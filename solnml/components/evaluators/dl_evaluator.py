@@ -3,7 +3,6 @@ import time
 import copy
 import torch
 import numpy as np
-from multiprocessing import Lock
 from math import ceil
 from sklearn.metrics.scorer import accuracy_scorer
 
@@ -98,30 +97,17 @@ class DLEvaluator(_BaseEvaluator):
                      'early_stop': estimator.early_stop}
             torch.save(state, config_model_path)
 
-        # Save top K models with the largest validation scores.
-        if 'rw_lock' not in kwargs or kwargs['rw_lock'] is None:
-            self.logger.info('rw_lock not defined! Possible read-write conflicts may happen!')
-        lock = kwargs.get('rw_lock', Lock())
-        lock.acquire()
-        if np.isfinite(score):
-            save_flag, model_path, delete_flag, model_path_deleted = self.topk_model_saver.add(config, score)
-            if save_flag is True:
-                state = {'model': estimator.model.state_dict(),
-                         'optimizer': estimator.optimizer_.state_dict(),
-                         'scheduler': estimator.scheduler.state_dict(),
-                         'epoch_num': estimator.epoch_num,
-                         'early_stop': estimator.early_stop}
-                torch.save(state, model_path)
-                self.logger.info("Model saved to %s" % model_path)
-
-            # In case of double-deletion
-            try:
-                if delete_flag and os.path.exists(model_path_deleted):
-                    os.remove(model_path_deleted)
-                    self.logger.info("Model deleted from %s" % model_path)
-            except:
-                pass
-        lock.release()
+        # Save top K models with the largest validation scores. The saver's master process
+        # decides on the ranking; a model is only written if it may enter the current top-k.
+        if np.isfinite(score) and self.topk_model_saver.admits(score):
+            state = {'model': estimator.model.state_dict(),
+                     'optimizer': estimator.optimizer_.state_dict(),
+                     'scheduler': estimator.scheduler.state_dict(),
+                     'epoch_num': estimator.epoch_num,
+                     'early_stop': estimator.early_stop}
+            candidate_path = self.topk_model_saver.get_candidate_path(config)
+            torch.save(state, candidate_path)
+            self.topk_model_saver.add(config, score, candidate_path)
 
         # Turn it into a minimization problem.
         return_dict['score'] = -score
@@ -1,5 +1,9 @@
+import os
+import copy
+import hashlib
 import warnings
 import numpy as np
+from collections import OrderedDict
 from sklearn.model_selection import StratifiedKFold, KFold, StratifiedShuffleSplit, ShuffleSplit
 from sklearn.utils.testing import ignore_warnings
 from sklearn.exceptions import ConvergenceWarning
@@ -12,36 +16,112 @@ def get_onehot_y(encoder, y):
     return encoder.transform(y_).toarray()
 
 
+# Fold indices per (labels, n_fold, shuffle, stratify, seed); the folds only depend on y and its length.
+_fold_cache = OrderedDict()
+_FOLD_CACHE_SIZE = 16
+
+
+def _get_label_key(y):
+    y = np.asarray(y)
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(('%s-%s' % (y.shape, y.dtype)).encode('utf8'))
+    hasher.update(np.ascontiguousarray(y).data if y.dtype != object else str(y.tolist()).encode('utf8'))
+    return hasher.hexdigest()
+
+
+def get_fold_indices(y, n_fold=5, shuffle=True, if_stratify=True, random_state=1):
+    """Return the cached list of (train_idx, valid_idx) pairs for this labelling."""
+    key = (_get_label_key(y), n_fold, shuffle, if_stratify, random_state)
+    if key in _fold_cache:
+        _fold_cache.move_to_end(key)
+        return _fold_cache[key]
+    if if_stratify:
+        kfold = StratifiedKFold(n_splits=n_fold, random_state=random_state, shuffle=shuffle)
+    else:
+        kfold = KFold(n_splits=n_fold, random_state=random_state, shuffle=shuffle)
+    folds = list(kfold.split(np.zeros(len(y)), y))
+    _fold_cache[key] = folds
+    while len(_fold_cache) > _FOLD_CACHE_SIZE:
+        _fold_cache.popitem(last=False)
+    return folds
+
+
+def get_fold_n_jobs(n_fold, n_jobs=1, n_concurrent_trials=1):
+    """
+    Number of folds to fit concurrently.
+
+    n_jobs is the CPU budget shared by all trials that run concurrently, and each trial
+    takes an equal share of it; a negative n_jobs stands for the CPU count of the machine.
+    """
+    if n_jobs is None or n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    return max(1, min(n_fold, n_jobs // max(1, n_concurrent_trials)))
+
+
+def get_valid_predictions(estimator, X):
+    """Predictions kept for ensemble building: class probabilities for classifiers, values for regressors."""
+    if hasattr(estimator, 'predict_proba'):
+        return estimator.predict_proba(X)
+    return estimator.predict(X)
+
+
+def _fit_and_score_fold(estimator, scorer, X, y, train_idx, valid_idx, fit_params=None, onehot=None,
+                        return_pred=False):
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore")
+        train_x, valid_x = X[train_idx], X[valid_idx]
+        train_y, valid_y = y[train_idx], y[valid_idx]
+        _fit_params = dict()
+        if fit_params:
+            if 'sample_weight' in fit_params:
+                _fit_params['sample_weight'] = fit_params['sample_weight'][train_idx]
+            elif 'data_balance' in fit_params:
+                train_x, train_y = smote(train_x, train_y)
+        estimator.fit(train_x, train_y, **_fit_params)
+        if onehot is not None:
+            valid_y = get_onehot_y(onehot, valid_y)
+        score = scorer(estimator, valid_x, valid_y)
+        if return_pred:
+            return score, get_valid_predictions(estimator, valid_x)
+        return score
+
+
 @ignore_warnings(category=ConvergenceWarning)
 def cross_validation(estimator, scorer, X, y, n_fold=5, shuffle=True, fit_params=None, if_stratify=True,
-                     onehot=None, random_state=1):
+                     onehot=None, random_state=1, n_jobs=1, return_pred=False):
+    """
+    :param return_pred: if True, return (score, (index, pred)) with the out-of-fold predictions
+        of all samples instead of the score only.
+    """
     with warnings.catch_warnings():
         # ignore all caught warnings
         warnings.filterwarnings("ignore")
-        if if_stratify:
-            kfold = StratifiedKFold(n_splits=n_fold, random_state=random_state, shuffle=shuffle)
+        folds = get_fold_indices(y, n_fold=n_fold, shuffle=shuffle, if_stratify=if_stratify,
+                                 random_state=random_state)
+        if n_jobs == 1:
+            results = [_fit_and_score_fold(estimator, scorer, X, y, train_idx, valid_idx, fit_params, onehot,
+                                           return_pred)
+                       for train_idx, valid_idx in folds]
         else:
-            kfold = KFold(n_splits=n_fold, random_state=random_state, shuffle=shuffle)
-        scores = list()
-        for train_idx, valid_idx in kfold.split(X, y):
-            train_x, valid_x = X[train_idx], X[valid_idx]
-            train_y, valid_y = y[train_idx], y[valid_idx]
-            _fit_params = dict()
-            if fit_params:
-                if 'sample_weight' in fit_params:
-                    _fit_params['sample_weight'] = fit_params['sample_weight'][train_idx]
-                elif 'data_balance' in fit_params:
-                    X_train, y_train = smote(X_train, y_train)
-            estimator.fit(train_x, train_y, **_fit_params)
-            if onehot is not None:
-                valid_y = get_onehot_y(onehot, valid_y)
-            scores.append(scorer(estimator, valid_x, valid_y))
-        return np.mean(scores)
+            from joblib import Parallel, delayed
+            fold_estimator = copy.deepcopy(estimator)
+            # The folds already use the CPU budget of this evaluation.
+            if hasattr(fold_estimator, 'n_jobs'):
+                setattr(fold_estimator, 'n_jobs', 1)
+            results = Parallel(n_jobs=n_jobs)(
+                delayed(_fit_and_score_fold)(copy.deepcopy(fold_estimator), scorer, X, y,
+                                             train_idx, valid_idx, fit_params, onehot, return_pred)
+                for train_idx, valid_idx in folds)
+        if not return_pred:
+            return np.mean(results)
+        scores, preds = zip(*results)
+        index = np.concatenate([valid_idx for _, valid_idx in folds])
+        return np.mean(scores), (index, np.concatenate(preds))
 
 
 @ignore_warnings(category=ConvergenceWarning)
 def holdout_validation(estimator, scorer, X, y, test_size=0.33, fit_params=None, if_stratify=True, onehot=None,
-                       random_state=1):
+                       random_state=1, return_pred=False):
     with warnings.catch_warnings():
         # ignore all caught warnings
         warnings.filterwarnings("ignore")
@@ -61,41 +141,128 @@ def holdout_validation(estimator, scorer, X, y, test_size=0.33, fit_params=None,
             estimator.fit(X_train, y_train, **_fit_params)
             if onehot is not None:
                 y_test = get_onehot_y(onehot, y_test)
-            return scorer(estimator, X_test, y_test)
+            score = scorer(estimator, X_test, y_test)
+            if return_pred:
+                return score, (test_index, get_valid_predictions(estimator, X_test))
+            return score
+
+
+# Holdout split and nested subsample order per (labels, test_size, stratify, seed).
+_subsample_cache = OrderedDict()
+
+
+def get_nested_subsample_indices(y, test_size=0.33, if_stratify=True, random_state=1):
+    """
+    Split the data into train/test once and fix a subsampling order of the training part.
+
+    Every prefix of `order` is a random (and, if stratified, class-balanced) subsample
+    of the training split. Taking the first ceil(ratio * n) indices therefore yields
+    nested subsets: the subset used at a lower resource ratio is contained in the one
+    used at a higher ratio, and all trials on the same data see the same subsets.
+    :return: train_index, test_index, order
+    """
+    key = (_get_label_key(y), test_size, if_stratify, random_state)
+    if key in _subsample_cache:
+        _subsample_cache.move_to_end(key)
+        return _subsample_cache[key]
+
+    if if_stratify:
+        ss = StratifiedShuffleSplit(n_splits=1, test_size=test_size, random_state=random_state)
+    else:
+        ss = ShuffleSplit(n_splits=1, test_size=test_size, random_state=random_state)
+    train_index, test_index = next(ss.split(np.zeros(len(y)), y))
+
+    rng = np.random.RandomState(random_state)
+    if if_stratify:
+        # Spread each class evenly over the order, so that every prefix keeps the class ratios.
+        y_train = np.asarray(y)[train_index]
+        keys = np.empty(len(train_index))
+        for label in np.unique(y_train):
+            class_idx = np.where(y_train == label)[0]
+            class_idx = class_idx[rng.permutation(len(class_idx))]
+            keys[class_idx] = (np.arange(len(class_idx)) + rng.uniform(size=len(class_idx))) / len(class_idx)
+        order = train_index[np.argsort(keys, kind='mergesort')]
+    else:
+        order = train_index[rng.permutation(len(train_index))]
+
+    _subsample_cache[key] = (train_index, test_index, order)
+    while len(_subsample_cache) > _FOLD_CACHE_SIZE:
+        _subsample_cache.popitem(last=False)
+    return train_index, test_index, order
 
 
 @ignore_warnings(category=ConvergenceWarning)
 def partial_validation(estimator, scorer, X, y, data_subsample_ratio, test_size=0.33, fit_params=None, if_stratify=True,
-                       onehot=None, random_state=1):
+                       onehot=None, random_state=1, return_pred=False):
     with warnings.catch_warnings():
         # ignore all caught warnings
         warnings.filterwarnings("ignore")
-        if if_stratify:
-            ss = StratifiedShuffleSplit(n_splits=1, test_size=test_size, random_state=random_state)
+        train_index, test_index, order = get_nested_subsample_indices(y, test_size=test_size,
+                                                                      if_stratify=if_stratify,
+                                                                      random_state=random_state)
+        if data_subsample_ratio == 1:
+            _train_index = train_index
         else:
-            ss = ShuffleSplit(n_splits=1, test_size=test_size, random_state=random_state)
-        for train_index, test_index in ss.split(X, y):
-            X_train, X_test = X[train_index], X[test_index]
-            y_train, y_test = y[train_index], y[test_index]
-            _fit_params = dict()
-            _test_index = train_index
-            if data_subsample_ratio == 1:
-                _X_train, _y_train = X_train, y_train
-            else:
-                if if_stratify:
-                    down_ss = StratifiedShuffleSplit(n_splits=1, test_size=data_subsample_ratio,
-                                                     random_state=random_state)
-                else:
-                    down_ss = ShuffleSplit(n_splits=1, test_size=data_subsample_ratio, random_state=random_state)
-                for _, _test_index in down_ss.split(X_train, y_train):
-                    _X_train, _y_train = X_train[_test_index], y_train[_test_index]
+            n_subsample = max(1, int(np.ceil(data_subsample_ratio * len(order))))
+            _train_index = order[:n_subsample]
+        _X_train, _y_train = X[_train_index], y[_train_index]
+        X_test, y_test = X[test_index], y[test_index]
 
-            if fit_params:
-                if 'sample_weight' in fit_params:
-                    _fit_params['sample_weight'] = fit_params['sample_weight'][_test_index]
-                elif 'data_balance' in fit_params:
-                    _X_train, _y_train = smote(_X_train, _y_train)
-            estimator.fit(_X_train, _y_train, **_fit_params)
-            if onehot is not None:
-                y_test = get_onehot_y(onehot, y_test)
-            return scorer(estimator, X_test, y_test)
+        _fit_params = dict()
+        if fit_params:
+            if 'sample_weight' in fit_params:
+                _fit_params['sample_weight'] = fit_params['sample_weight'][_train_index]
+            elif 'data_balance' in fit_params:
+                _X_train, _y_train = smote(_X_train, _y_train)
+        estimator.fit(_X_train, _y_train, **_fit_params)
+        if onehot is not None:
+            y_test = get_onehot_y(onehot, y_test)
+        score = scorer(estimator, X_test, y_test)
+        if return_pred:
+            return score, (test_index, get_valid_predictions(estimator, X_test))
+        return score
+
+
+def get_iteration_budget(estimator, resource_ratio):
+    """Number of boosting rounds/trees an iterative estimator gets at this resource ratio."""
+    return max(1, int(np.ceil(estimator.get_max_iter() * resource_ratio)))
+
+
+@ignore_warnings(category=ConvergenceWarning)
+def iterative_validation(estimator, scorer, X, y, resource_ratio, test_size=0.33, fit_params=None,
+                         if_stratify=True, onehot=None, random_state=1, return_pred=False):
+    """
+    Holdout validation that treats the resource as the number of iterations.
+
+    The estimator needs iterative_fit, get_max_iter and get_current_iter. If it was
+    already fitted at a lower resource ratio, training continues from its current
+    iteration instead of starting from scratch.
+    """
+    with warnings.catch_warnings():
+        # ignore all caught warnings
+        warnings.filterwarnings("ignore")
+        train_index, test_index, _ = get_nested_subsample_indices(y, test_size=test_size,
+                                                                  if_stratify=if_stratify,
+                                                                  random_state=random_state)
+        X_train, y_train = X[train_index], y[train_index]
+        X_test, y_test = X[test_index], y[test_index]
+        sample_weight = None
+        if fit_params:
+            if 'sample_weight' in fit_params:
+                sample_weight = fit_params['sample_weight'][train_index]
+            elif 'data_balance' in fit_params:
+                X_train, y_train = smote(X_train, y_train)
+
+        n_iter = get_iteration_budget(estimator, resource_ratio)
+        current_iter = estimator.get_current_iter()
+        if current_iter == 0:
+            estimator.iterative_fit(X_train, y_train, sample_weight=sample_weight, n_iter=n_iter, refit=True)
+        else:
+            if n_iter > current_iter:
+                estimator.iterative_fit(X_train, y_train, sample_weight=sample_weight, n_iter=n_iter - current_iter)
+        if onehot is not None:
+            y_test = get_onehot_y(onehot, y_test)
+        score = scorer(estimator, X_test, y_test)
+        if return_pred:
+            return score, (test_index, get_valid_predictions(estimator, X_test))
+        return score
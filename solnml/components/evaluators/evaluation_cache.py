@@ -0,0 +1,76 @@
+import os
+import pickle as pkl
+import hashlib
+from collections import OrderedDict
+
+from solnml.utils.file_utils import atomic_dump
+
+
+def get_config_hash(config):
+    """Hash of a configuration that does not depend on the insertion order of its values."""
+    if config is None:
+        return 'none'
+    config_dict = config.get_dictionary() if hasattr(config, 'get_dictionary') else dict(config)
+    canonical = ','.join('%s=%r' % (key, config_dict[key]) for key in sorted(config_dict))
+    return hashlib.sha1(canonical.encode('utf8')).hexdigest()
+
+
+class EvaluationCache(object):
+    """
+    Memo cache for evaluation results: an in-memory LRU in front of an optional
+    on-disk store shared by all processes that point at the same directory.
+    """
+
+    def __init__(self, cache_dir=None, max_size=10000):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if self.cache_dir is not None and not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(data_node, config, resource_ratio, resampling_strategy, resampling_params=None, extra=None):
+        fingerprint = '%s-%s-%s' % (data_node.fingerprint, data_node.enable_balance, data_node.data_balance)
+        items = [fingerprint, get_config_hash(config), '%.6f' % float(resource_ratio),
+                 str(resampling_strategy), get_config_hash(resampling_params), str(extra)]
+        return hashlib.sha1('|'.join(items).encode('utf8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, '%s.pkl' % key)
+
+    def get(self, key, default=None):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+        if self.cache_dir is not None and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), 'rb') as f:
+                    value = pkl.load(f)
+            except (EOFError, pkl.UnpicklingError):
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        self._remember(key, value)
+        if self.cache_dir is not None:
+            atomic_dump(value, self._path(key))
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._memory or (self.cache_dir is not None and os.path.exists(self._path(key)))
+
+    def __len__(self):
+        return len(self._memory)
@@ -0,0 +1,62 @@
+import os
+import hashlib
+import numpy as np
+
+from solnml.utils.file_utils import atomic_dump
+from solnml.components.evaluators.evaluation_cache import get_config_hash
+
+
+def get_trial_hash(data_node, config):
+    """Identifier of a trial: the data it was evaluated on and the configuration of the estimator."""
+    fingerprint = '%s-%s-%s' % (data_node.fingerprint, data_node.enable_balance, data_node.data_balance)
+    return hashlib.sha1(('%s|%s' % (fingerprint, get_config_hash(config))).encode('utf8')).hexdigest()
+
+
+class PredictionStore(object):
+    """
+    Validation predictions of evaluated trials, kept so that ensembles can be built
+    without refitting their members.
+
+    Each trial is stored as <store_dir>/<trial hash>.npz with the indices of the
+    predicted samples (holdout or out-of-fold) and the float32 predictions.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        if not os.path.exists(self.store_dir):
+            os.makedirs(self.store_dir, exist_ok=True)
+
+    def _path(self, trial_hash):
+        return os.path.join(self.store_dir, '%s.npz' % trial_hash)
+
+    def save(self, trial_hash, index, pred):
+        arrays = {'index': np.asarray(index, dtype=np.int64), 'pred': np.asarray(pred, dtype=np.float32)}
+        atomic_dump(arrays, self._path(trial_hash), dump_func=lambda arrays, f: np.savez(f, **arrays))
+
+    def load(self, trial_hash):
+        """:return: (index, pred), or None if the trial has no stored predictions."""
+        if not os.path.exists(self._path(trial_hash)):
+            return None
+        try:
+            with np.load(self._path(trial_hash)) as stored:
+                return stored['index'], stored['pred']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def load_rows(self, trial_hash, sample_index):
+        """Stored predictions of the given samples, or None if any of them was not predicted."""
+        stored = self.load(trial_hash)
+        if stored is None:
+            return None
+        index, pred = stored
+        sample_index = np.asarray(sample_index)
+        n_samples = max(index.max(initial=-1), sample_index.max(initial=-1)) + 1
+        rows = np.full(n_samples, -1, dtype=np.int64)
+        rows[index] = np.arange(len(index))
+        rows = rows[sample_index]
+        if (rows < 0).any():
+            return None
+        return pred[rows]
+
+    def __contains__(self, trial_hash):
+        return os.path.exists(self._path(trial_hash))
@@ -1,8 +1,18 @@
+import os
 import time
 import numpy as np
 from solnml.utils.logging_utils import get_logger
 from solnml.components.evaluators.base_evaluator import _BaseEvaluator
-from solnml.components.evaluators.evaluate_func import holdout_validation, cross_validation, partial_validation
+from solnml.components.evaluators.evaluate_func import holdout_validation, cross_validation, partial_validation, \
+    get_fold_n_jobs, iterative_validation
+from solnml.components.evaluators.prediction_store import get_trial_hash
+
+
+def get_estimator_class(regressor_type):
+    from solnml.components.models.regression import _regressors, _addons
+    if regressor_type in _regressors:
+        return _regressors[regressor_type]
+    return _addons.components[regressor_type]
 
 
 def get_estimator(config):
@@ -23,7 +33,8 @@ def get_estimator(config):
 class RegressionEvaluator(_BaseEvaluator):
     def __init__(self, reg_config, scorer=None, data_node=None, name=None,
                  resampling_strategy='holdout', resampling_params=None, seed=1,
-                 estimator=None):
+                 estimator=None, n_jobs=1, continue_training=False, model_dir='data/models/', timestamp=None,
+                 prediction_store=None):
         self.hpo_config = reg_config
         self.scorer = scorer
         self.data_node = data_node
@@ -33,8 +44,20 @@ class RegressionEvaluator(_BaseEvaluator):
         self.resampling_params = resampling_params
         self.seed = seed
         self.eval_id = 0
+        # CPU budget for fitting folds concurrently under cv, shared with the other running trials;
+        # -1 uses all CPUs.
+        self.n_jobs = n_jobs
+        self.n_concurrent_trials = 1
         self.logger = get_logger(self.__module__ + "." + self.__class__.__name__)
-        self.continue_training = False
+        # Resource as iterations, as in ClassificationEvaluator: iterative estimators promoted to the
+        # next rung continue training from the model saved at the previous rung, on a holdout split.
+        self.continue_training = continue_training
+        self.model_dir = model_dir
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        if self.continue_training and not os.path.exists(self.model_dir):
+            os.makedirs(self.model_dir, exist_ok=True)
+        # Optional PredictionStore that keeps the validation predictions of full-fidelity trials for ensembling.
+        self.prediction_store = prediction_store
 
     def __call__(self, config, **kwargs):
         start_time = time.time()
@@ -60,8 +83,25 @@ class RegressionEvaluator(_BaseEvaluator):
 
         config_dict = config.get_dictionary().copy()
         regressor_id, reg = get_estimator(config_dict)
+        save_pred = self.prediction_store is not None and downsample_ratio == 1
+
+        iterative = self.continue_training and hasattr(get_estimator_class(config['estimator']), 'iterative_fit')
+        tmp_model_path = self.get_tmp_model_path(config, data_node) if iterative else None
+        if iterative and not kwargs.get('first_iter', False):
+            reg = self.load_tmp_model(tmp_model_path) or reg
+
         try:
-            if self.resampling_strategy == 'cv':
+            if iterative:
+                if self.resampling_params is None or 'test_size' not in self.resampling_params:
+                    test_size = 0.33
+                else:
+                    test_size = self.resampling_params['test_size']
+                score = iterative_validation(reg, self.scorer, X_train, y_train, downsample_ratio,
+                                             test_size=test_size,
+                                             random_state=self.seed,
+                                             if_stratify=False,
+                                             return_pred=save_pred)
+            elif self.resampling_strategy == 'cv':
                 if self.resampling_params is None or 'folds' not in self.resampling_params:
                     folds = 5
                 else:
@@ -69,7 +109,9 @@ class RegressionEvaluator(_BaseEvaluator):
                 score = cross_validation(reg, self.scorer, X_train, y_train,
                                          n_fold=folds,
                                          random_state=self.seed,
-                                         if_stratify=False)
+                                         if_stratify=False,
+                                         n_jobs=get_fold_n_jobs(folds, self.n_jobs, self.n_concurrent_trials),
+                                         return_pred=save_pred)
             elif self.resampling_strategy == 'holdout':
                 if self.resampling_params is None or 'test_size' not in self.resampling_params:
                     test_size = 0.33
@@ -78,7 +120,8 @@ class RegressionEvaluator(_BaseEvaluator):
                 score = holdout_validation(reg, self.scorer, X_train, y_train,
                                            test_size=test_size,
                                            random_state=self.seed,
-                                           if_stratify=False)
+                                           if_stratify=False,
+                                           return_pred=save_pred)
             elif self.resampling_strategy == 'partial':
                 if self.resampling_params is None or 'test_size' not in self.resampling_params:
                     test_size = 0.33
@@ -87,9 +130,13 @@ class RegressionEvaluator(_BaseEvaluator):
                 score = partial_validation(reg, self.scorer, X_train, y_train, downsample_ratio,
                                            test_size=test_size,
                                            random_state=self.seed,
-                                           if_stratify=False)
+                                           if_stratify=False,
+                                           return_pred=save_pred)
             else:
                 raise ValueError('Invalid resampling strategy: %s!' % self.resampling_strategy)
+            if save_pred:
+                score, (valid_index, valid_pred) = score
+                self.prediction_store.save(get_trial_hash(data_node, config), valid_index, valid_pred)
         except Exception as e:
             if self.name == 'fe':
                 raise e
@@ -103,6 +150,10 @@ class RegressionEvaluator(_BaseEvaluator):
                           )
         self.eval_id += 1
 
+        # Keep the partially trained model for the next rung.
+        if iterative and np.isfinite(score) and downsample_ratio != 1.0:
+            self.save_tmp_model(tmp_model_path, reg)
+
         # Turn it into a minimization problem.
         return_dict['score'] = -score
         return -score
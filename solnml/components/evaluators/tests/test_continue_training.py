@@ -0,0 +1,101 @@
+import os
+import numpy as np
+import pytest
+from ConfigSpace.hyperparameters import UnParametrizedHyperparameter
+
+from solnml.components.utils.constants import NUMERICAL
+from solnml.components.metrics.metric import get_metric
+from solnml.components.feature_engineering.transformation_graph import DataNode
+from solnml.components.evaluators.cls_evaluator import ClassificationEvaluator
+from solnml.components.evaluators.reg_evaluator import RegressionEvaluator
+from solnml.components.evaluators.evaluate_func import get_iteration_budget
+
+
+def get_node(regression=False, n_rows=90):
+    rng = np.random.RandomState(1)
+    X = rng.rand(n_rows, 4)
+    y = X[:, 0] + X[:, 1] if regression else (X[:, 0] + X[:, 1] > 1).astype(int)
+    return DataNode(data=[X, y], feature_type=[NUMERICAL] * 4)
+
+
+def get_config(estimator_class, estimator_id):
+    cs = estimator_class.get_hyperparameter_search_space()
+    cs.add_hyperparameter(UnParametrizedHyperparameter('estimator', estimator_id))
+    return cs.get_default_configuration()
+
+
+def spy_iterative_fit(monkeypatch, estimator_class):
+    calls = list()
+    iterative_fit = estimator_class.iterative_fit
+
+    def spy(self, X, y, sample_weight=None, n_iter=1, refit=False):
+        calls.append((n_iter, refit))
+        return iterative_fit(self, X, y, sample_weight=sample_weight, n_iter=n_iter, refit=refit)
+
+    monkeypatch.setattr(estimator_class, 'iterative_fit', spy)
+    return calls
+
+
+def test_promoted_config_resumes_from_rung_model(tmp_path, monkeypatch):
+    from solnml.components.models.classification.random_forest import RandomForest
+    node, config = get_node(), get_config(RandomForest, 'random_forest')
+    evaluator = ClassificationEvaluator(config, data_node=node, name='hpo', resampling_strategy='partial',
+                                        continue_training=True, model_dir=str(tmp_path))
+    calls = spy_iterative_fit(monkeypatch, RandomForest)
+
+    evaluator(config, resource_ratio=1. / 3, first_iter=True)
+    assert calls == [(34, True)]
+    model_path = evaluator.get_tmp_model_path(config, node)
+    assert os.listdir(str(tmp_path)) == [os.path.basename(model_path)]
+    assert evaluator.load_tmp_model(model_path).get_current_iter() == 34
+
+    # The promoted configuration only fits the missing trees on top of the saved ones.
+    resumed_score = evaluator(config, resource_ratio=1., first_iter=False)
+    assert calls[1:] == [(66, False)]
+
+    # Warm-started trees draw the same seeds as a forest fitted at full resource in one go.
+    full_evaluator = ClassificationEvaluator(config, data_node=node, name='hpo', resampling_strategy='partial',
+                                             continue_training=True, model_dir=str(tmp_path / 'full'))
+    assert full_evaluator(config, resource_ratio=1., first_iter=True) == pytest.approx(resumed_score)
+
+
+def test_regression_resumes_from_rung_model(tmp_path, monkeypatch):
+    from solnml.components.models.regression.gradient_boosting import GradientBoosting
+    node, config = get_node(regression=True), get_config(GradientBoosting, 'gradient_boosting')
+    evaluator = RegressionEvaluator(config, scorer=get_metric('mse'), data_node=node, name='hpo',
+                                    resampling_strategy='partial', continue_training=True,
+                                    model_dir=str(tmp_path))
+    calls = spy_iterative_fit(monkeypatch, GradientBoosting)
+
+    params = config.get_dictionary().copy()
+    params.pop('estimator')
+    n_iter = get_iteration_budget(GradientBoosting(**params), 1. / 3)
+    evaluator(config, resource_ratio=1. / 3, first_iter=True)
+    model = evaluator.load_tmp_model(evaluator.get_tmp_model_path(config, node))
+    assert model.get_current_iter() == n_iter
+
+    evaluator(config, resource_ratio=1., first_iter=False)
+    assert calls == [(n_iter, True), (model.get_max_iter() - n_iter, False)]
+
+
+@pytest.mark.parametrize('task', ['classification', 'regression'])
+def test_lightgbm_iterative_fit(task):
+    pytest.importorskip('lightgbm')
+    if task == 'classification':
+        from solnml.components.models.classification.lightgbm import LightGBM
+    else:
+        from solnml.components.models.regression.lightgbm import LightGBM
+    config = get_config(LightGBM, 'lightgbm').get_dictionary().copy()
+    config.pop('estimator')
+    config['random_state'] = 1
+    X, y = get_node(regression=task == 'regression').data
+    model = LightGBM(**config)
+    assert model.get_current_iter() == 0
+
+    model.iterative_fit(X, y, n_iter=10, refit=True)
+    assert model.get_current_iter() == 10
+    model.iterative_fit(X, y, n_iter=model.get_max_iter())
+    # Boosting continues from the current booster and stops at n_estimators.
+    assert model.get_current_iter() == model.get_max_iter()
+    model.iterative_fit(X, y, n_iter=5, refit=True)
+    assert model.get_current_iter() == 5
@@ -0,0 +1,64 @@
+import os
+import numpy as np
+
+from solnml.components.utils.constants import NUMERICAL
+from solnml.components.feature_engineering.transformation_graph import DataNode
+from solnml.components.evaluators.evaluation_cache import EvaluationCache, get_config_hash
+
+
+def get_node(seed=1):
+    rng = np.random.RandomState(seed)
+    return DataNode(data=[rng.rand(20, 4), rng.randint(2, size=20)], feature_type=[NUMERICAL] * 4)
+
+
+def test_config_hash_ignores_order():
+    assert get_config_hash({'a': 1, 'b': 'x'}) == get_config_hash({'b': 'x', 'a': 1})
+    assert get_config_hash({'a': 1}) != get_config_hash({'a': 2})
+    assert get_config_hash(None) == 'none'
+
+
+def test_key_covers_the_evaluation_setting():
+    node, config = get_node(), {'estimator': 'random_forest', 'n_estimators': 100}
+    key = EvaluationCache.make_key(node, config, 1., 'holdout')
+    assert EvaluationCache.make_key(node.copy_(), dict(reversed(list(config.items()))), 1., 'holdout') == key
+
+    balanced_node = node.copy_()
+    balanced_node.data_balance = 1
+    assert EvaluationCache.make_key(balanced_node, config, 1., 'holdout') != key
+    assert EvaluationCache.make_key(get_node(seed=2), config, 1., 'holdout') != key
+    assert EvaluationCache.make_key(node, config, 0.5, 'holdout') != key
+    assert EvaluationCache.make_key(node, config, 1., 'cv', {'folds': 5}) != key
+    assert EvaluationCache.make_key(node, config, 1., 'holdout', extra='trial') != key
+
+
+def test_memory_lru():
+    cache = EvaluationCache(max_size=2)
+    cache.set('a', 1.)
+    cache.set('b', 2.)
+    assert cache.get('a') == 1.
+    cache.set('c', 3.)
+    # 'b' is the least recently used entry.
+    assert 'b' not in cache and cache.get('b') is None
+    assert cache.get('a') == 1. and cache.get('c') == 3.
+    assert len(cache) == 2
+    assert cache.hits == 3 and cache.misses == 1
+
+
+def test_disk_round_trip(tmp_path):
+    cache_dir = str(tmp_path / 'eval_cache')
+    EvaluationCache(cache_dir).set('key', (0.9, {'loss': 0.1}))
+
+    # Another process pointing at the same directory reads the entry back.
+    cache = EvaluationCache(cache_dir, max_size=1)
+    assert 'key' in cache
+    assert cache.get('key') == (0.9, {'loss': 0.1})
+    assert cache.get('missing', default=-1) == -1
+    assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')]
+
+
+def test_truncated_entry_is_a_miss(tmp_path):
+    cache = EvaluationCache(str(tmp_path))
+    with open(os.path.join(str(tmp_path), 'key.pkl'), 'wb') as f:
+        f.write(b'')
+    assert cache.get('key') is None
+    assert cache.misses == 1
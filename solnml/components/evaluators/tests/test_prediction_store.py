@@ -0,0 +1,56 @@
+import os
+import numpy as np
+
+from solnml.components.utils.constants import NUMERICAL
+from solnml.components.feature_engineering.transformation_graph import DataNode
+from solnml.components.evaluators.prediction_store import PredictionStore, get_trial_hash
+
+
+def test_trial_hash():
+    rng = np.random.RandomState(1)
+    node = DataNode(data=[rng.rand(20, 4), rng.randint(2, size=20)], feature_type=[NUMERICAL] * 4)
+    config = {'estimator': 'random_forest', 'n_estimators': 100}
+    trial_hash = get_trial_hash(node, config)
+    assert get_trial_hash(node.copy_(), dict(config)) == trial_hash
+    assert get_trial_hash(node, {'estimator': 'random_forest', 'n_estimators': 50}) != trial_hash
+
+    balanced_node = node.copy_()
+    balanced_node.enable_balance = 1
+    assert get_trial_hash(balanced_node, config) != trial_hash
+
+
+def test_round_trip(tmp_path):
+    store_dir = str(tmp_path / 'preds')
+    index = np.array([7, 2, 5, 0])
+    pred = np.random.RandomState(1).rand(4, 3)
+    PredictionStore(store_dir).save('trial', index, pred)
+
+    store = PredictionStore(store_dir)
+    assert 'trial' in store and 'other' not in store
+    stored_index, stored_pred = store.load('trial')
+    np.testing.assert_array_equal(stored_index, index)
+    assert stored_pred.dtype == np.float32
+    np.testing.assert_allclose(stored_pred, pred, rtol=1e-6)
+    assert store.load('other') is None
+    assert not [name for name in os.listdir(store_dir) if name.endswith('.tmp')]
+
+
+def test_load_rows(tmp_path):
+    store = PredictionStore(str(tmp_path))
+    index = np.array([7, 2, 5, 0])
+    pred = np.arange(8, dtype=np.float32).reshape(4, 2)
+    store.save('trial', index, pred)
+
+    # Rows come back in the order of the requested samples.
+    np.testing.assert_array_equal(store.load_rows('trial', [0, 7, 5]), pred[[3, 0, 2]])
+    # Sample 3 was not predicted, and sample 9 is past every stored index.
+    assert store.load_rows('trial', [0, 3]) is None
+    assert store.load_rows('trial', [9]) is None
+    assert store.load_rows('other', [0]) is None
+
+
+def test_corrupted_entry_is_missing(tmp_path):
+    store = PredictionStore(str(tmp_path))
+    with open(os.path.join(str(tmp_path), 'trial.npz'), 'wb') as f:
+        f.write(b'not an npz file')
+    assert store.load('trial') is None
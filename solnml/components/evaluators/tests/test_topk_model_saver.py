@@ -0,0 +1,106 @@
+import os
+import pytest
+from ConfigSpace import ConfigurationSpace, UniformFloatHyperparameter
+
+pytest.importorskip('torch')
+
+from solnml.components.evaluators.base_dl_evaluator import TopKModelSaver
+
+
+def get_configs(n_configs):
+    cs = ConfigurationSpace(seed=1)
+    cs.add_hyperparameter(UniformFloatHyperparameter('lr', 1e-3, 1., log=True))
+    return cs.sample_configuration(n_configs)
+
+
+def add_model(saver, config, perf):
+    candidate_path = saver.get_candidate_path(config)
+    with open(candidate_path, 'wb') as f:
+        f.write(b'model')
+    saver.add(config, perf, candidate_path)
+    return candidate_path
+
+
+def get_model_path(saver, config):
+    return os.path.join(saver.model_dir, saver.get_path_by_config(config, saver.identifier))
+
+
+def test_admission_and_eviction(tmp_path):
+    saver = TopKModelSaver(2, str(tmp_path), 'run')
+    configs = get_configs(4)
+    add_model(saver, configs[0], 0.5)
+    assert saver.admits(0.1)
+    add_model(saver, configs[1], 0.7)
+    # The top-k is full, so a model must beat the worst of it.
+    assert saver.get_threshold() == 0.5
+    assert not saver.admits(0.4) and not saver.admits(0.5) and saver.admits(0.6)
+
+    # Below the threshold: the candidate is dropped.
+    candidate_path = add_model(saver, configs[2], 0.4)
+    assert not os.path.exists(candidate_path)
+    assert not os.path.exists(get_model_path(saver, configs[2]))
+
+    # Above it: the candidate takes its final path and the worst model is evicted.
+    add_model(saver, configs[3], 0.9)
+    assert os.path.exists(get_model_path(saver, configs[3]))
+    assert not os.path.exists(get_model_path(saver, configs[0]))
+    assert saver.get_threshold() == 0.7
+    assert [perf for _, perf, _ in TopKModelSaver.get_topk_config(saver.sorted_list_path)] == [0.9, 0.7]
+
+    # A configuration already in the top-k is only replaced by a better result.
+    add_model(saver, configs[1], 0.6)
+    add_model(saver, configs[1], 0.95)
+    assert [perf for _, perf, _ in TopKModelSaver.get_topk_config(saver.sorted_list_path)] == [0.95, 0.9]
+    assert sorted(os.listdir(str(tmp_path))) == sorted([os.path.basename(saver.sorted_list_path),
+                                                        os.path.basename(get_model_path(saver, configs[1])),
+                                                        os.path.basename(get_model_path(saver, configs[3]))])
+
+
+def test_index_is_reloaded(tmp_path):
+    saver = TopKModelSaver(2, str(tmp_path), 'run')
+    configs = get_configs(2)
+    add_model(saver, configs[0], 0.5)
+    add_model(saver, configs[1], 0.7)
+
+    from solnml.components.evaluators import base_dl_evaluator
+    base_dl_evaluator._topk_indexes.clear()
+    saver = TopKModelSaver(2, str(tmp_path), 'run')
+    assert saver.get_threshold() == 0.5
+    assert not saver.admits(0.3)
+
+
+def test_worker_candidates_are_ranked_by_master(tmp_path):
+    saver = TopKModelSaver(1, str(tmp_path), 'run')
+    configs = get_configs(2)
+    add_model(saver, configs[0], 0.5)
+
+    # In a worker the candidates are buffered instead of being ranked.
+    owner_pid, saver.index.owner_pid = saver.index.owner_pid, -1
+    add_model(saver, configs[1], 0.8)
+    candidates = saver.pop_candidates()
+    assert len(candidates) == 1 and saver.pop_candidates() == list()
+    assert not os.path.exists(get_model_path(saver, configs[1]))
+
+    saver.index.owner_pid = owner_pid
+    saver.add_candidates(candidates)
+    assert os.path.exists(get_model_path(saver, configs[1]))
+    assert not os.path.exists(get_model_path(saver, configs[0]))
+
+
+def test_failed_index_write_keeps_previous_index(tmp_path, monkeypatch):
+    saver = TopKModelSaver(2, str(tmp_path), 'run')
+    configs = get_configs(2)
+    add_model(saver, configs[0], 0.5)
+    previous = TopKModelSaver.get_topk_config(saver.sorted_list_path)
+
+    def failing_dump(obj, f):
+        f.write(b'partial')
+        raise OSError('disk full')
+
+    from solnml.utils import file_utils
+    monkeypatch.setattr(file_utils.pkl, 'dump', failing_dump)
+    # The error is logged, and the index file is either the old or the new one, never a partial one.
+    add_model(saver, configs[1], 0.7)
+    monkeypatch.undo()
+    assert TopKModelSaver.get_topk_config(saver.sorted_list_path) == previous
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith('.tmp')]
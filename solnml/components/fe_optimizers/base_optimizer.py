@@ -7,6 +7,9 @@ from solnml.utils.logging_utils import get_logger
 
 
 class Optimizer(object, metaclass=abc.ABCMeta):
+    # Position of the balancer in the pipelines recorded in node_dict; it is skipped at test time.
+    balancer_stage = None
+
     def __init__(self, name, task_type, datanode, seed=1):
         self.name = name
         self._seed = seed
@@ -32,6 +35,10 @@ class Optimizer(object, metaclass=abc.ABCMeta):
     def get_incumbent(self):
         return self.incumbent
 
+    def gc(self):
+        """Release the resources held for optimization, e.g., worker pools."""
+        return
+
     def get_incumbent_path(self):
         ref_node = self.get_incumbent()
         path_ids = self.graph.get_path_nodes(ref_node)
@@ -43,11 +50,15 @@ class Optimizer(object, metaclass=abc.ABCMeta):
             edge_attrs.append(edge.transformer.get_attributes())
         return edge_attrs
 
-    def apply(self, data_node: DataNode, ref_node: DataNode, phase='test'):
+    def apply(self, data_node: DataNode, ref_node: DataNode, phase='test', transform_cache=None):
         path_ids = self.graph.get_path_nodes(ref_node)
         self.logger.info('The path ids: %s' % str(path_ids))
         if len(path_ids) == 0:
             path_ids = [0]
+        # Nodes reached through the same path of the graph are identical for the same data_node.
+        cache_key = (id(self), tuple(path_ids))
+        if transform_cache is not None and cache_key in transform_cache:
+            return transform_cache[cache_key].copy_()
         inputnode = self.graph.get_node(path_ids[0])
         inputnode.set_values(data_node)
         edge_attrs = list()
@@ -70,8 +81,35 @@ class Optimizer(object, metaclass=abc.ABCMeta):
         output_node = self.graph.get_node(path_ids[-1]).copy_()
         self.logger.info('returned shape: %s' % str(output_node.shape))
         self.logger.info('Attribute path: %s' % ','.join(edge_attrs))
+        if transform_cache is not None:
+            transform_cache[cache_key] = output_node.copy_()
         return output_node
 
+    def get_transformers(self, ref_node: DataNode, phase='test'):
+        """
+        The fitted transformers that apply replays for ref_node, in order.
+
+        They are all that is needed to transform new data, e.g., when exporting a solution.
+        Only optimizers that record the fitted pipeline of each node in node_dict support it.
+        """
+        if not hasattr(self, 'node_dict'):
+            raise NotImplementedError('%s does not record fitted pipelines!' % self.__class__.__name__)
+        fe_config = ref_node.config
+        if fe_config not in self.node_dict:
+            self.logger.info("Ref node config:")
+            self.logger.info(str(fe_config))
+            self.logger.info("Node history in optimizer:")
+            self.logger.info(str(self.node_dict))
+            raise ValueError("Ref node not in history!")
+        fe_trans_list = self.node_dict[fe_config][1]
+        trans_list = list()
+        for i, tran in enumerate(fe_trans_list):
+            if phase == 'test' and i == self.balancer_stage:  # Disable balancer
+                continue
+            if tran is not None:
+                trans_list.append(tran)
+        return trans_list
+
     def get_pipeline(self, ref_node: DataNode):
         path_ids = self.graph.get_path_nodes(ref_node)
         edge_attrs = list()
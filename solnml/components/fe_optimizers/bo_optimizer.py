@@ -6,6 +6,7 @@ from ConfigSpace import ConfigurationSpace
 from ConfigSpace.hyperparameters import CategoricalHyperparameter
 
 from solnml.components.fe_optimizers import Optimizer
+from solnml.components.fe_optimizers.prefix_cache import PipelinePrefixCache
 from solnml.components.feature_engineering.transformations import _preprocessor1, _preprocessor2, _bal_balancer, \
     _imb_balancer, _generator, _selector, _rescaler
 from solnml.components.feature_engineering.transformation_graph import DataNode
@@ -16,12 +17,15 @@ from litebo.facade.bo_facade import BayesianOptimization as BO
 
 
 class BayesianOptimizationOptimizer(Optimizer):
+    balancer_stage = 2
+
     def __init__(self, task_type, input_data: DataNode, evaluator: _BaseEvaluator,
                  model_id: str, time_limit_per_trans: int,
                  mem_limit_per_trans: int,
                  seed: int, n_jobs=1,
                  number_of_unit_resource=1,
-                 time_budget=600, algo='smac'):
+                 time_budget=600, algo='smac',
+                 parse_cache_size=1024):
         super().__init__(str(__class__.__name__), task_type, input_data, seed)
         self.number_of_unit_resource = number_of_unit_resource
         self.iter_num_per_unit_resource = 10
@@ -40,6 +44,8 @@ class BayesianOptimizationOptimizer(Optimizer):
         self.n_jobs = n_jobs
 
         self.node_dict = dict()
+        # Intermediate nodes of the FE pipeline, limited to parse_cache_size MB.
+        self.parse_cache = PipelinePrefixCache(memory_budget=parse_cache_size * 1024 * 1024)
 
         self.early_stopped_flag = False
         self.is_finished = False
@@ -146,41 +152,43 @@ class BayesianOptimizationOptimizer(Optimizer):
         sel_id = config_dict['selector']
         config_dict.pop('selector')
 
-        def tran_operate(id, tran_set, config, node):
+        def fetch_params(id, config):
+            _config = {}
             if id != "empty":
-                _config = {}
                 for key in config:
                     if id in key:
                         config_name = key.split(':')[1]
                         _config[config_name] = config[key]
-                tran = tran_set[id](**_config)
-                output_node = tran.operate(node)
-                return output_node, tran
-            return node, None
-
-        _node = data_node.copy_()
-        # Preprocessor1
-        _node, pre1_tran = tran_operate(pre1_id, _preprocessor1, config_dict, _node)
+            return _config
 
-        # Preprocessor2
-        _node, pre2_tran = tran_operate(pre2_id, _preprocessor2, config_dict, _node)
-
-        # Balancer
         _balancer = _bal_balancer if self.if_bal else _imb_balancer
-        _node, bal_tran = tran_operate(bal_id, _balancer, config_dict, _node)
-
-        # Rescaler
-        _node, res_tran = tran_operate(res_id, _rescaler, config_dict, _node)
-
-        # Generator
-        _node, gen_tran = tran_operate(gen_id, _generator, config_dict, _node)
-
-        # Selector
-        _node, sel_tran = tran_operate(sel_id, _selector, config_dict, _node)
+        stages = [(pre1_id, _preprocessor1), (pre2_id, _preprocessor2), (bal_id, _balancer),
+                  (res_id, _rescaler), (gen_id, _generator), (sel_id, _selector)]
+        stage_params = [fetch_params(id, config_dict) for id, _ in stages]
+        stage_keys = [self.parse_cache.stage_key(id, params) for (id, _), params in zip(stages, stage_params)]
+
+        # Resume from the longest pipeline prefix that has been transformed before.
+        # The balance flags change what the balancer stage produces, so they are part of the root.
+        root_key = (data_node.fingerprint, data_node.enable_balance, data_node.data_balance)
+        depth, _node, tran_list = self.parse_cache.lookup(root_key, stage_keys)
+        if _node is None:
+            _node = data_node.copy_()
+
+        # Preprocessor1, Preprocessor2, Balancer, Rescaler, Generator, Selector
+        for stage_idx in range(depth, len(stages)):
+            id, tran_set = stages[stage_idx]
+            tran = None
+            if id != "empty":
+                tran = tran_set[id](**stage_params[stage_idx])
+                _node = tran.operate(_node)
+            tran_list.append(tran)
+            if tran is not None:
+                self.parse_cache.put(root_key, stage_keys[:stage_idx + 1], _node, tran_list)
 
+        _node = _node.copy_()
         _node.config = config
         if record:
-            return _node, [pre1_tran, pre2_tran, bal_tran, res_tran, gen_tran, sel_tran]
+            return _node, tran_list
         return _node
 
     def _get_task_hyperparameter_space(self, optimizer='tpe'):
@@ -369,22 +377,26 @@ class BayesianOptimizationOptimizer(Optimizer):
                 print("Re-parse failed on config %s" % str(config))
         return node_list
 
-    def apply(self, data_node: DataNode, ref_node: DataNode, phase='test'):
-        input_node = data_node.copy_()
-        fe_config = ref_node.config
+    def apply(self, data_node: DataNode, ref_node: DataNode, phase='test', transform_cache=None):
+        """
+        Replay the fitted pipeline of ref_node on data_node.
+
+        :param transform_cache: optional dict shared by the calls that transform the same data_node.
+            Intermediate nodes are kept under the sequence of transformers that produced them, so
+            pipelines sharing a config, or a prefix built from the same fitted transformers, are
+            only transformed once.
+        """
         if ref_node is None:
             return data_node
-        elif fe_config in self.node_dict:
-            fe_trans_list = self.node_dict[fe_config][1]
-            for i, tran in enumerate(fe_trans_list):
-                if phase == 'test' and i == 2:  # Disable balancer
-                    continue
-                if tran is not None:
-                    input_node = tran.operate(input_node)
-        else:
-            self.logger.info("Ref node config:")
-            self.logger.info(str(fe_config))
-            self.logger.info("Node history in optimizer:")
-            self.logger.info(str(self.node_dict))
-            raise ValueError("Ref node not in history!")
+        input_node = data_node.copy_()
+        trans_key = (phase,)
+        for tran in self.get_transformers(ref_node, phase=phase):
+            trans_key += (id(tran),)
+            if transform_cache is not None and trans_key in transform_cache:
+                input_node = transform_cache[trans_key].copy_()
+                continue
+            input_node = tran.operate(input_node)
+            if transform_cache is not None:
+                # Copies share the column arrays, so keeping one is cheap.
+                transform_cache[trans_key] = input_node.copy_()
         return input_node
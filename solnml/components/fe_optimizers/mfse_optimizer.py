@@ -80,3 +80,6 @@ class MfseOptimizer(BayesianOptimizationOptimizer, MfseBase):
             except:
                 print("Re-parse failed on config %s" % str(config[0]))
         return node_list
+
+    def gc(self):
+        self.shutdown_executor()
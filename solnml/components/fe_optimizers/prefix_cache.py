@@ -0,0 +1,93 @@
+from collections import OrderedDict
+
+
+def _array_nbytes(array):
+    if array is None:
+        return 0
+    if hasattr(array, 'indptr'):
+        return array.data.nbytes + array.indices.nbytes + array.indptr.nbytes
+    if hasattr(array, 'memory_usage'):
+        return int(array.memory_usage(deep=False).sum())
+    return getattr(array, 'nbytes', 0)
+
+
+def get_node_nbytes(node):
+    """
+    Memory held by a data node. All column blocks are counted, including the ones shared
+    with its parent, since the parent entry may be evicted while the node is still cached.
+    """
+    if not node.is_materialized:
+        arrays = {id(array): array for array, _ in node.column_blocks()}.values()
+    else:
+        arrays = node.data[:2]
+    return sum(_array_nbytes(array) for array in arrays)
+
+
+class PipelinePrefixCache(object):
+    """
+    LRU cache of intermediate nodes in a staged FE pipeline.
+
+    An entry maps (input fingerprint, stage key 1, ..., stage key k) to the node
+    produced after the k-th stage and the fitted transformers of stages 1..k.
+    Parsing a new configuration then resumes from its longest cached prefix, so
+    the stages shared with earlier proposals are not refit.
+
+    Entries hold their own copy of the node and lookups return a fresh copy, so
+    materializing or transforming a returned node never changes a cached one
+    or its measured size.
+    """
+
+    def __init__(self, memory_budget=1024 * 1024 * 1024):
+        self.memory_budget = memory_budget
+        self.memory_usage = 0
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def stage_key(tran_id, params):
+        return tran_id, tuple(sorted((key, str(value)) for key, value in params.items()))
+
+    def lookup(self, root_key, stage_keys):
+        """
+        Find the longest cached prefix of stage_keys.
+
+        :return: (depth, node, transformers); depth is 0 and node is None on a miss.
+        """
+        for depth in range(len(stage_keys), 0, -1):
+            key = (root_key,) + tuple(stage_keys[:depth])
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                node, trans_list, _ = self._entries[key]
+                self.hits += 1
+                return depth, node.copy_(), list(trans_list)
+        self.misses += 1
+        return 0, None, list()
+
+    def put(self, root_key, stage_keys, node, trans_list):
+        key = (root_key,) + tuple(stage_keys)
+        if key in self._entries:
+            self.memory_usage -= self._entries.pop(key)[2]
+        node = node.copy_()
+        nbytes = get_node_nbytes(node)
+        if nbytes > self.memory_budget:
+            return
+        self._entries[key] = (node, list(trans_list), nbytes)
+        self.memory_usage += nbytes
+        while self.memory_usage > self.memory_budget:
+            _, (_, _, evicted_nbytes) = self._entries.popitem(last=False)
+            self.memory_usage -= evicted_nbytes
+
+    def __getstate__(self):
+        # Cached nodes stay in the process that built them instead of being shipped to workers.
+        state = self.__dict__.copy()
+        state['_entries'] = OrderedDict()
+        state['memory_usage'] = 0
+        return state
+
+    def clear(self):
+        self._entries.clear()
+        self.memory_usage = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,56 @@
+import pytest
+
+from solnml.components.fe_optimizers.base_optimizer import Optimizer
+from solnml.utils.logging_utils import get_logger
+
+
+class RefNode(object):
+    def __init__(self, config):
+        self.config = config
+
+
+class RecordingOptimizer(Optimizer):
+    """An optimizer that records the fitted pipeline of each node, as the BO optimizers do."""
+
+    def __init__(self, balancer_stage, node_dict):
+        self.balancer_stage = balancer_stage
+        self.node_dict = node_dict
+        self.logger = get_logger('RecordingOptimizer')
+
+    def optimize(self):
+        pass
+
+    def iterate(self):
+        pass
+
+
+class GraphOptimizer(RecordingOptimizer):
+    def __init__(self):
+        self.logger = get_logger('GraphOptimizer')
+
+
+@pytest.mark.parametrize('balancer_stage', [0, 2])
+def test_balancer_is_skipped_at_test_time(balancer_stage):
+    trans_list = ['t0', 't1', 't2', None, 't4']
+    optimizer = RecordingOptimizer(balancer_stage, {'config': [None, trans_list]})
+    ref_node = RefNode('config')
+    expected = [tran for i, tran in enumerate(trans_list) if tran is not None and i != balancer_stage]
+    assert optimizer.get_transformers(ref_node) == expected
+    assert optimizer.get_transformers(ref_node, phase='train') == ['t0', 't1', 't2', 't4']
+
+    with pytest.raises(ValueError):
+        optimizer.get_transformers(RefNode('other'))
+
+
+def test_balancer_stages_of_the_bo_optimizers():
+    pytest.importorskip('litebo')
+    from solnml.components.fe_optimizers.bo_optimizer import BayesianOptimizationOptimizer
+    from solnml.components.fe_optimizers.ano_bo_optimizer import AnotherBayesianOptimizationOptimizer
+    assert BayesianOptimizationOptimizer.balancer_stage == 2
+    assert AnotherBayesianOptimizationOptimizer.balancer_stage == 0
+    assert BayesianOptimizationOptimizer.get_transformers is Optimizer.get_transformers
+
+
+def test_optimizer_without_recorded_pipelines():
+    with pytest.raises(NotImplementedError):
+        GraphOptimizer().get_transformers(RefNode('config'))
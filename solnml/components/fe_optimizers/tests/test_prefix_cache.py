@@ -0,0 +1,112 @@
+import pickle as pkl
+import numpy as np
+
+from solnml.components.utils.constants import NUMERICAL
+from solnml.components.feature_engineering.transformation_graph import DataNode
+from solnml.components.fe_optimizers.prefix_cache import PipelinePrefixCache, get_node_nbytes
+
+
+class ScaleTransformer(object):
+    """Deterministic stage; counts its fits so that the tests can tell a resumed parse."""
+    n_fits = 0
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    def operate(self, input_node):
+        ScaleTransformer.n_fits += 1
+        output_node = input_node.copy_()
+        output_node.data = [input_node.data[0] * self.factor, input_node.data[1]]
+        return output_node
+
+
+def get_node(n_rows=20, n_cols=4):
+    rng = np.random.RandomState(1)
+    return DataNode(data=[rng.rand(n_rows, n_cols), rng.randint(2, size=n_rows)],
+                    feature_type=[NUMERICAL] * n_cols)
+
+
+def parse(cache, data_node, factors):
+    """The resume loop of the FE optimizers, with one ScaleTransformer per stage."""
+    stage_keys = [PipelinePrefixCache.stage_key('scale', {'factor': factor}) for factor in factors]
+    root_key = (data_node.fingerprint, data_node.enable_balance, data_node.data_balance)
+    depth, node, trans_list = cache.lookup(root_key, stage_keys)
+    if node is None:
+        node = data_node.copy_()
+    for stage_idx in range(depth, len(factors)):
+        tran = ScaleTransformer(factors[stage_idx])
+        node = tran.operate(node)
+        trans_list.append(tran)
+        cache.put(root_key, stage_keys[:stage_idx + 1], node, trans_list)
+    return node, trans_list
+
+
+def test_resume_matches_fresh_parse():
+    data_node = get_node()
+    cache = PipelinePrefixCache()
+    parse(cache, data_node, [2., 3., 5.])
+
+    ScaleTransformer.n_fits = 0
+    node, trans_list = parse(cache, data_node, [2., 3., 7.])
+    # Only the last stage differs from the cached pipeline.
+    assert ScaleTransformer.n_fits == 1
+    assert [tran.factor for tran in trans_list] == [2., 3., 7.]
+
+    fresh_node, _ = parse(PipelinePrefixCache(), data_node, [2., 3., 7.])
+    np.testing.assert_array_equal(node.data[0], fresh_node.data[0])
+    assert node == fresh_node
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_root_key_separates_inputs():
+    data_node = get_node()
+    cache = PipelinePrefixCache()
+    parse(cache, data_node, [2.])
+
+    balanced_node = data_node.copy_()
+    balanced_node.enable_balance = 1
+    ScaleTransformer.n_fits = 0
+    parse(cache, balanced_node, [2.])
+    parse(cache, get_node(n_rows=30), [2.])
+    assert ScaleTransformer.n_fits == 2
+
+
+def test_lookup_returns_copies():
+    data_node = get_node()
+    cache = PipelinePrefixCache()
+    parse(cache, data_node, [2.])
+    root_key = (data_node.fingerprint, data_node.enable_balance, data_node.data_balance)
+    stage_keys = [PipelinePrefixCache.stage_key('scale', {'factor': 2.})]
+
+    _, node, trans_list = cache.lookup(root_key, stage_keys)
+    node.data = [np.zeros((20, 4)), node.data[1]]
+    trans_list.append(None)
+
+    _, node, trans_list = cache.lookup(root_key, stage_keys)
+    np.testing.assert_array_equal(node.data[0], data_node.data[0] * 2.)
+    assert len(trans_list) == 1
+
+
+def test_memory_budget():
+    data_node = get_node()
+    nbytes = get_node_nbytes(data_node)
+    cache = PipelinePrefixCache(memory_budget=2 * nbytes)
+    parse(cache, data_node, [2., 3., 5.])
+    # The first stage is evicted to keep the last two within the budget.
+    assert len(cache) == 2
+    assert cache.memory_usage == 2 * nbytes
+
+    root_key = (data_node.fingerprint, data_node.enable_balance, data_node.data_balance)
+    depth, _, _ = cache.lookup(root_key, [PipelinePrefixCache.stage_key('scale', {'factor': 2.})])
+    assert depth == 0
+
+    cache = PipelinePrefixCache(memory_budget=nbytes - 1)
+    parse(cache, data_node, [2.])
+    assert len(cache) == 0 and cache.memory_usage == 0
+
+
+def test_entries_stay_in_process():
+    cache = PipelinePrefixCache()
+    parse(cache, get_node(), [2., 3.])
+    cache = pkl.loads(pkl.dumps(cache))
+    assert len(cache) == 0 and cache.memory_usage == 0
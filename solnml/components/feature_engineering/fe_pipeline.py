@@ -76,7 +76,7 @@ class FEPipeline(object, metaclass=abc.ABCMeta):
 
         input_node.feature_types = [types[idx] for idx in range(len(types)) if idx not in self.uninformative_idx]
         raw_dataframe = raw_dataframe.drop(self.uninformative_columns, axis=1)
-        input_node.data[0] = raw_dataframe
+        input_node.data = [raw_dataframe, input_node.data[1]]
         return input_node
 
     def impute_cols(self, input_node: DataNode):
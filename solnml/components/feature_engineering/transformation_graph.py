@@ -1,8 +1,48 @@
+import hashlib
+import pickle as pkl
 import numpy as np
 from solnml.components.utils.constants import CATEGORICAL
 
 
+def compute_fingerprint(data, feature_types):
+    """Stable content hash over the array buffers of (X, y) and the feature types."""
+    hasher = hashlib.blake2b(digest_size=16)
+    for array in data[:2]:
+        if array is None:
+            hasher.update(b'none')
+            continue
+        if hasattr(array, 'tocsr'):
+            array = array.tocsr()
+            parts = [array.data, array.indices, array.indptr]
+        elif hasattr(array, 'values'):
+            # Pandas DataFrame or Series.
+            parts = [array.values]
+        else:
+            parts = [array]
+        for part in parts:
+            part = np.asarray(part)
+            hasher.update(('%s-%s' % (part.shape, part.dtype)).encode('utf8'))
+            if part.dtype == object:
+                hasher.update(pkl.dumps(part.tolist(), protocol=pkl.HIGHEST_PROTOCOL))
+            else:
+                hasher.update(np.ascontiguousarray(part).data)
+    if feature_types is not None:
+        hasher.update(','.join(map(str, feature_types)).encode('utf8'))
+    return hasher.hexdigest()
+
+
 class DataNode(object):
+    """
+    A dataset (X, y) in the transformation graph.
+
+    Nodes follow copy-on-write semantics: arrays attached to a node are never
+    modified in place, so copies and derived nodes share them by reference, and
+    a transformer that needs to change values copies them first. A node derived
+    by concatenating or replacing columns can be built from column blocks (see
+    `from_blocks`); unchanged columns then stay shared with the parent and the
+    contiguous feature matrix is only assembled when `data` is first accessed.
+    """
+
     def __init__(self, data=None, feature_type=None, task_type=None):
         self.task_type = task_type
         self.data = data
@@ -15,52 +55,125 @@ class DataNode(object):
         self.data_balance = 0
         self.config = None
 
+    @classmethod
+    def from_blocks(cls, blocks, y, feature_type, task_type=None):
+        """
+        Build a node whose feature matrix is the horizontal concatenation of column blocks.
+
+        :param blocks: list of (array, columns); columns is None to take the whole array
+            or a list of column indices into it.
+        """
+        node = cls(None, feature_type, task_type)
+        node._blocks = list(blocks)
+        node._label = y
+        return node
+
+    @property
+    def data(self):
+        if self._blocks is not None:
+            self._data = [self._assemble_blocks(self._blocks), self._label]
+            self._blocks, self._label = None, None
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._blocks, self._label = None, None
+        self._fingerprint = None
+
+    @property
+    def is_materialized(self):
+        return self._blocks is None
+
+    def column_blocks(self):
+        """Return the feature matrix as a list of (array, columns) blocks without copying."""
+        if self._blocks is not None:
+            return list(self._blocks)
+        return [(self._data[0], None)]
+
+    @staticmethod
+    def _assemble_blocks(blocks):
+        arrays = [array if columns is None else array[:, columns] for array, columns in blocks]
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.hstack(arrays)
+
+    @property
+    def feature_types(self):
+        return self._feature_types
+
+    @feature_types.setter
+    def feature_types(self, feature_types):
+        self._feature_types = feature_types
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        """
+        Content hash of the node, computed once and reused for equality and lookup.
+        Assigning `data` or `feature_types` resets it; the arrays themselves are
+        treated as immutable once they are attached to a node.
+        """
+        if self._fingerprint is None and (self._data is not None or self._blocks is not None):
+            self._fingerprint = compute_fingerprint(self.data, self._feature_types)
+        return self._fingerprint
+
     def __eq__(self, node):
         """Overrides the default implementation"""
         if isinstance(node, DataNode):
             if self.shape != node.shape:
                 return False
-            X1 = self.data[0].astype("float64")
-            X2 = node.data[0].astype("float64")
-            X_flag = np.isclose(X1, X2).all()
-            y_flag = np.isclose(self.data[1], node.data[1]).all()
-            if X_flag and y_flag:
-                return True
+            return self.fingerprint == node.fingerprint
         return False
 
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    def __setstate__(self, state):
+        # Nodes pickled before the fingerprint was introduced store plain attributes.
+        for name in ['data', 'feature_types']:
+            if name in state:
+                state['_' + name] = state.pop(name)
+        state.setdefault('_fingerprint', None)
+        state.setdefault('_blocks', None)
+        state.setdefault('_label', None)
+        self.__dict__.update(state)
+
     def __add__(self, other):
-        X1, y1 = self.copy_().data
-        X2, y2 = other.copy_().data
+        X1, y1 = self.data
+        X2, y2 = other.data
         feat_types = self.feature_types.copy()
         X = np.vstack((X1, X2))
         y = np.vstack((y1, y2))
         return DataNode(data=[X, y], feature_type=feat_types)
 
     def copy_(self):
-        new_data = list([self.data[0].copy()])
-        new_data.append(None if self.data[1] is None else self.data[1].copy())
-        new_node = DataNode(new_data, self.feature_types.copy(), self.task_type)
+        """Copy the node; the arrays are shared with the original (copy-on-write)."""
+        if self._blocks is not None:
+            new_node = DataNode.from_blocks(self._blocks, self._label, self.feature_types.copy(), self.task_type)
+        else:
+            new_node = DataNode(list(self.data[:2]), self.feature_types.copy(), self.task_type)
         new_node.trans_hist = self.trans_hist.copy()
         new_node.depth = self.depth
         new_node.enable_balance = self.enable_balance
         new_node.data_balance = self.data_balance
         new_node.config = self.config
+        new_node._fingerprint = self._fingerprint
         return new_node
 
     def set_values(self, node):
         """ Assign node's content to current node.
 
         Assign the variables "data, feature_types, and task_type" of node to the current node.
-        This function does NOT assign the node id.
+        This function does NOT assign the node id. The arrays are shared with node.
 
         :param node: the data node is copied.
         :return: None.
         """
-        self.data = []
-        for val in node.data[:2]:
-            self.data.append(val.copy() if val is not None else None)
+        self.data = list(node.data[:2])
         self.feature_types = node.feature_types.copy()
         self.task_type = node.task_type
+        self._fingerprint = node._fingerprint
 
     @property
     def node_id(self):
@@ -75,8 +188,14 @@ class DataNode(object):
 
     @property
     def shape(self):
-        assert self.data[0].shape[1] == len(self.feature_types)
-        return self.data[0].shape
+        if self._blocks is not None:
+            n_rows = self._blocks[0][0].shape[0]
+            n_cols = sum(array.shape[1] if columns is None else len(columns) for array, columns in self._blocks)
+            shape = (n_rows, n_cols)
+        else:
+            shape = self.data[0].shape
+        assert shape[1] == len(self.feature_types)
+        return shape
 
     def __str__(self):
         from tabulate import tabulate
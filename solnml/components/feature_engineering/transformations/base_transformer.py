@@ -140,20 +140,33 @@ def ease_trans(func):
             trans.output_type = trans.output_type[0]
         _types = [trans.output_type] * _X.shape[1]
 
+        # Unchanged columns are shared with the input node instead of being copied into a new matrix.
+        share_columns = isinstance(X, np.ndarray) and isinstance(_X, np.ndarray)
+
+        output_datanode = None
         if trans.compound_mode == 'only_new':
             new_X = _X
             new_types = _types
         elif trans.compound_mode == 'concatenate':
-            new_X = np.hstack((X, _X))
             new_types = input.feature_types.copy()
             new_types.extend(_types)
+            if share_columns:
+                output_datanode = DataNode.from_blocks([(X, None), (_X, None)], y, new_types, input.task_type)
+            else:
+                new_X = np.hstack((X, _X))
         elif trans.compound_mode == 'replace':
-            new_X = np.hstack((X, _X))
             new_types = input.feature_types.copy()
             new_types.extend(_types)
-            new_X = np.delete(new_X, target_fields, axis=1)
             temp_array = np.array(new_types)
             new_types = list(np.delete(temp_array, target_fields))
+            if share_columns:
+                removed_columns = set(target_fields)
+                kept_columns = [idx for idx in range(X.shape[1]) if idx not in removed_columns]
+                blocks = [(X, kept_columns)] if len(kept_columns) > 0 else list()
+                output_datanode = DataNode.from_blocks(blocks + [(_X, None)], y, new_types, input.task_type)
+            else:
+                new_X = np.hstack((X, _X))
+                new_X = np.delete(new_X, target_fields, axis=1)
         else:
             assert _X.shape[1] == len(target_fields)
             new_X = X.copy()
@@ -161,7 +174,8 @@ def ease_trans(func):
             new_X[:, target_fields] = _X
             new_types = input.feature_types.copy()
 
-        output_datanode = DataNode((new_X, y), new_types, input.task_type)
+        if output_datanode is None:
+            output_datanode = DataNode((new_X, y), new_types, input.task_type)
         output_datanode.trans_hist = input.trans_hist.copy()
         output_datanode.trans_hist.append(trans.type)
         output_datanode.enable_balance = input.enable_balance
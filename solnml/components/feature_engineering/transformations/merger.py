@@ -12,12 +12,18 @@ class Merger(Transformer):
         X, y = input_datanodes[0].data
         self.target_fields = target_fields
 
-        new_X = X.copy()
         new_feature_types = input_datanodes[0].feature_types.copy()
-
         for data_node in input_datanodes[1:]:
-            new_X = np.hstack((new_X, data_node.data[0]))
             new_feature_types.extend(data_node.feature_types)
-        output_datanode = DataNode((new_X, y), new_feature_types, input_datanodes[0].task_type)
+
+        if all(isinstance(data_node.data[0], np.ndarray) for data_node in input_datanodes):
+            # Share the columns of the inputs; the merged matrix is assembled on first access.
+            blocks = [(data_node.data[0], None) for data_node in input_datanodes]
+            output_datanode = DataNode.from_blocks(blocks, y, new_feature_types, input_datanodes[0].task_type)
+        else:
+            new_X = X.copy()
+            for data_node in input_datanodes[1:]:
+                new_X = np.hstack((new_X, data_node.data[0]))
+            output_datanode = DataNode((new_X, y), new_feature_types, input_datanodes[0].task_type)
 
         return output_datanode
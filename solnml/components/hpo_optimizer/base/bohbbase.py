@@ -21,6 +21,7 @@ class BohbBase(object):
         self.config_space = config_space
         self.config_generator = config_generator
         self.n_workers = n_jobs
+        self.executor = None
 
         self.trial_cnt = 0
         self.configs = list()
@@ -59,8 +60,6 @@ class BohbBase(object):
         self.num_config = len(bounds)
         self.surrogate = RandomForestWithInstances(types, bounds)
 
-        # self.executor = ParallelEvaluator(self.eval_func, n_worker=n_jobs)
-        # self.executor = ParallelProcessEvaluator(self.eval_func, n_worker=n_jobs)
         self.acquisition_func = EI(model=self.surrogate)
         self.acq_optimizer = RandomSampling(self.acquisition_func,
                                             self.config_space,
@@ -71,6 +70,17 @@ class BohbBase(object):
 
         self.eval_dict = dict()
 
+    def get_executor(self):
+        # One long-lived worker pool per optimizer, shared by all brackets.
+        if self.executor is None:
+            self.executor = ParallelProcessEvaluator(self.eval_func, n_worker=self.n_workers)
+        return self.executor
+
+    def shutdown_executor(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
     def _iterate(self, s, budget=MAX_INT, skip_last=0):
         # Set initial number of configurations
         n = int(ceil(self.B / self.R / (s + 1) * self.eta ** s))
@@ -83,50 +93,50 @@ class BohbBase(object):
         time_elapsed = time.time() - start_time
         self.logger.info("Choosing next batch of configurations took %.2f sec." % time_elapsed)
 
-        with ParallelProcessEvaluator(self.eval_func, n_worker=self.n_workers) as executor:
-            for i in range((s + 1) - int(skip_last)):  # changed from s + 1
-                if time.time() >= budget + start_time:
-                    break
-
-                # Run each of the n configs for <iterations>
-                # and keep best (n_configs / eta) configurations
-
-                n_configs = n * self.eta ** (-i)
-                n_resource = r * self.eta ** i
-
-                self.logger.info("BOHB: %d configurations x size %d / %d each" %
-                                 (int(n_configs), n_resource, self.R))
-
-                val_losses = executor.parallel_execute(T, resource_ratio=float(n_resource / self.R),
-                                                       eta=self.eta,
-                                                       first_iter=(i == 0))
-                for _id, _val_loss in enumerate(val_losses):
-                    if np.isfinite(_val_loss):
-                        self.target_x[int(n_resource)].append(T[_id])
-                        self.target_y[int(n_resource)].append(_val_loss)
-
-                self.exp_output[time.time()] = (int(n_resource), T, val_losses)
-
-                if int(n_resource) == self.R:
-                    self.incumbent_configs.extend(T)
-                    self.incumbent_perfs.extend(val_losses)
-                    self.time_ticks.extend([time.time() - self.global_start_time] * len(T))
-
-                    # Only update results using maximal resources
-                    if self.config_generator != 'smac':
-                        for _id, _val_loss in enumerate(val_losses):
-                            if np.isfinite(_val_loss):
-                                self.config_gen.new_result(T[_id], _val_loss)
-
-                # Select a number of best configurations for the next loop.
-                # Filter out early stops, if any.
-                indices = np.argsort(val_losses)
-                if len(T) >= self.eta:
-                    T = [T[i] for i in indices]
-                    reduced_num = int(n_configs / self.eta)
-                    T = T[0:reduced_num]
-                else:
-                    T = [T[indices[0]]]
+        executor = self.get_executor()
+        for i in range((s + 1) - int(skip_last)):  # changed from s + 1
+            if time.time() >= budget + start_time:
+                break
+
+            # Run each of the n configs for <iterations>
+            # and keep best (n_configs / eta) configurations
+
+            n_configs = n * self.eta ** (-i)
+            n_resource = r * self.eta ** i
+
+            self.logger.info("BOHB: %d configurations x size %d / %d each" %
+                             (int(n_configs), n_resource, self.R))
+
+            val_losses = executor.parallel_execute(T, resource_ratio=float(n_resource / self.R),
+                                                   eta=self.eta,
+                                                   first_iter=(i == 0))
+            for _id, _val_loss in enumerate(val_losses):
+                if np.isfinite(_val_loss):
+                    self.target_x[int(n_resource)].append(T[_id])
+                    self.target_y[int(n_resource)].append(_val_loss)
+
+            self.exp_output[time.time()] = (int(n_resource), T, val_losses)
+
+            if int(n_resource) == self.R:
+                self.incumbent_configs.extend(T)
+                self.incumbent_perfs.extend(val_losses)
+                self.time_ticks.extend([time.time() - self.global_start_time] * len(T))
+
+                # Only update results using maximal resources
+                if self.config_generator != 'smac':
+                    for _id, _val_loss in enumerate(val_losses):
+                        if np.isfinite(_val_loss):
+                            self.config_gen.new_result(T[_id], _val_loss)
+
+            # Select a number of best configurations for the next loop.
+            # Filter out early stops, if any.
+            indices = np.argsort(val_losses)
+            if len(T) >= self.eta:
+                T = [T[i] for i in indices]
+                reduced_num = int(n_configs / self.eta)
+                T = T[0:reduced_num]
+            else:
+                T = [T[indices[0]]]
 
         # Refit the surrogate model.
         resource_val = self.iterate_r[-1]
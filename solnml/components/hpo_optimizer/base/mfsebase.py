@@ -21,6 +21,7 @@ class MfseBase(object):
         self.eval_func = eval_func
         self.config_space = config_space
         self.n_workers = n_jobs
+        self.executor = None
 
         self.trial_cnt = 0
         self.configs = list()
@@ -73,6 +74,17 @@ class MfseBase(object):
                                                      rng=np.random.RandomState(seed))
         self.eval_dict = dict()
 
+    def get_executor(self):
+        # One long-lived worker pool per optimizer, shared by all brackets.
+        if self.executor is None:
+            self.executor = ParallelProcessEvaluator(self.eval_func, n_worker=self.n_workers)
+        return self.executor
+
+    def shutdown_executor(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
     def _iterate(self, s, budget=MAX_INT, skip_last=0):
         if self.weight_update_id > self.s_max:
             self.update_weight()
@@ -88,59 +100,59 @@ class MfseBase(object):
         time_elapsed = time.time() - start_time
         self.logger.info("Choosing next batch of configurations took %.2f sec." % time_elapsed)
 
-        with ParallelProcessEvaluator(self.eval_func, n_worker=self.n_workers) as executor:
-            for i in range((s + 1) - int(skip_last)):  # changed from s + 1
-                if time.time() >= budget + start_time:
-                    break
-
-                # Run each of the n configs for <iterations>
-                # and keep best (n_configs / eta) configurations
-                n_configs = n * self.eta ** (-i)
-                n_resource = r * self.eta ** i
-
-                self.logger.info("MFSE: %d configurations x size %d / %d each" %
-                                 (int(n_configs), n_resource, self.R))
-
-                if self.n_workers > 1:
-                    val_losses = executor.parallel_execute(T, resource_ratio=float(n_resource / self.R),
-                                                           eta=self.eta,
-                                                           first_iter=(i == 0))
-                    for _id, _val_loss in enumerate(val_losses):
-                        if np.isfinite(_val_loss):
-                            self.target_x[int(n_resource)].append(T[_id])
-                            self.target_y[int(n_resource)].append(_val_loss)
-                            self.evaluation_stats['timestamps'].append(time.time() - self.global_start_time)
-                            self.evaluation_stats['val_scores'].append(_val_loss)
-                else:
-                    val_losses = list()
-                    for config in T:
-                        try:
-                            val_loss = self.eval_func(config, resource_ratio=float(n_resource / self.R),
-                                                      eta=self.eta, first_iter=(i == 0))
-                        except Exception as e:
-                            val_loss = np.inf
-                        val_losses.append(val_loss)
-                        if np.isfinite(val_loss):
-                            self.target_x[int(n_resource)].append(config)
-                            self.target_y[int(n_resource)].append(val_loss)
-                            self.evaluation_stats['timestamps'].append(time.time() - self.global_start_time)
-                            self.evaluation_stats['val_scores'].append(val_loss)
-
-                self.exp_output[time.time()] = (int(n_resource), T, val_losses)
-
-                if int(n_resource) == self.R:
-                    self.incumbent_configs.extend(T)
-                    self.incumbent_perfs.extend(val_losses)
-
-                # Select a number of best configurations for the next loop.
-                # Filter out early stops, if any.
-                indices = np.argsort(val_losses)
-                if len(T) >= self.eta:
-                    T = [T[i] for i in indices]
-                    reduced_num = int(n_configs / self.eta)
-                    T = T[0:reduced_num]
-                else:
-                    T = [T[indices[0]]]
+        executor = self.get_executor()
+        for i in range((s + 1) - int(skip_last)):  # changed from s + 1
+            if time.time() >= budget + start_time:
+                break
+
+            # Run each of the n configs for <iterations>
+            # and keep best (n_configs / eta) configurations
+            n_configs = n * self.eta ** (-i)
+            n_resource = r * self.eta ** i
+
+            self.logger.info("MFSE: %d configurations x size %d / %d each" %
+                             (int(n_configs), n_resource, self.R))
+
+            if self.n_workers > 1:
+                val_losses = executor.parallel_execute(T, resource_ratio=float(n_resource / self.R),
+                                                       eta=self.eta,
+                                                       first_iter=(i == 0))
+                for _id, _val_loss in enumerate(val_losses):
+                    if np.isfinite(_val_loss):
+                        self.target_x[int(n_resource)].append(T[_id])
+                        self.target_y[int(n_resource)].append(_val_loss)
+                        self.evaluation_stats['timestamps'].append(time.time() - self.global_start_time)
+                        self.evaluation_stats['val_scores'].append(_val_loss)
+            else:
+                val_losses = list()
+                for config in T:
+                    try:
+                        val_loss = self.eval_func(config, resource_ratio=float(n_resource / self.R),
+                                                  eta=self.eta, first_iter=(i == 0))
+                    except Exception as e:
+                        val_loss = np.inf
+                    val_losses.append(val_loss)
+                    if np.isfinite(val_loss):
+                        self.target_x[int(n_resource)].append(config)
+                        self.target_y[int(n_resource)].append(val_loss)
+                        self.evaluation_stats['timestamps'].append(time.time() - self.global_start_time)
+                        self.evaluation_stats['val_scores'].append(val_loss)
+
+            self.exp_output[time.time()] = (int(n_resource), T, val_losses)
+
+            if int(n_resource) == self.R:
+                self.incumbent_configs.extend(T)
+                self.incumbent_perfs.extend(val_losses)
+
+            # Select a number of best configurations for the next loop.
+            # Filter out early stops, if any.
+            indices = np.argsort(val_losses)
+            if len(T) >= self.eta:
+                T = [T[i] for i in indices]
+                reduced_num = int(n_configs / self.eta)
+                T = T[0:reduced_num]
+            else:
+                T = [T[indices[0]]]
 
         for item in self.iterate_r[self.iterate_r.index(r):]:
             if len(self.target_y[item]) == 0:
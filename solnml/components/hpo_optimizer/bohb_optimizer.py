@@ -62,3 +62,6 @@ class BohbOptimizer(BaseHPOptimizer, BohbBase):
 
     def get_runtime_history(self):
         return self.incumbent_perfs, self.time_ticks, self.incumbent_perf
+
+    def gc(self):
+        self.shutdown_executor()
@@ -65,3 +65,6 @@ class MfseOptimizer(BaseHPOptimizer, MfseBase):
 
     def get_evaluation_stats(self):
         return self.evaluation_stats
+
+    def gc(self):
+        self.shutdown_executor()
@@ -1,9 +1,9 @@
 import os
 import hashlib
 import numpy as np
-import pickle as pk
 from collections import OrderedDict
 from .meta_generator import get_feature_vector, prepare_meta_dataset
+from .meta_store import MetaKnowledgeStore
 from solnml.components.utils.constants import CLS_TASKS, REG_TASKS
 from solnml.utils.logging_utils import get_logger
 
@@ -20,7 +20,14 @@ class BaseAdvisor(object):
                  total_resource=20,
                  meta_algorithm='lightgbm',
                  exclude_datasets=None,
-                 meta_dir=None):
+                 meta_dir=None,
+                 subsample_size=None,
+                 n_jobs=1,
+                 cache_dir=None):
+        """
+        :param subsample_size, n_jobs, cache_dir: how meta-features that are not precomputed are
+            calculated (see calculate_all_metafeatures).
+        """
         self.logger = get_logger(self.__module__ + "." + self.__class__.__name__)
         self.n_algorithm = n_algorithm
         self.n_algo_candidates = len(_buildin_algorithms)
@@ -39,7 +46,12 @@ class BaseAdvisor(object):
         self.rep = rep
         self.total_resource = total_resource
         self.exclude_datasets = exclude_datasets
+        self.subsample_size = subsample_size
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
         self.meta_learner = None
+        self.meta_store = None
+        self.model = None
         buildin_loc = os.path.dirname(__file__) + '/../meta_resource/'
         self.meta_dir = meta_dir if meta_dir is not None else buildin_loc
 
@@ -63,47 +75,62 @@ class BaseAdvisor(object):
         if not self.meta_dir.endswith('/'):
             self.meta_dir += '/'
 
-    def load_train_data(self):
-        meta_dataset_filename = self.meta_dir + 'ranker_%s_dataset_%s_%s.pkl' % (
-            self.meta_algo, self.metric, self.hash_id)
-        if os.path.exists(meta_dataset_filename):
-            self.logger.info('Meta dataset file exists: %s' % meta_dataset_filename)
-            with open(meta_dataset_filename, 'rb') as f:
-                meta_X, meta_y, meta_infos = pk.load(f)
-        else:
-            X, Y, include_datasets = prepare_meta_dataset(self.meta_dir, self.metric,
-                                                          self.total_resource, self.rep,
-                                                          self._buildin_datasets, _buildin_algorithms,
-                                                          task_type=self.task_type)
-            meta_X, meta_y = list(), list()
-            self.logger.info('Meta information comes from %d datasets.' % len(meta_y))
-            meta_infos = list()
+    def load_meta_store(self):
+        """Open the meta-knowledge store of this advisor, building it from the meta runs on first use."""
+        if self.meta_store is None:
+            store_dir = self.meta_dir + 'meta_store_%s_%d_%d_%s' % (
+                self.metric, self.total_resource, self.rep, self.hash_id)
+            if self.subsample_size is not None:
+                # Meta-features computed on subsamples differ from the ones on the full datasets.
+                store_dir += '_sub%d' % self.subsample_size
+            if MetaKnowledgeStore.exists(store_dir):
+                self.logger.info('Meta store exists: %s' % store_dir)
+                self.meta_store = MetaKnowledgeStore(store_dir)
+            else:
+                X, Y, include_datasets = prepare_meta_dataset(self.meta_dir, self.metric,
+                                                              self.total_resource, self.rep,
+                                                              self._buildin_datasets, _buildin_algorithms,
+                                                              task_type=self.task_type,
+                                                              subsample_size=self.subsample_size,
+                                                              n_jobs=self.n_jobs, cache_dir=self.cache_dir)
+                self.logger.info('Meta information comes from %d datasets.' % len(X))
+                self.meta_store = MetaKnowledgeStore.build(store_dir, X, Y, include_datasets, _buildin_algorithms)
+        return self.meta_store
 
-            for idx in range(len(X)):
-                meta_feature, run_results, _dataset = X[idx], Y[idx], include_datasets[idx]
-                _instance_num = 0
-                n_algo = len(run_results)
-                _X, _y = list(), list()
-
-                for i in range(n_algo):
-                    vector_i = np.zeros(n_algo)
-                    vector_i[i] = 1
-                    meta_x = meta_feature.copy()
-                    meta_x.extend(vector_i.copy())
-                    meta_label = run_results[i]
-                    _X.append(meta_x)
-                    _y.append(meta_label)
-                    _instance_num += 1
+    def load_train_data(self):
+        return self.load_meta_store().get_instances()
 
-                self.logger.info('Meta instances: %s - %d' % (_dataset, _instance_num))
-                meta_X.append(_X)
-                meta_y.append(_y)
-                meta_infos.append((_dataset, _instance_num))
+    def load_pairwise_data(self, create_pairwise_data):
+        """
+        Pairwise training data of the ranker, computed once by create_pairwise_data(X, y) from the
+        instances of load_train_data and kept in the meta store.
+        """
+        meta_store = self.load_meta_store()
+        name = 'pairwise_%s' % self.meta_algo
+        if not meta_store.has_arrays(name):
+            _X, _y = self.load_train_data()
+            meta_store.save_arrays(name, create_pairwise_data(_X, _y))
+        return meta_store.load_arrays(name)
 
-            meta_X, meta_y = np.array(meta_X), np.array(meta_y)
-            with open(meta_dataset_filename, 'wb') as f:
-                pk.dump([meta_X, meta_y, meta_infos], f)
-        return meta_X, meta_y
+    def load_model(self):
+        """
+        Load the trained ranker kept in the meta store, or fit it and save it there on first use.
+        The model is stored with the meta-dataset it is trained on, so it shares the key of the store.
+        """
+        if self.model is None:
+            meta_store = self.load_meta_store()
+            name = 'model_%s' % self.meta_algo
+            if meta_store.has_object(name):
+                self.logger.info('Load the %s ranker from the meta store: %s.' % (self.meta_algo,
+                                                                                 meta_store.store_dir))
+                self.model = meta_store.load_object(name)
+            else:
+                self.logger.info('No trained %s ranker in the meta store, fit it on %d datasets.' % (
+                    self.meta_algo, len(meta_store.datasets)))
+                self.fit()
+                model_path = meta_store.save_object(name, self.model)
+                self.logger.info('Dump model to file: %s.' % model_path)
+        return self.model
 
     def load_test_data(self, meta_feature):
         n_algo = self.n_algo_candidates
@@ -117,7 +144,9 @@ class BaseAdvisor(object):
         return np.asarray(_X)
 
     def fetch_algorithm_set(self, dataset, dataset_id=None):
-        input_vector = get_feature_vector(dataset, dataset_id, task_type=self.task_type)
+        input_vector = get_feature_vector(dataset, dataset_id, task_type=self.task_type,
+                                          subsample_size=self.subsample_size, n_jobs=self.n_jobs,
+                                          cache_dir=self.cache_dir)
         preds = self.predict(input_vector)
         idxs = np.argsort(-preds)
         return [_buildin_algorithms[idx] for idx in idxs]
@@ -126,7 +155,9 @@ class BaseAdvisor(object):
         X, Y, include_datasets = prepare_meta_dataset(self.meta_dir, self.metric,
                                                       self.total_resource, self.rep,
                                                       [dataset], _buildin_algorithms,
-                                                      task_type=self.task_type)
+                                                      task_type=self.task_type,
+                                                      subsample_size=self.subsample_size,
+                                                      n_jobs=self.n_jobs, cache_dir=self.cache_dir)
         idxs = np.argsort(-np.array(Y[0]))
         sorted_algos = [_buildin_algorithms[idx] for idx in idxs]
         sorted_scores = [Y[0][idx] for idx in idxs]
@@ -10,10 +10,14 @@ class GBMAdvisor(BaseAdvisor):
     def __init__(self, n_algorithm=3,
                  task_type=None,
                  metric='acc',
-                 exclude_datasets=None):
+                 exclude_datasets=None,
+                 subsample_size=None,
+                 n_jobs=1,
+                 cache_dir=None):
         self.logger = get_logger(self.__module__ + "." + self.__class__.__name__)
         super().__init__(n_algorithm, task_type, metric=metric,
-                         meta_algorithm='lightgbm', exclude_datasets=exclude_datasets)
+                         meta_algorithm='lightgbm', exclude_datasets=exclude_datasets,
+                         subsample_size=subsample_size, n_jobs=n_jobs, cache_dir=cache_dir)
         self.model = None
 
     @staticmethod
@@ -54,8 +58,8 @@ class GBMAdvisor(BaseAdvisor):
         return np.asarray(X1), np.asarray(labels)
 
     def fit(self, **meta_learner_config):
-        _X, _y = self.load_train_data()
-        X, y = self.create_pairwise_data(_X, _y, n_algo_candidates=self.n_algo_candidates)
+        X, y = self.load_pairwise_data(
+            lambda _X, _y: self.create_pairwise_data(_X, _y, n_algo_candidates=self.n_algo_candidates))
 
         # meta_learner_config_filename = self.meta_dir + 'meta_learner_%s_%s_%s_config.pkl' % (
         #     self.meta_algo, self.metric, 'none')
@@ -67,6 +71,8 @@ class GBMAdvisor(BaseAdvisor):
         self.model.fit(X, y)
 
     def predict(self, meta_feature):
+        self.load_model()
+
         n_algo = self.n_algo_candidates
         _X = list()
         for i in range(n_algo):
@@ -4,7 +4,12 @@ import numpy as np
 from solnml.datasets.utils import calculate_metafeatures
 
 
-def get_feature_vector(dataset, dataset_id, data_dir='./', task_type=None):
+def get_feature_vector(dataset, dataset_id, data_dir='./', task_type=None,
+                       subsample_size=None, n_jobs=1, cache_dir=None):
+    """
+    Meta-feature vector of a dataset; subsample_size, n_jobs and cache_dir are passed to
+    calculate_metafeatures if the vector is not precomputed.
+    """
     meta_dir = os.path.dirname(__file__) + '/../meta_resource/'
     dataset_meta_feat_filename = meta_dir + 'meta_feature_dataset_%s.pkl' % dataset
     if os.path.exists(dataset_meta_feat_filename):
@@ -12,7 +17,8 @@ def get_feature_vector(dataset, dataset_id, data_dir='./', task_type=None):
             feature_vec = pickle.load(f)
         return feature_vec
     else:
-        feature_dict = calculate_metafeatures(dataset, dataset_id, data_dir, task_type=task_type)
+        feature_dict = calculate_metafeatures(dataset, dataset_id, data_dir, task_type=task_type,
+                                              subsample_size=subsample_size, n_jobs=n_jobs, cache_dir=cache_dir)
         sorted_keys = sorted(feature_dict.keys())
         return [feature_dict[key] for key in sorted_keys]
 
@@ -38,7 +44,13 @@ def fetch_algorithm_runs(meta_dir, dataset, metric, total_resource, rep, buildin
 
 
 def prepare_meta_dataset(meta_dir, metric, total_resource, rep,
-                         buildin_datasets, buildin_algorithms, task_type=None):
+                         buildin_datasets, buildin_algorithms, task_type=None,
+                         subsample_size=None, n_jobs=1, cache_dir=None):
+    """
+    Meta-features and algorithm scores of the given datasets. Missing meta-features are computed
+    with subsample_size, n_jobs and cache_dir (see calculate_metafeatures); they are only saved
+    next to the precomputed ones in meta_dir when they are computed on the full dataset.
+    """
     X, Y = list(), list()
     sorted_keys = None
     include_datasets = list()
@@ -51,15 +63,18 @@ def prepare_meta_dataset(meta_dir, metric, total_resource, rep,
         else:
             # Calculate metafeature for datasets.
             try:
-                feature_dict = calculate_metafeatures(_dataset, task_type=task_type)
+                feature_dict = calculate_metafeatures(_dataset, task_type=task_type,
+                                                      subsample_size=subsample_size, n_jobs=n_jobs,
+                                                      cache_dir=cache_dir)
             except Exception as e:
                 print(e)
                 continue
             if sorted_keys is None:
                 sorted_keys = sorted(feature_dict.keys())
             meta_instance = [feature_dict[key] for key in sorted_keys]
-            with open(dataset_meta_feat_filename, 'wb') as f:
-                pickle.dump(meta_instance, f)
+            if subsample_size is None:
+                with open(dataset_meta_feat_filename, 'wb') as f:
+                    pickle.dump(meta_instance, f)
         X.append(meta_instance)
 
         # Load partial relationship between algorithms.
@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+import pickle as pk
+
+from solnml.utils.file_utils import atomic_dump
+
+
+def _save_npy(array, f):
+    np.save(f, array)
+
+
+class MetaKnowledgeStore(object):
+    """
+    Columnar meta-dataset of the advisors, indexed by dataset (rows) and algorithm (columns).
+
+    The store is a directory of .npy files, so that it is opened with memory maps:
+        meta_features.npy   float64 (n_datasets, n_meta_features)
+        scores.npy          float64 (n_datasets, n_algorithms), -1 where no run exists
+        datasets.npy        str (n_datasets,)
+        algorithms.npy      str (n_algorithms,)
+    Derived arrays, e.g., the pairwise training data of a ranker, are stored next to them
+    as <name>_<i>.npy, and objects derived from the store, e.g., a trained ranker, as <name>.pkl.
+    """
+    _columns = ['meta_features', 'scores', 'datasets', 'algorithms']
+
+    def __init__(self, store_dir, mmap_mode='r'):
+        self.store_dir = store_dir
+        self.mmap_mode = mmap_mode
+        for column in self._columns:
+            setattr(self, column, np.load(self._path(column), mmap_mode=mmap_mode))
+        self._dataset_index = {dataset: idx for idx, dataset in enumerate(self.datasets)}
+        self._algorithm_index = {algo: idx for idx, algo in enumerate(self.algorithms)}
+
+    def _path(self, name):
+        return os.path.join(self.store_dir, '%s.npy' % name)
+
+    @staticmethod
+    def exists(store_dir):
+        return all(os.path.exists(os.path.join(store_dir, '%s.npy' % column))
+                   for column in MetaKnowledgeStore._columns)
+
+    @classmethod
+    def build(cls, store_dir, meta_features, scores, datasets, algorithms):
+        """Write a new store at store_dir, replacing any previous one, and open it."""
+        parent_dir = os.path.dirname(os.path.abspath(store_dir))
+        # Write to a temporary directory first so that readers never see a partial store.
+        tmp_dir = tempfile.mkdtemp(dir=parent_dir, suffix='.tmp')
+        try:
+            arrays = {'meta_features': np.asarray(meta_features, dtype=np.float64),
+                      'scores': np.asarray(scores, dtype=np.float64),
+                      'datasets': np.asarray(datasets, dtype=str),
+                      'algorithms': np.asarray(algorithms, dtype=str)}
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_dir, '%s.npy' % name), array)
+            if os.path.exists(store_dir):
+                shutil.rmtree(store_dir)
+            os.replace(tmp_dir, store_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return cls(store_dir)
+
+    def dataset_index(self, dataset):
+        return self._dataset_index[dataset]
+
+    def algorithm_index(self, algorithm):
+        return self._algorithm_index[algorithm]
+
+    def get_scores(self, dataset):
+        """Scores of all algorithms on dataset, in the order of self.algorithms."""
+        return self.scores[self.dataset_index(dataset)]
+
+    def get_instances(self):
+        """
+        One instance per (dataset, algorithm): the meta-features of the dataset followed by the
+        one-hot vector of the algorithm, with the score as the label.
+        :return: X of shape (n_datasets, n_algorithms, n_meta_features + n_algorithms), y of shape
+            (n_datasets, n_algorithms).
+        """
+        n_datasets, n_algo = self.scores.shape
+        X = np.empty((n_datasets, n_algo, self.meta_features.shape[1] + n_algo))
+        X[:, :, :self.meta_features.shape[1]] = self.meta_features[:, np.newaxis, :]
+        X[:, :, self.meta_features.shape[1]:] = np.eye(n_algo)[np.newaxis, :, :]
+        return X, np.asarray(self.scores)
+
+    def has_arrays(self, name):
+        return os.path.exists(self._path('%s_0' % name))
+
+    def save_arrays(self, name, arrays):
+        # Array 0 is written last, so that has_arrays implies a complete set.
+        for idx, array in reversed(list(enumerate(arrays))):
+            atomic_dump(np.asarray(array), self._path('%s_%d' % (name, idx)), dump_func=_save_npy)
+
+    def load_arrays(self, name):
+        arrays = list()
+        while os.path.exists(self._path('%s_%d' % (name, len(arrays)))):
+            arrays.append(np.load(self._path('%s_%d' % (name, len(arrays))), mmap_mode=self.mmap_mode))
+        return tuple(arrays)
+
+    def _object_path(self, name):
+        return os.path.join(self.store_dir, '%s.pkl' % name)
+
+    def has_object(self, name):
+        return os.path.exists(self._object_path(name))
+
+    def save_object(self, name, obj):
+        return atomic_dump(obj, self._object_path(name))
+
+    def load_object(self, name):
+        with open(self._object_path(name), 'rb') as f:
+            return pk.load(f)
@@ -1,11 +1,10 @@
-import os
 import numpy as np
-import pickle as pk
 from keras import backend as K
 from keras.models import Model
 from keras.layers import Activation, Dense, Input, Subtract
 from keras.layers import BatchNormalization
 from keras.optimizers import SGD
+from keras.callbacks import EarlyStopping
 from solnml.utils.logging_utils import get_logger
 from solnml.components.meta_learning.algorithm_recomendation.base_advisor import BaseAdvisor
 
@@ -17,32 +16,46 @@ class RankNetAdvisor(BaseAdvisor):
                  rep=3,
                  total_resource=20,
                  exclude_datasets=None,
-                 meta_dir=None):
+                 meta_dir=None,
+                 subsample_size=None,
+                 n_jobs=1,
+                 cache_dir=None):
         self.logger = get_logger(self.__module__ + "." + self.__class__.__name__)
         super().__init__(n_algorithm, task_type, metric, rep, total_resource,
-                         'ranknet', exclude_datasets, meta_dir)
+                         'ranknet', exclude_datasets, meta_dir,
+                         subsample_size=subsample_size, n_jobs=n_jobs, cache_dir=cache_dir)
         self.model = None
 
     @staticmethod
     def create_pairwise_data(X, y):
-        X1, X2, labels = list(), list(), list()
-        for _X, _y in zip(X, y):
-            n_sample = len(_X)
-            for i in range(n_sample):
-                for j in range(i+1, n_sample):
-                    if np.isnan(_X[i]).any() or np.isnan(_X[j]).any():
-                        continue
-                    X1.append(_X[i])
-                    X1.append(_X[j])
-                    X2.append(_X[j])
-                    X2.append(_X[i])
-                    _label = 1 if _y[i] > _y[j] else 0
-                    labels.append(_label)
-                    labels.append(1 - _label)
-        X1, X2, labels = np.asarray(X1), np.asarray(X2), np.asarray(labels)
-        # perm = np.random.permutation(X1.shape[0])
-        # return X1[perm], X2[perm], labels[perm]
-        return X1, X2, labels
+        """
+        Both orders of every pair (i, j), i < j, of algorithms evaluated on the same dataset;
+        pairs with a NaN in either instance are skipped.
+
+        :param X: instances of shape (n_datasets, n_algorithms, n_features).
+        :param y: scores of shape (n_datasets, n_algorithms).
+        :return: X1, X2, labels, and the index of the dataset of each pair.
+        """
+        X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        if X.ndim < 3 or X.size == 0:
+            n_features = X.shape[2] if X.ndim == 3 else 0
+            return np.empty((0, n_features)), np.empty((0, n_features)), \
+                np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        first, second = np.triu_indices(X.shape[1], k=1)
+        valid = ~np.isnan(X).any(axis=2)
+        # Row-major order: datasets in turn, and the pairs of a dataset in the order (i, j).
+        dataset_idx, pair_idx = np.nonzero(valid[:, first] & valid[:, second])
+        first, second = first[pair_idx], second[pair_idx]
+        X_i, X_j = X[dataset_idx, first], X[dataset_idx, second]
+        _label = (y[dataset_idx, first] > y[dataset_idx, second]).astype(np.int64)
+
+        # Each pair is followed by its swapped copy.
+        n_features = X.shape[2]
+        X1 = np.stack([X_i, X_j], axis=1).reshape(-1, n_features)
+        X2 = np.stack([X_j, X_i], axis=1).reshape(-1, n_features)
+        labels = np.stack([_label, 1 - _label], axis=1).ravel()
+        groups = np.repeat(dataset_idx, 2)
+        return X1, X2, labels, groups
 
     @staticmethod
     def create_model(input_shape, hidden_layer_sizes, activation, solver):
@@ -79,34 +92,37 @@ class RankNetAdvisor(BaseAdvisor):
         return model
 
     def fit(self, **kwargs):
-        _X, _y = self.load_train_data()
-        X1, X2, y = self.create_pairwise_data(_X, _y)
+        X1, X2, y, groups = self.load_pairwise_data(self.create_pairwise_data)
+        if len(y) == 0:
+            raise ValueError('No pairwise training data in the meta store!')
 
         l1_size = kwargs.get('layer1_size', 64)
         l2_size = kwargs.get('layer2_size', 32)
         act_func = kwargs.get('activation', 'relu')
-        batch_size = kwargs.get('batch_size', 32)
+        batch_size = kwargs.get('batch_size', 512)
+        epochs = kwargs.get('epochs', 200)
+        validation_split = kwargs.get('validation_split', 0.1)
+        patience = kwargs.get('patience', 10)
 
         self.model = self.create_model(X1.shape[1], hidden_layer_sizes=(l1_size, l2_size,),
                                        activation=(act_func, act_func,),
                                        solver='adam')
 
-        self.model.fit([X1, X2], y, epochs=200, batch_size=batch_size)
+        # Hold out whole datasets, so that no validation pair shares a dataset with a training pair.
+        datasets = np.unique(groups)
+        n_valid = int(round(len(datasets) * validation_split))
+        validation_data, callbacks = None, list()
+        if 0 < n_valid < len(datasets):
+            valid_datasets = np.random.RandomState(1).choice(datasets, n_valid, replace=False)
+            is_valid = np.isin(groups, valid_datasets)
+            validation_data = ([X1[is_valid], X2[is_valid]], y[is_valid])
+            X1, X2, y = X1[~is_valid], X2[~is_valid], y[~is_valid]
+            callbacks.append(EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True))
+        self.model.fit([X1, X2], y, epochs=epochs, batch_size=batch_size, shuffle=True,
+                       validation_data=validation_data, callbacks=callbacks)
 
     def predict(self, dataset_meta_feat):
-        meta_learner_filename = self.meta_dir + 'ranknet_model_%s_%s_%s.pkl' % (
-            self.meta_algo, self.metric, self.hash_id)
-
-        if self.model is None:
-            if os.path.exists(meta_learner_filename):
-                print('Load model from file: %s.' % meta_learner_filename)
-                with open(meta_learner_filename, 'rb') as f:
-                    self.model = pk.load(f)
-            else:
-                self.fit()
-                with open(meta_learner_filename, 'wb') as f:
-                    pk.dump(self.model, f)
-                print('Dump model to file: %s.' % meta_learner_filename)
+        self.load_model()
 
         X = self.load_test_data(dataset_meta_feat)
         ranker_output = K.function([self.model.layers[0].input], [self.model.layers[-3].get_output_at(0)])
@@ -0,0 +1,86 @@
+import os
+import numpy as np
+
+from solnml.components.meta_learning.algorithm_recomendation.meta_store import MetaKnowledgeStore
+
+
+def get_meta_data(n_datasets=5, n_meta_features=4, n_algo=3):
+    rng = np.random.RandomState(1)
+    meta_features = rng.rand(n_datasets, n_meta_features).tolist()
+    scores = rng.rand(n_datasets, n_algo).tolist()
+    datasets = ['dataset%d' % idx for idx in range(n_datasets)]
+    algorithms = ['algorithm%d' % idx for idx in range(n_algo)]
+    return meta_features, scores, datasets, algorithms
+
+
+def get_instances_loop(meta_features, scores):
+    """The (dataset, algorithm) instances as BaseAdvisor built them before the store."""
+    meta_X, meta_y = list(), list()
+    for meta_feature, run_results in zip(meta_features, scores):
+        n_algo = len(run_results)
+        _X, _y = list(), list()
+        for i in range(n_algo):
+            vector_i = np.zeros(n_algo)
+            vector_i[i] = 1
+            meta_x = meta_feature.copy()
+            meta_x.extend(vector_i.copy())
+            _X.append(meta_x)
+            _y.append(run_results[i])
+        meta_X.append(_X)
+        meta_y.append(_y)
+    return np.array(meta_X), np.array(meta_y)
+
+
+def test_build_and_open(tmp_path):
+    store_dir = str(tmp_path / 'meta_store')
+    meta_features, scores, datasets, algorithms = get_meta_data()
+    assert not MetaKnowledgeStore.exists(store_dir)
+    MetaKnowledgeStore.build(store_dir, meta_features, scores, datasets, algorithms)
+    assert MetaKnowledgeStore.exists(store_dir)
+
+    store = MetaKnowledgeStore(store_dir)
+    assert isinstance(store.scores, np.memmap)
+    np.testing.assert_array_equal(store.meta_features, meta_features)
+    assert list(store.datasets) == datasets and list(store.algorithms) == algorithms
+    assert store.dataset_index('dataset3') == 3 and store.algorithm_index('algorithm1') == 1
+    np.testing.assert_array_equal(store.get_scores('dataset2'), scores[2])
+
+
+def test_instances_match_loop(tmp_path):
+    meta_features, scores, datasets, algorithms = get_meta_data()
+    store = MetaKnowledgeStore.build(str(tmp_path / 'meta_store'), meta_features, scores, datasets, algorithms)
+    X, y = store.get_instances()
+    _X, _y = get_instances_loop(meta_features, scores)
+    np.testing.assert_array_equal(X, _X)
+    np.testing.assert_array_equal(y, _y)
+
+
+def test_rebuild_replaces_store(tmp_path):
+    store_dir = str(tmp_path / 'meta_store')
+    meta_features, scores, datasets, algorithms = get_meta_data()
+    store = MetaKnowledgeStore.build(store_dir, meta_features, scores, datasets, algorithms)
+    store.save_arrays('pairwise', [np.zeros(3)])
+
+    store = MetaKnowledgeStore.build(store_dir, meta_features[:2], scores[:2], datasets[:2], algorithms)
+    assert len(store.datasets) == 2
+    # Arrays derived from the previous meta data are gone with it.
+    assert not store.has_arrays('pairwise')
+    assert [name for name in os.listdir(str(tmp_path)) if name != 'meta_store'] == []
+
+
+def test_arrays_and_objects(tmp_path):
+    store = MetaKnowledgeStore.build(str(tmp_path / 'meta_store'), *get_meta_data())
+    arrays = (np.arange(6).reshape(3, 2), np.ones(3), np.array([0, 1, 1]))
+    assert not store.has_arrays('pairwise')
+    store.save_arrays('pairwise', arrays)
+    assert store.has_arrays('pairwise')
+    loaded = store.load_arrays('pairwise')
+    assert len(loaded) == 3
+    for array, loaded_array in zip(arrays, loaded):
+        np.testing.assert_array_equal(array, loaded_array)
+
+    assert not store.has_object('model')
+    store.save_object('model', {'weights': [1., 2.]})
+    assert store.has_object('model')
+    assert store.load_object('model') == {'weights': [1., 2.]}
+    assert not [name for name in os.listdir(store.store_dir) if name.endswith('.tmp')]
@@ -1,5 +1,8 @@
 from collections import defaultdict, OrderedDict, deque
 import copy
+import os
+import hashlib
+import pickle as pkl
 
 import numpy as np
 import scipy.stats
@@ -13,6 +16,7 @@ from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 
 from solnml.utils.logging_utils import get_logger
+from solnml.utils.file_utils import atomic_dump
 from solnml.components.utils.constants import CLS_TASKS
 from solnml.components.meta_learning.meta_feature import MetaFeature, HelperFunction, DatasetMetafeatures
 
@@ -965,11 +969,90 @@ def calculate_all_metafeatures_with_labels(X, y, categorical, dataset_name,
                                       dont_calculate=dont_calculate)
 
 
+def _transform_for_npy_metafeatures(X, y, categorical, densify_threshold):
+    """Impute, one-hot encode, scale and shuffle X for the metafeatures computed on numpy arrays."""
+    # TODO make sure this is done as efficient as possible (no copy for
+    # sparse matrices because of wrong sparse format)
+    sparse = scipy.sparse.issparse(X)
+
+    imputer = SimpleImputer(strategy='most_frequent', copy=False)
+    X_transformed = imputer.fit_transform(X.copy())
+    if any(categorical):
+        categorical_idx = [idx for idx, i in enumerate(categorical) if i]
+        ohe = ColumnTransformer([('one-hot', OneHotEncoder(), categorical_idx)], remainder="passthrough")
+        X_transformed = ohe.fit_transform(X_transformed)
+
+    center = not scipy.sparse.isspmatrix(X_transformed)
+    standard_scaler = StandardScaler(copy=False, with_mean=center)
+    X_transformed = standard_scaler.fit_transform(X_transformed)
+    categorical_transformed = [False] * X_transformed.shape[1]
+
+    # Densify the transformed matrix
+    if not sparse and scipy.sparse.issparse(X_transformed):
+        bytes_per_float = X_transformed.dtype.itemsize
+        num_elements = X_transformed.shape[0] * X_transformed.shape[1]
+        megabytes_required = num_elements * bytes_per_float / 1000 / 1000
+        if megabytes_required < densify_threshold:
+            X_transformed = X_transformed.todense()
+
+    # This is not only important for datasets which are somehow
+    # sorted in a strange way, but also prevents lda from failing in
+    # some cases.
+    # Because this is advanced indexing, a copy of the data is returned!!!
+    X_transformed = check_array(X_transformed,
+                                force_all_finite=True,
+                                accept_sparse='csr')
+    rs = np.random.RandomState(42)
+    indices = np.arange(X_transformed.shape[0])
+    rs.shuffle(indices)
+    # TODO Shuffle inplace
+    X_transformed = X_transformed[indices]
+    y_transformed = y[indices]
+    return X_transformed, y_transformed, categorical_transformed
+
+
+def _calculate_metafeature(name, X, y, categorical):
+    # Looked up by name, so that a worker process only receives the name and the data.
+    return metafeatures[name](X, y, categorical)
+
+
+def _get_cache_path(cache_dir, X, y, categorical, task_type, calculate, dont_calculate, subsample_size):
+    from solnml.components.feature_engineering.transformation_graph import compute_fingerprint
+    fingerprint = compute_fingerprint([X, y], categorical)
+    settings = '%s|%s|%s|%s' % (task_type, sorted(calculate) if calculate is not None else None,
+                                sorted(dont_calculate) if dont_calculate is not None else None, subsample_size)
+    key = hashlib.sha1(('%s|%s' % (fingerprint, settings)).encode('utf8')).hexdigest()
+    return os.path.join(cache_dir, 'metafeatures_%s.pkl' % key)
+
+
 def calculate_all_metafeatures(X, y, categorical, dataset_name, task_type,
-                               calculate=None, dont_calculate=None, densify_threshold=1000):
+                               calculate=None, dont_calculate=None, densify_threshold=1000,
+                               subsample_size=None, n_jobs=1, cache_dir=None):
+    """
+    Calculate all metafeatures.
+
+    :param subsample_size: if set, the landmarkers and the PCA-based metafeatures, which fit models
+        on the whole dataset, are computed on a random subset of at most subsample_size rows.
+    :param n_jobs: number of processes computing the landmarkers, which are independent of each other.
+    :param cache_dir: if set, the metafeatures are stored in this directory under the fingerprint
+        of (X, y) and the settings above, and later calls on the same data read them back.
+    """
     logger = get_logger(__name__)
 
-    """Calculate all metafeatures."""
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = _get_cache_path(cache_dir, X, y, categorical, task_type,
+                                     calculate, dont_calculate, subsample_size)
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    mf_ = pkl.load(f)
+                logger.debug("%s: Read metafeatures from %s", dataset_name, cache_path)
+                mf_.dataset_name = dataset_name
+                return mf_
+            except (OSError, EOFError, pkl.UnpicklingError):
+                pass
+
     helper_functions.clear()
     metafeatures.clear()
     mf_ = dict()
@@ -980,6 +1063,9 @@ def calculate_all_metafeatures(X, y, categorical, dataset_name, task_type,
 
     X_transformed = None
     y_transformed = None
+    categorical_transformed = None
+    X_subsample = None
+    y_subsample = None
 
     func_cls = ['NumberOfClasses', 'LogNumberOfFeatures',
                 'ClassProbabilityMin', 'ClassProbabilityMax',
@@ -989,59 +1075,50 @@ def calculate_all_metafeatures(X, y, categorical, dataset_name, task_type,
                 'LandmarkDecisionNodeLearner', 'LandmarkRandomNodeLearner',
                 'LandmarkWorstNodeLearner', 'Landmark1NN']
 
+    def is_skipped(name):
+        if calculate is not None and name not in calculate:
+            return True
+        if dont_calculate is not None and name in dont_calculate:
+            return True
+        return name in func_cls and task_type not in CLS_TASKS
+
+    def get_npy_data():
+        nonlocal X_transformed, y_transformed, X_subsample, y_subsample, categorical_transformed
+        if X_transformed is None:
+            X_transformed, y_transformed, categorical_transformed = \
+                _transform_for_npy_metafeatures(X, y, categorical, densify_threshold)
+            # The rows are already shuffled, so the first ones are a random subset.
+            X_subsample, y_subsample = X_transformed, y_transformed
+            if subsample_size is not None and X_transformed.shape[0] > subsample_size:
+                X_subsample, y_subsample = X_transformed[:subsample_size], y_transformed[:subsample_size]
+
+    landmarks = [name for name in landmark_metafeatures if name in metafeatures and not is_skipped(name)]
+    if n_jobs != 1 and len(landmarks) > 1:
+        get_npy_data()
+        from joblib import Parallel, delayed
+        values = Parallel(n_jobs=n_jobs, max_nbytes='1M')(
+            delayed(_calculate_metafeature)(name, X_subsample, y_subsample, categorical_transformed)
+            for name in landmarks)
+        for name, value in zip(landmarks, values):
+            metafeatures.set_value(name, value)
+            mf_[name] = value
+            visited.add(name)
+
     # TODO calculate the numpy metafeatures after all others to consume less
     # memory
     while len(to_visit) > 0:
         name = to_visit.pop()
-        if calculate is not None and name not in calculate:
-            continue
-        if dont_calculate is not None and name in dont_calculate:
-            continue
-        if name in func_cls and task_type not in CLS_TASKS:
+        if name in visited or is_skipped(name):
             continue
 
         if name in npy_metafeatures:
-            if X_transformed is None:
-                # TODO make sure this is done as efficient as possible (no copy for
-                # sparse matrices because of wrong sparse format)
-                sparse = scipy.sparse.issparse(X)
-
-                imputer = SimpleImputer(strategy='most_frequent', copy=False)
-                X_transformed = imputer.fit_transform(X.copy())
-                if any(categorical):
-                    categorical_idx = [idx for idx, i in enumerate(categorical) if i]
-                    ohe = ColumnTransformer([('one-hot', OneHotEncoder(), categorical_idx)], remainder="passthrough")
-                    X_transformed = ohe.fit_transform(X_transformed)
-
-                center = not scipy.sparse.isspmatrix(X_transformed)
-                standard_scaler = StandardScaler(copy=False, with_mean=center)
-                X_transformed = standard_scaler.fit_transform(X_transformed)
-                categorical_transformed = [False] * X_transformed.shape[1]
-
-                # Densify the transformed matrix
-                if not sparse and scipy.sparse.issparse(X_transformed):
-                    bytes_per_float = X_transformed.dtype.itemsize
-                    num_elements = X_transformed.shape[0] * X_transformed.shape[1]
-                    megabytes_required = num_elements * bytes_per_float / 1000 / 1000
-                    if megabytes_required < densify_threshold:
-                        X_transformed = X_transformed.todense()
-
-                # This is not only important for datasets which are somehow
-                # sorted in a strange way, but also prevents lda from failing in
-                # some cases.
-                # Because this is advanced indexing, a copy of the data is returned!!!
-                X_transformed = check_array(X_transformed,
-                                            force_all_finite=True,
-                                            accept_sparse='csr')
-                rs = np.random.RandomState(42)
-                indices = np.arange(X_transformed.shape[0])
-                rs.shuffle(indices)
-                # TODO Shuffle inplace
-                X_transformed = X_transformed[indices]
-                y_transformed = y[indices]
-
-            X_ = X_transformed
-            y_ = y_transformed
+            get_npy_data()
+            if name in subsampled_metafeatures:
+                X_ = X_subsample
+                y_ = y_subsample
+            else:
+                X_ = X_transformed
+                y_ = y_transformed
             categorical_ = categorical_transformed
         else:
             X_ = X
@@ -1077,6 +1154,9 @@ def calculate_all_metafeatures(X, y, categorical, dataset_name, task_type,
         visited.add(name)
 
     mf_ = DatasetMetafeatures(dataset_name, mf_, task_type=task_type)
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        atomic_dump(mf_, cache_path)
     return mf_
 
 
@@ -1086,6 +1166,12 @@ npy_metafeatures = {"LandmarkLDA", "LandmarkNaiveBayes", "LandmarkDecisionTree",
                     "Skewnesses", "SkewnessMin", "SkewnessMax", "SkewnessMean", "SkewnessSTD", "Kurtosisses",
                     "KurtosisMin", "KurtosisMax", "KurtosisMean", "KurtosisSTD"}
 
+# Metafeatures fitting models on the data; they are computed on a subsample of the rows if one is requested.
+landmark_metafeatures = ["LandmarkLDA", "LandmarkNaiveBayes", "LandmarkDecisionTree", "LandmarkDecisionNodeLearner",
+                         "LandmarkRandomNodeLearner", "LandmarkWorstNodeLearner", "Landmark1NN"]
+subsampled_metafeatures = set(landmark_metafeatures) | {"PCAFractionOfComponentsFor95PercentVariance",
+                                                        "PCAKurtosisFirstPC", "PCASkewnessFirstPC"}
+
 subsets = dict()
 # All implemented metafeatures
 subsets["all"] = set(metafeatures.functions.keys())
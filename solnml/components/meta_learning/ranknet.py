@@ -1,6 +1,7 @@
 from keras import backend as K
 from keras.layers import Activation, Dense, Input, Subtract
 from keras.models import Model
+from keras.callbacks import EarlyStopping
 import numpy as np
 import math
 
@@ -104,7 +105,36 @@ class RankerNN(object):
     def _transform_pairwise(self, X, y, qid):
         return None, None, None, None
 
-    def fit(self, X, y, qid, batch_size=None, epochs=1, verbose=1, validation_split=0.0):
+    @staticmethod
+    def _pair_weight(pos_idx, neg_idx, rel, idcg):
+        return np.ones(len(pos_idx))
+
+    def _build_pairs(self, X, y, qid):
+        """Build the pairs (pos, neg) with rel[pos] > rel[neg] of every query, one query at a time.
+        The pairs of a query come from one comparison of its relevances, in the order of a loop over
+        pos then neg; their sample weights are given by _pair_weight.
+        """
+        qid2indices, qid2rel, qid2idcg, _ = self._fetch_qid_data(y, qid)
+        X = np.asarray(X)
+        X1, X2, weight, Y = [], [], [], []
+        for qid_unique_idx in range(len(qid2indices)):
+            if qid2idcg[qid_unique_idx] == 0:
+                continue
+            rel = np.asarray(qid2rel[qid_unique_idx])
+            pos_idx, neg_idx = np.nonzero(rel[:, np.newaxis] > rel[np.newaxis, :])
+            # balanced class
+            label = (qid_unique_idx + pos_idx + neg_idx) % 2 == 1
+            qid_start_idx = qid2indices[qid_unique_idx]
+            X1.append(X[qid_start_idx + np.where(label, pos_idx, neg_idx)])
+            X2.append(X[qid_start_idx + np.where(label, neg_idx, pos_idx)])
+            weight.append(self._pair_weight(pos_idx, neg_idx, rel, qid2idcg[qid_unique_idx]))
+            Y.append(label.astype(np.int64))
+        if len(Y) == 0:
+            empty = np.empty((0,) + X.shape[1:], dtype=X.dtype)
+            return empty, empty.copy(), np.empty(0, dtype=np.int64), np.empty(0)
+        return np.concatenate(X1), np.concatenate(X2), np.concatenate(Y), np.concatenate(weight)
+
+    def fit(self, X, y, qid, batch_size=None, epochs=1, verbose=1, validation_split=0.0, patience=None):
         """Transform data and fit model.
         Parameters
         ----------
@@ -114,10 +144,20 @@ class RankerNN(object):
             Target labels.
         qid: array, shape (n_samples,)
             Query id that represents the grouping of samples.
+        patience: integer
+            If set with validation_split > 0, training stops once the validation loss has not
+            improved for patience epochs, and the best weights are restored.
         """
         X1_trans, X2_trans, y_trans, weight = self._transform_pairwise(X, y, qid)
+        callbacks = []
+        if validation_split > 0:
+            # Keras holds out the last pairs, which come from the last queries; shuffle them first.
+            perm = np.random.RandomState(1).permutation(len(y_trans))
+            X1_trans, X2_trans, y_trans, weight = X1_trans[perm], X2_trans[perm], y_trans[perm], weight[perm]
+            if patience is not None:
+                callbacks.append(EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True))
         self.model.fit([X1_trans, X2_trans], y_trans, sample_weight=weight, batch_size=batch_size, epochs=epochs,
-                       verbose=verbose, validation_split=validation_split)
+                       verbose=verbose, validation_split=validation_split, callbacks=callbacks)
         self.evaluate(X, y, qid)
 
     def predict(self, X):
@@ -205,33 +245,7 @@ class RankNetNN(RankerNN):
         y_trans : array, shape (k,)
             Output class labels, where classes have values {0, 1}
         """
-        qid2indices, qid2rel, qid2idcg, _ = self._fetch_qid_data(y, qid)
-        X1 = []
-        X2 = []
-        weight = []
-        Y = []
-        for qid_unique_idx in range(len(qid2indices)):
-            if qid2idcg[qid_unique_idx] == 0:
-                continue
-            IDCG = 1.0 / qid2idcg[qid_unique_idx]
-            rel_list = qid2rel[qid_unique_idx]
-            qid_start_idx = qid2indices[qid_unique_idx]
-            for pos_idx in range(len(rel_list)):
-                for neg_idx in range(len(rel_list)):
-                    if rel_list[pos_idx] <= rel_list[neg_idx]:
-                        continue
-                    # balanced class
-                    if 1 != (-1) ** (qid_unique_idx + pos_idx + neg_idx):
-                        X1.append(X[qid_start_idx + pos_idx])
-                        X2.append(X[qid_start_idx + neg_idx])
-                        weight.append(1)
-                        Y.append(1)
-                    else:
-                        X1.append(X[qid_start_idx + neg_idx])
-                        X2.append(X[qid_start_idx + pos_idx])
-                        weight.append(1)
-                        Y.append(0)
-        return np.asarray(X1), np.asarray(X2), np.asarray(Y), np.asarray(weight)
+        return self._build_pairs(X, y, qid)
 
 
 class LambdaRankNN(RankerNN):
@@ -239,6 +253,17 @@ class LambdaRankNN(RankerNN):
     def __init__(self, input_size, hidden_layer_sizes=(100,), activation=('relu',), solver='adam'):
         super(LambdaRankNN, self).__init__(input_size, hidden_layer_sizes, activation, solver)
 
+    @staticmethod
+    def _pair_weight(pos_idx, neg_idx, rel, idcg):
+        """Lambda: the change of DCG / IDCG when the two items swap their positions."""
+        pos_loginv = 1.0 / np.log2(pos_idx + 2)
+        neg_loginv = 1.0 / np.log2(neg_idx + 2)
+        pos_gain = 2. ** rel[pos_idx] - 1
+        neg_gain = 2. ** rel[neg_idx] - 1
+        original = pos_gain * pos_loginv + neg_gain * neg_loginv
+        changed = neg_gain * pos_loginv + pos_gain * neg_loginv
+        return np.abs(original - changed) / idcg
+
     def _transform_pairwise(self, X, y, qid):
         """Transform data into lambdarank pairs with balanced labels
         for binary classification.
@@ -261,40 +286,4 @@ class LambdaRankNN(RankerNN):
         y_trans : array, shape (k,)
             Output class labels, where classes have values {0, 1}
         """
-        qid2indices, qid2rel, qid2idcg, _ = self._fetch_qid_data(y, qid)
-        X1 = []
-        X2 = []
-        weight = []
-        Y = []
-        for qid_unique_idx in range(len(qid2indices)):
-            if qid2idcg[qid_unique_idx] == 0:
-                continue
-            IDCG = 1.0 / qid2idcg[qid_unique_idx]
-            rel_list = qid2rel[qid_unique_idx]
-            qid_start_idx = qid2indices[qid_unique_idx]
-            for pos_idx in range(len(rel_list)):
-                for neg_idx in range(len(rel_list)):
-                    if rel_list[pos_idx] <= rel_list[neg_idx]:
-                        continue
-                    # calculate lambda
-                    pos_loginv = 1.0 / math.log2(pos_idx + 2)
-                    neg_loginv = 1.0 / math.log2(neg_idx + 2)
-                    pos_label = rel_list[pos_idx]
-                    neg_label = rel_list[neg_idx]
-                    original = ((1 << pos_label) - 1) * pos_loginv + ((1 << neg_label) - 1) * neg_loginv
-                    changed = ((1 << neg_label) - 1) * pos_loginv + ((1 << pos_label) - 1) * neg_loginv
-                    delta = (original - changed) * IDCG
-                    if delta < 0:
-                        delta = -delta
-                    # balanced class
-                    if 1 != (-1) ** (qid_unique_idx + pos_idx + neg_idx):
-                        X1.append(X[qid_start_idx + pos_idx])
-                        X2.append(X[qid_start_idx + neg_idx])
-                        weight.append(delta)
-                        Y.append(1)
-                    else:
-                        X1.append(X[qid_start_idx + neg_idx])
-                        X2.append(X[qid_start_idx + pos_idx])
-                        weight.append(delta)
-                        Y.append(0)
-        return np.asarray(X1), np.asarray(X2), np.asarray(Y), np.asarray(weight)
+        return self._build_pairs(X, y, qid)
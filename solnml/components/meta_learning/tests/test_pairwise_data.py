@@ -0,0 +1,108 @@
+import math
+import numpy as np
+import pytest
+
+pytest.importorskip('keras')
+
+from solnml.components.meta_learning.ranknet import RankNetNN, LambdaRankNN
+from solnml.components.meta_learning.algorithm_recomendation.ranknet_advisor import RankNetAdvisor
+
+
+def create_pairwise_data_loop(X, y):
+    """The pair generation of RankNetAdvisor before it was vectorized."""
+    X1, X2, labels = list(), list(), list()
+    for _X, _y in zip(X, y):
+        n_sample = len(_X)
+        for i in range(n_sample):
+            for j in range(i + 1, n_sample):
+                if np.isnan(_X[i]).any() or np.isnan(_X[j]).any():
+                    continue
+                X1.append(_X[i])
+                X1.append(_X[j])
+                X2.append(_X[j])
+                X2.append(_X[i])
+                _label = 1 if _y[i] > _y[j] else 0
+                labels.append(_label)
+                labels.append(1 - _label)
+    return np.asarray(X1), np.asarray(X2), np.asarray(labels)
+
+
+def transform_pairwise_loop(ranker, X, y, qid, lambda_weight):
+    """The pair generation of RankNetNN and LambdaRankNN before it was vectorized."""
+    qid2indices, qid2rel, qid2idcg, _ = ranker._fetch_qid_data(y, qid)
+    X1, X2, weight, Y = [], [], [], []
+    for qid_unique_idx in range(len(qid2indices)):
+        if qid2idcg[qid_unique_idx] == 0:
+            continue
+        IDCG = 1.0 / qid2idcg[qid_unique_idx]
+        rel_list = qid2rel[qid_unique_idx]
+        qid_start_idx = qid2indices[qid_unique_idx]
+        for pos_idx in range(len(rel_list)):
+            for neg_idx in range(len(rel_list)):
+                if rel_list[pos_idx] <= rel_list[neg_idx]:
+                    continue
+                delta = 1
+                if lambda_weight:
+                    pos_loginv = 1.0 / math.log2(pos_idx + 2)
+                    neg_loginv = 1.0 / math.log2(neg_idx + 2)
+                    pos_label = int(rel_list[pos_idx])
+                    neg_label = int(rel_list[neg_idx])
+                    original = ((1 << pos_label) - 1) * pos_loginv + ((1 << neg_label) - 1) * neg_loginv
+                    changed = ((1 << neg_label) - 1) * pos_loginv + ((1 << pos_label) - 1) * neg_loginv
+                    delta = abs((original - changed) * IDCG)
+                if 1 != (-1) ** (qid_unique_idx + pos_idx + neg_idx):
+                    X1.append(X[qid_start_idx + pos_idx])
+                    X2.append(X[qid_start_idx + neg_idx])
+                    Y.append(1)
+                else:
+                    X1.append(X[qid_start_idx + neg_idx])
+                    X2.append(X[qid_start_idx + pos_idx])
+                    Y.append(0)
+                weight.append(delta)
+    return np.asarray(X1), np.asarray(X2), np.asarray(Y), np.asarray(weight)
+
+
+def test_create_pairwise_data_matches_loop():
+    rng = np.random.RandomState(1)
+    X = rng.rand(6, 5, 4)
+    y = rng.rand(6, 5)
+    y[2, 3] = y[2, 1]
+    # Algorithms that were not run on a dataset have NaN instances.
+    X[1, 2] = np.nan
+    X[4, :, 0] = np.nan
+
+    X1, X2, labels, groups = RankNetAdvisor.create_pairwise_data(X, y)
+    _X1, _X2, _labels = create_pairwise_data_loop(X, y)
+    np.testing.assert_array_equal(X1, _X1)
+    np.testing.assert_array_equal(X2, _X2)
+    np.testing.assert_array_equal(labels, _labels)
+
+    # Every pair knows its dataset, so that the validation split can hold out whole datasets.
+    n_valid = (~np.isnan(X).any(axis=2)).sum(axis=1)
+    np.testing.assert_array_equal(groups, np.repeat(np.arange(len(X)), n_valid * (n_valid - 1)))
+
+
+def test_create_pairwise_data_empty():
+    X1, X2, labels, groups = RankNetAdvisor.create_pairwise_data(np.full((2, 3, 4), np.nan), np.zeros((2, 3)))
+    assert X1.shape == (0, 4) and X2.shape == (0, 4)
+    assert len(labels) == 0 and len(groups) == 0
+    X1, X2, labels, groups = RankNetAdvisor.create_pairwise_data(np.empty((0, 3, 4)), np.empty((0, 3)))
+    assert len(labels) == 0 and len(groups) == 0
+
+
+@pytest.mark.parametrize('ranker_class, lambda_weight', [(RankNetNN, False), (LambdaRankNN, True)])
+def test_transform_pairwise_matches_loop(ranker_class, lambda_weight):
+    rng = np.random.RandomState(1)
+    qid = np.repeat(np.arange(5), 6)
+    X = rng.rand(len(qid), 4)
+    y = rng.randint(4, size=len(qid))
+    # A query without relevant items yields no pairs.
+    y[qid == 3] = 0
+
+    ranker = ranker_class(input_size=4, hidden_layer_sizes=(8,), activation=('relu',))
+    X1, X2, Y, weight = ranker._transform_pairwise(X, y, qid)
+    _X1, _X2, _Y, _weight = transform_pairwise_loop(ranker, X, y, qid, lambda_weight)
+    np.testing.assert_array_equal(X1, _X1)
+    np.testing.assert_array_equal(X2, _X2)
+    np.testing.assert_array_equal(Y, _Y)
+    np.testing.assert_allclose(weight, _weight)
@@ -0,0 +1,84 @@
+"""
+Metrics evaluated on a batch of predictions at once.
+
+Every kernel takes the true labels of shape (n_samples,) and a stack of
+predictions of shape (n_candidates, n_samples, n_classes) for classification
+or (n_candidates, n_samples) for regression, and returns one score per
+candidate. They reproduce the corresponding sklearn metric so that ensemble
+selection can score all candidate ensembles of a step in one pass.
+"""
+import numpy as np
+from sklearn.metrics.scorer import _PredictScorer, _ProbaScorer
+
+from solnml.components.utils.constants import CLS_TASKS
+
+# Upper bound on the memory of the candidate predictions built in one broadcast.
+MAX_CANDIDATE_BYTES = 256 * 1024 * 1024
+
+
+def _encode_labels(y_true):
+    classes, y_idx = np.unique(y_true, return_inverse=True)
+    return classes, y_idx
+
+
+def batch_accuracy(y_true, preds):
+    y_pred = np.argmax(preds, axis=-1)
+    return np.mean(y_pred == np.asarray(y_true)[np.newaxis, :], axis=1)
+
+
+def batch_balanced_accuracy(y_true, preds):
+    y_true = np.asarray(y_true)
+    classes, y_idx = _encode_labels(y_true)
+    correct = (np.argmax(preds, axis=-1) == y_true[np.newaxis, :]).astype(np.float64)
+    # Recall of each class present in y_true, averaged over the classes.
+    n_candidates, n_classes = correct.shape[0], len(classes)
+    bins = (np.arange(n_candidates)[:, np.newaxis] * n_classes + y_idx[np.newaxis, :]).ravel()
+    hits = np.bincount(bins, weights=correct.ravel(), minlength=n_candidates * n_classes)
+    recall = hits.reshape(n_candidates, n_classes) / np.bincount(y_idx, minlength=n_classes)
+    return np.mean(recall, axis=1)
+
+
+def batch_log_loss(y_true, preds, eps=1e-15):
+    classes, y_idx = _encode_labels(y_true)
+    if len(classes) != preds.shape[-1]:
+        raise ValueError('y_true has %d classes but the predictions have %d columns.'
+                         % (len(classes), preds.shape[-1]))
+    preds = np.clip(preds, eps, 1 - eps)
+    sample_idx = np.arange(preds.shape[1])
+    true_prob = preds[:, sample_idx, y_idx] / preds.sum(axis=-1)
+    return -np.mean(np.log(true_prob), axis=1)
+
+
+def batch_mean_squared_error(y_true, preds):
+    return np.mean((preds - np.asarray(y_true)[np.newaxis, :]) ** 2, axis=1)
+
+
+def _get_kernel(score_func_name, scorer_type, task_type):
+    if task_type in CLS_TASKS:
+        if scorer_type is _PredictScorer and score_func_name == 'accuracy_score':
+            return batch_accuracy
+        if scorer_type is _PredictScorer and score_func_name == 'balanced_accuracy_score':
+            return batch_balanced_accuracy
+        if scorer_type is _ProbaScorer and score_func_name == 'log_loss':
+            return batch_log_loss
+    elif scorer_type is _PredictScorer and score_func_name == 'mean_squared_error':
+        return batch_mean_squared_error
+    return None
+
+
+def get_batch_score_func(metric, task_type):
+    """
+    Return a function (preds, y_true) -> scores with the sign of the scorer applied
+    (greater is better), or None if the metric has no batch kernel.
+    """
+    if getattr(metric, '_kwargs', None):
+        return None
+    score_func = getattr(metric, '_score_func', None)
+    kernel = _get_kernel(getattr(score_func, '__name__', None), type(metric), task_type)
+    if kernel is None:
+        return None
+
+    def score(preds, y_true):
+        return kernel(y_true, preds) * metric._sign
+
+    return score
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from solnml.components.utils.constants import MULTICLASS_CLS, REGRESSION
+from solnml.components.metrics.metric import get_metric
+from solnml.components.metrics.batch_metrics import get_batch_score_func
+
+
+def get_cls_candidates(n_candidates=7, n_samples=50, n_classes=3):
+    rng = np.random.RandomState(1)
+    y_true = rng.randint(n_classes, size=n_samples)
+    preds = rng.rand(n_candidates, n_samples, n_classes)
+    preds /= preds.sum(axis=-1, keepdims=True)
+    return y_true, preds
+
+
+def score_one_by_one(metric, y_true, preds, needs_labels):
+    """The per-candidate scoring of ensemble selection, which the kernels replace."""
+    scores = list()
+    for pred in preds:
+        if needs_labels:
+            pred = np.argmax(pred, axis=-1)
+        scores.append(metric._score_func(y_true, pred) * metric._sign)
+    return np.array(scores)
+
+
+@pytest.mark.parametrize('metric_name, needs_labels', [('acc', True), ('bal_acc', True), ('log_loss', False)])
+def test_cls_kernels_match_sklearn(metric_name, needs_labels):
+    y_true, preds = get_cls_candidates()
+    metric = get_metric(metric_name)
+    batch_score_func = get_batch_score_func(metric, MULTICLASS_CLS)
+    assert batch_score_func is not None
+    np.testing.assert_allclose(batch_score_func(preds, y_true),
+                               score_one_by_one(metric, y_true, preds, needs_labels))
+
+
+def test_bal_acc_with_absent_class():
+    # Class 2 is predicted but never occurs in y_true, so it has no recall to average.
+    y_true, preds = get_cls_candidates()
+    y_true[y_true == 2] = 0
+    metric = get_metric('bal_acc')
+    np.testing.assert_allclose(get_batch_score_func(metric, MULTICLASS_CLS)(preds, y_true),
+                               score_one_by_one(metric, y_true, preds, True))
+
+
+def test_mse_kernel_matches_sklearn():
+    rng = np.random.RandomState(1)
+    y_true = rng.rand(50)
+    preds = rng.rand(7, 50)
+    metric = get_metric('mse')
+    np.testing.assert_allclose(get_batch_score_func(metric, REGRESSION)(preds, y_true),
+                               score_one_by_one(metric, y_true, preds, False))
+
+
+@pytest.mark.parametrize('metric_name, task_type', [('f1', MULTICLASS_CLS), ('auc', MULTICLASS_CLS),
+                                                    ('r2', REGRESSION), ('acc', REGRESSION)])
+def test_no_kernel(metric_name, task_type):
+    # These fall back to scoring the candidates one by one.
+    assert get_batch_score_func(get_metric(metric_name), task_type) is None
@@ -36,6 +36,12 @@ class GradientBoostingClassifier(IterativeComponentWithSampleWeight,
         self.estimator = None
         self.fully_fit_ = False
 
+    def get_max_iter(self):
+        return int(self.n_estimators)
+
+    def get_current_iter(self):
+        return 0 if self.estimator is None else len(self.estimator.estimators_)
+
     def iterative_fit(self, X, y, sample_weight=None, n_iter=1, refit=False):
 
         # Special fix for gradient boosting!
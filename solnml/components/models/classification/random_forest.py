@@ -38,7 +38,7 @@ class RandomForest(
         return 100
 
     def get_current_iter(self):
-        return self.estimator.n_estimators
+        return 0 if self.estimator is None else self.estimator.n_estimators
 
     def iterative_fit(self, X, y, sample_weight=None, n_iter=1, refit=False):
         from sklearn.ensemble import RandomForestClassifier
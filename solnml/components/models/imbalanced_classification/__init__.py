@@ -1,9 +1,9 @@
 import os
 from solnml.components.models.base_model import BaseClassificationModel
-from solnml.components.utils.class_loader import find_components, ThirdPartyComponents
+from solnml.components.utils.class_loader import find_lazy_components, ThirdPartyComponents
 
 """
 Load the buildin classifiers.
 """
 imbalanced_classifiers_directory = os.path.split(__file__)[0]
-_imb_classifiers = find_components(__package__, imbalanced_classifiers_directory, BaseClassificationModel)
+_imb_classifiers = find_lazy_components(__package__, imbalanced_classifiers_directory, BaseClassificationModel)
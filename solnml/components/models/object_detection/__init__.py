@@ -1,12 +1,12 @@
 import os
 from solnml.components.models.base_nn import BaseODClassificationNeuralNetwork
-from solnml.components.utils.class_loader import find_components, ThirdPartyComponents
+from solnml.components.utils.class_loader import find_lazy_components, ThirdPartyComponents
 
 """
 Load the buildin classifiers.
 """
 classifiers_directory = os.path.split(__file__)[0]
-_classifiers = find_components(__package__, classifiers_directory, BaseODClassificationNeuralNetwork)
+_classifiers = find_lazy_components(__package__, classifiers_directory, BaseODClassificationNeuralNetwork)
 _classifiers.pop('retinanet')
 
 """
@@ -1,12 +1,12 @@
 import os
 from solnml.components.models.base_model import BaseRegressionModel
-from solnml.components.utils.class_loader import find_components, ThirdPartyComponents
+from solnml.components.utils.class_loader import find_lazy_components, ThirdPartyComponents
 
 """
 Load the buildin regressors.
 """
 regressors_directory = os.path.split(__file__)[0]
-_regressors = find_components(__package__, regressors_directory, BaseRegressionModel)
+_regressors = find_lazy_components(__package__, regressors_directory, BaseRegressionModel)
 
 """
 Load third-party classifiers. 
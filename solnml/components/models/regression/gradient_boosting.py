@@ -36,6 +36,12 @@ class GradientBoostingRegressor(IterativeComponentWithSampleWeight, BaseRegressi
         self.start_time = time.time()
         self.time_limit = None
 
+    def get_max_iter(self):
+        return int(self.n_estimators)
+
+    def get_current_iter(self):
+        return 0 if self.estimator is None else len(self.estimator.estimators_)
+
     def iterative_fit(self, X, y, sample_weight=None, n_iter=1, refit=False):
 
         from sklearn.ensemble.gradient_boosting import GradientBoostingRegressor as GBR
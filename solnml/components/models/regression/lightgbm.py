@@ -4,7 +4,6 @@ from ConfigSpace.hyperparameters import UniformFloatHyperparameter, \
     UniformIntegerHyperparameter, CategoricalHyperparameter, \
     UnParametrizedHyperparameter
 import numpy as np
-from lightgbm import LGBMRegressor
 
 from solnml.components.utils.constants import *
 from solnml.components.models.base_model import BaseRegressionModel
@@ -26,20 +25,43 @@ class LightGBM(BaseRegressionModel):
         self.random_state = random_state
         self.estimator = None
 
+    def _get_estimator(self, n_estimators):
+        from lightgbm import LGBMRegressor
+        return LGBMRegressor(num_leaves=self.num_leaves,
+                             learning_rate=self.learning_rate,
+                             n_estimators=n_estimators,
+                             min_child_weight=self.min_child_weight,
+                             subsample=self.subsample,
+                             colsample_bytree=self.colsample_bytree,
+                             reg_alpha=self.reg_alpha,
+                             reg_lambda=self.reg_lambda,
+                             random_state=self.random_state,
+                             n_jobs=self.n_jobs)
+
     def fit(self, X, y):
-        self.estimator = LGBMRegressor(num_leaves=self.num_leaves,
-                                       learning_rate=self.learning_rate,
-                                       n_estimators=self.n_estimators,
-                                       min_child_weight=self.min_child_weight,
-                                       subsample=self.subsample,
-                                       colsample_bytree=self.colsample_bytree,
-                                       reg_alpha=self.reg_alpha,
-                                       reg_lambda=self.reg_lambda,
-                                       random_state=self.random_state,
-                                       n_jobs=self.n_jobs)
+        self.estimator = self._get_estimator(self.n_estimators)
         self.estimator.fit(X, y)
         return self
 
+    def get_max_iter(self):
+        return int(self.n_estimators)
+
+    def get_current_iter(self):
+        return 0 if self.estimator is None else self.estimator.booster_.current_iteration()
+
+    def iterative_fit(self, X, y, sample_weight=None, n_iter=1, refit=False):
+        """Add n_iter boosting rounds to the current booster, or start a new one if refit."""
+        if refit:
+            self.estimator = None
+        n_iter = min(n_iter, self.get_max_iter() - self.get_current_iter())
+        if n_iter <= 0:
+            return self
+        init_model = None if self.estimator is None else self.estimator.booster_
+        estimator = self._get_estimator(n_iter)
+        estimator.fit(X, y, sample_weight=sample_weight, init_model=init_model)
+        self.estimator = estimator
+        return self
+
     def predict(self, X):
         if self.estimator is None:
             raise NotImplementedError()
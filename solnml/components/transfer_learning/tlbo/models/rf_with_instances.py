@@ -88,19 +88,6 @@ class RandomForestWithInstances(AbstractModel):
         self.log_y = log_y
         self.rng = regression.default_random_engine(seed)
 
-        self.rf_opts = regression.forest_opts()
-        self.rf_opts.num_trees = num_trees
-        self.rf_opts.do_bootstrapping = do_bootstrapping
-        max_features = 0 if ratio_features > 1.0 else \
-            max(1, int(types.shape[0] * ratio_features))
-        self.rf_opts.tree_opts.max_features = max_features
-        self.rf_opts.tree_opts.min_samples_to_split = min_samples_split
-        self.rf_opts.tree_opts.min_samples_in_leaf = min_samples_leaf
-        self.rf_opts.tree_opts.max_depth = max_depth
-        self.rf_opts.tree_opts.epsilon_purity = eps_purity
-        self.rf_opts.tree_opts.max_num_nodes = max_num_nodes
-        self.rf_opts.compute_law_of_total_variance = False
-
         self.n_points_per_tree = n_points_per_tree
         self.rf = None  # type: regression.binary_rss_forest
 
@@ -109,10 +96,53 @@ class RandomForestWithInstances(AbstractModel):
                        n_points_per_tree, ratio_features, min_samples_split,
                        min_samples_leaf, max_depth, eps_purity, seed]
         self.seed = seed
+        self.rf_opts = self._build_rf_opts()
 
         self.logger = logging.getLogger(self.__module__ + "." +
                                         self.__class__.__name__)
 
+    def _build_rf_opts(self):
+        """Build the pyrfr forest options from self.hypers."""
+        num_trees, max_num_nodes, do_bootstrapping, n_points_per_tree, ratio_features, \
+            min_samples_split, min_samples_leaf, max_depth, eps_purity, _ = self.hypers
+        rf_opts = regression.forest_opts()
+        rf_opts.num_trees = num_trees
+        rf_opts.do_bootstrapping = do_bootstrapping
+        max_features = 0 if ratio_features > 1.0 else \
+            max(1, int(self._initial_types.shape[0] * ratio_features))
+        rf_opts.tree_opts.max_features = max_features
+        rf_opts.tree_opts.min_samples_to_split = min_samples_split
+        rf_opts.tree_opts.min_samples_in_leaf = min_samples_leaf
+        rf_opts.tree_opts.max_depth = max_depth
+        rf_opts.tree_opts.epsilon_purity = eps_purity
+        rf_opts.tree_opts.max_num_nodes = max_num_nodes
+        rf_opts.compute_law_of_total_variance = False
+        return rf_opts
+
+    def __getstate__(self):
+        # The pyrfr objects are SWIG proxies, which cannot be pickled. The fitted forest is kept as
+        # its ascii representation; the options and the random engine are rebuilt from the hypers.
+        state = self.__dict__.copy()
+        del state['rf_opts']
+        del state['rng']
+        if self.rf is not None:
+            state['rf'] = self.rf.ascii_string_representation()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.rng = regression.default_random_engine(self.seed)
+        self.rf_opts = self._build_rf_opts()
+        if self.rf is not None:
+            if self.n_points_per_tree <= 0:
+                self.rf_opts.num_data_points_per_tree = self.X.shape[0]
+            else:
+                self.rf_opts.num_data_points_per_tree = self.n_points_per_tree
+            rf = regression.binary_rss_forest()
+            rf.options = self.rf_opts
+            rf.load_from_ascii_string(state['rf'])
+            self.rf = rf
+
     def _train(self, X: np.ndarray, y: np.ndarray):
         """Trains the random forest on X and y.
 
@@ -0,0 +1,70 @@
+import os
+import pickle as pk
+import numpy as np
+import pytest
+
+pytest.importorskip('pyrfr')
+
+from ConfigSpace import ConfigurationSpace, UniformFloatHyperparameter, CategoricalHyperparameter
+
+from solnml.components.transfer_learning.tlbo.config_space.util import convert_configurations_to_array
+from solnml.components.transfer_learning.tlbo.models.rf_with_instances import RandomForestWithInstances
+from solnml.components.transfer_learning.tlbo.tlbo_optimizer import get_surrogate_cache_path, \
+    get_default_surrogate_cache_dir
+
+
+def get_run_history(n_runs=30):
+    cs = ConfigurationSpace(seed=1)
+    cs.add_hyperparameters([UniformFloatHyperparameter('learning_rate', 1e-3, 1., log=True),
+                            UniformFloatHyperparameter('subsample', 0.5, 1.),
+                            CategoricalHyperparameter('criterion', ['gini', 'entropy'])])
+    X = convert_configurations_to_array(cs.sample_configuration(n_runs))
+    y = -np.random.RandomState(1).rand(n_runs, 1)
+    return cs, X, y
+
+
+def test_pickled_surrogate_predicts_the_same():
+    cs, X, y = get_run_history()
+    model = RandomForestWithInstances(cs, seed=1, normalize_y=True)
+    model.train(X, y)
+    restored = pk.loads(pk.dumps(model))
+
+    X_test = convert_configurations_to_array(cs.sample_configuration(10))
+    mean, var = model.predict(X_test)
+    restored_mean, restored_var = restored.predict(X_test)
+    np.testing.assert_allclose(restored_mean, mean)
+    np.testing.assert_allclose(restored_var, var)
+
+
+def test_untrained_surrogate_pickles():
+    cs, _, _ = get_run_history()
+    restored = pk.loads(pk.dumps(RandomForestWithInstances(cs, seed=1)))
+    assert restored.rf is None
+    assert restored.hypers == RandomForestWithInstances(cs, seed=1).hypers
+
+
+def test_cache_path_tracks_run_history_and_hypers(tmp_path):
+    cs, X, y = get_run_history()
+    hypers = RandomForestWithInstances(cs, seed=1).hypers
+    cache_dir = str(tmp_path)
+    cache_path = get_surrogate_cache_path(cache_dir, 'dataset', X, y, hypers)
+    assert os.path.dirname(cache_path) == cache_dir
+    assert os.path.basename(cache_path).startswith('dataset-')
+    assert get_surrogate_cache_path(cache_dir, 'dataset', X.copy(), y.copy(), list(hypers)) == cache_path
+
+    assert get_surrogate_cache_path(cache_dir, 'other', X, y, hypers) != cache_path
+    assert get_surrogate_cache_path(cache_dir, 'dataset', X[:-1], y[:-1], hypers) != cache_path
+    assert get_surrogate_cache_path(cache_dir, 'dataset', X, y - 1., hypers) != cache_path
+    assert get_surrogate_cache_path(cache_dir, 'dataset', X, y, RandomForestWithInstances(cs, seed=2).hypers) \
+        != cache_path
+
+
+def test_default_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert get_default_surrogate_cache_dir() == os.path.join(str(tmp_path), 'solnml', 'tlbo_surrogates')
+    monkeypatch.delenv('XDG_CACHE_HOME')
+    cache_dir = get_default_surrogate_cache_dir()
+    assert cache_dir.startswith(os.path.expanduser('~'))
+    # The cache never lives inside the installed package.
+    import solnml
+    assert not cache_dir.startswith(os.path.dirname(solnml.__file__))
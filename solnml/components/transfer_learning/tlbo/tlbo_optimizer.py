@@ -1,5 +1,6 @@
 import os
 import re
+import hashlib
 import typing
 import numpy as np
 import pickle as pk
@@ -14,6 +15,7 @@ from .config_space.util import convert_configurations_to_array
 from .bo_optimizer import BaseFacade
 from .models.rf_with_instances import RandomForestWithInstances
 from .models.gp_ensemble import GaussianProcessEnsemble
+from solnml.utils.file_utils import atomic_dump
 os_sep = os.sep
 
 
@@ -64,7 +66,31 @@ def has_runhistory(config_space, task_id='hpo'):
     return True if len(datasets) > 0 else False
 
 
-def get_pretrain_surrogate_models(config_space, metric, task_id='hpo'):
+def get_surrogate_cache_path(cache_dir, dataset, X, y, hypers):
+    """Cache entry of the surrogate of dataset, keyed by its run history and the hyperparameters of the model."""
+    hasher = hashlib.sha1()
+    for array in [X, y]:
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        hasher.update(str(array.shape).encode('utf8'))
+        hasher.update(array.data)
+    hasher.update(str(hypers).encode('utf8'))
+    return os.path.join(cache_dir, '%s-%s.pkl' % (dataset, hasher.hexdigest()))
+
+
+def get_default_surrogate_cache_dir():
+    """Per-user cache directory, so that the installed package is never written to."""
+    cache_home = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_home, 'solnml', 'tlbo_surrogates')
+
+
+def get_pretrain_surrogate_models(config_space, metric, task_id='hpo', cache_dir=None):
+    """
+    Train one random-forest surrogate per source dataset of the run history.
+
+    :param cache_dir: directory of the trained surrogates, one file per dataset keyed by
+        (dataset, hash of its run history, hyperparameters of the surrogate); defaults to
+        get_default_surrogate_cache_dir(). Surrogates found there are loaded instead of retrained.
+    """
     max_runs = None
     estimator_id = config_space.get_default_configuration()['estimator']
     cur_dir = os.path.dirname(__file__)
@@ -82,6 +108,9 @@ def get_pretrain_surrogate_models(config_space, metric, task_id='hpo'):
             print('No related knowledge transferred: [%s][%s][%s]' % (estimator_id, metric, task_id))
             return None
         else:
+            if cache_dir is None:
+                cache_dir = get_default_surrogate_cache_dir()
+            cache_dir = os.path.join(cache_dir, '%s_%s_%s' % (estimator_id, metric, task_id))
             runhistory = load_runhistory(runhistory_dir, dataset_names, estimator_id, metric, task_id)
             surrogate_models = list()
             for dataset, hist in zip(dataset_names, runhistory):
@@ -95,12 +124,26 @@ def get_pretrain_surrogate_models(config_space, metric, task_id='hpo'):
                 # Turning it to a minimization problem.
                 y = -np.array([row[1] for row in hist[1]]).reshape(-1, 1)
                 X, y = X[:max_runs], y[:max_runs]
+
+                cache_path = get_surrogate_cache_path(cache_dir, dataset, X, y, _model.hypers)
+                if os.path.exists(cache_path):
+                    try:
+                        with open(cache_path, 'rb') as f:
+                            surrogate_models.append(pk.load(f))
+                        print('%s: basic surrogate model loaded from cache.' % dataset)
+                        continue
+                    except Exception as e:
+                        print('%s: failed to load the cached surrogate model: %s' % (dataset, str(e)))
+
                 _model.train(X, y)
                 surrogate_models.append(_model)
                 print('%s: training basic surrogate model finished.' % dataset)
-            # TODO: bugs reported, TypeError: can't pickle SwigPyObject objects.
-            # with open(surrogate_models_file, 'wb') as f:
-            #     pk.dump(surrogate_models, f)
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    atomic_dump(_model, cache_path)
+                except Exception as e:
+                    # Caching is best effort: the trained model is used either way.
+                    print('%s: failed to cache the surrogate model: %s' % (dataset, str(e)))
             return surrogate_models
 
 
@@ -115,7 +158,8 @@ class TLBO(BaseFacade):
                  max_runs=200,
                  initial_runs=5,
                  task_id=None,
-                 rng=None):
+                 rng=None,
+                 surrogate_cache_dir=None):
         super().__init__(config_space, task_id)
         self.gp_fusion = gp_fusion
         self.meta_warmstart = meta_warmstart
@@ -142,7 +186,7 @@ class TLBO(BaseFacade):
         self.objective_function = objective_function
         seed = rng.randint(MAXINT)
 
-        gp_models = get_pretrain_surrogate_models(self.config_space, metric)
+        gp_models = get_pretrain_surrogate_models(self.config_space, metric, cache_dir=surrogate_cache_dir)
         if gp_models is None:
             self.model = RandomForestWithInstances(config_space, seed=seed, normalize_y=True)
         else:
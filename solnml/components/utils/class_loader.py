@@ -3,6 +3,7 @@ import pkgutil
 import inspect
 import importlib
 from collections import OrderedDict
+from collections.abc import MutableMapping
 
 
 def find_components(package, directory, base_class):
@@ -24,6 +25,55 @@ def find_components(package, directory, base_class):
     return components
 
 
+class LazyComponents(MutableMapping):
+    """
+    Component registry keyed by module name, which imports a component module
+    only when the component is first looked up. Listing the available
+    algorithms (keys, membership) never imports the estimators themselves.
+    """
+
+    def __init__(self, package, module_names, base_class):
+        self.package = package
+        self.base_class = base_class
+        self._components = OrderedDict((name, None) for name in module_names)
+
+    def _load(self, module_name):
+        module = importlib.import_module("%s.%s" % (self.package, module_name))
+        for member_name, obj in inspect.getmembers(module):
+            if inspect.isclass(obj) and issubclass(obj, self.base_class) and \
+                    obj != self.base_class:
+                return obj
+        raise KeyError('No subclass of %s found in module %s!' % (str(self.base_class), module_name))
+
+    def __getitem__(self, key):
+        component = self._components[key]
+        if component is None:
+            component = self._load(key)
+            self._components[key] = component
+        return component
+
+    def __setitem__(self, key, value):
+        self._components[key] = value
+
+    def __delitem__(self, key):
+        del self._components[key]
+
+    def __iter__(self):
+        return iter(self._components)
+
+    def __len__(self):
+        return len(self._components)
+
+    def __contains__(self, key):
+        return key in self._components
+
+
+def find_lazy_components(package, directory, base_class):
+    module_names = [module_name for _, module_name, ispkg in pkgutil.iter_modules([directory])
+                    if not ispkg]
+    return LazyComponents(package, module_names, base_class)
+
+
 class ThirdPartyComponents(object):
     def __init__(self, base_class):
         self.base_class = base_class
@@ -91,7 +91,8 @@ class NanOrdinalEncoder(_BaseEncoder):
 
 
 @ignore_warnings([RuntimeWarning, FutureWarning])
-def calculate_metafeatures(dataset, dataset_id=None, data_dir='./', task_type=None):
+def calculate_metafeatures(dataset, dataset_id=None, data_dir='./', task_type=None,
+                           subsample_size=None, n_jobs=1, cache_dir=None):
     if isinstance(dataset, str):
         X, y, feature_types = load_data(dataset, data_dir, datanode_returned=False, preprocess=False, task_type=task_type)
         dataset_id = dataset
@@ -124,5 +125,8 @@ def calculate_metafeatures(dataset, dataset_id=None, data_dir='./', task_type=No
     mf = calculate_all_metafeatures(X=X, y=y,
                                     categorical=categorical_,
                                     dataset_name=dataset_id,
-                                    task_type=task_type)
+                                    task_type=task_type,
+                                    subsample_size=subsample_size,
+                                    n_jobs=n_jobs,
+                                    cache_dir=cache_dir)
     return mf.load_values()
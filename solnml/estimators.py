@@ -1,11 +1,15 @@
 import numpy as np
+from typing import TYPE_CHECKING
 from sklearn.utils.multiclass import type_of_target
 from solnml.base_estimator import BaseEstimator, BaseDLEstimator
 from solnml.components.utils.constants import type_dict, MULTILABEL_CLS, IMG_CLS, TEXT_CLS, OBJECT_DET
 from solnml.components.feature_engineering.transformation_graph import DataNode
-from solnml.datasets.image_dataset import ImageDataset
-from solnml.datasets.text_dataset import TextDataset
-from solnml.datasets.od_dataset import ODDataset
+
+if TYPE_CHECKING:
+    # The deep-learning stack (torch/torchvision) is only imported once a DL estimator is used.
+    from solnml.datasets.image_dataset import ImageDataset
+    from solnml.datasets.text_dataset import TextDataset
+    from solnml.datasets.od_dataset import ODDataset
 
 
 class Classifier(BaseEstimator):
@@ -31,34 +35,36 @@ class Classifier(BaseEstimator):
 
         return self
 
-    def predict(self, X, batch_size=None, n_jobs=1):
+    def predict(self, X, batch_size=None, n_jobs=1, output_path=None):
         """
         Predict classes for X.
         :param X: Datanode
-        :param batch_size: int
-        :param n_jobs: int
+        :param batch_size: int, if set, X is predicted in blocks of batch_size rows
+        :param n_jobs: int, number of blocks predicted concurrently
+        :param output_path: str, if set, the predictions are written to this .npy file and returned as a memmap
         :return: y : array of shape = [n_samples]
             The predicted classes.
         """
         if not isinstance(X, DataNode):
             raise ValueError("X is supposed to be a Data Node, but get %s" % type(X))
-        return super().predict(X, batch_size=batch_size, n_jobs=n_jobs)
+        return super().predict(X, batch_size=batch_size, n_jobs=n_jobs, output_path=output_path)
 
     def refit(self):
         return super().refit()
 
-    def predict_proba(self, X, batch_size=None, n_jobs=1):
+    def predict_proba(self, X, batch_size=None, n_jobs=1, output_path=None):
         """
         Predict probabilities of classes for all samples X.
         :param X: Datanode
-        :param batch_size: int
-        :param n_jobs: int
+        :param batch_size: int, if set, X is predicted in blocks of batch_size rows
+        :param n_jobs: int, number of blocks predicted concurrently
+        :param output_path: str, if set, the predictions are written to this .npy file and returned as a memmap
         :return: y : array of shape = [n_samples, n_classes]
             The predicted class probabilities.
         """
         if not isinstance(X, DataNode):
             raise ValueError("X is supposed to be a Data Node, but get %s" % type(X))
-        pred_proba = super().predict_proba(X, batch_size=batch_size, n_jobs=n_jobs)
+        pred_proba = super().predict_proba(X, batch_size=batch_size, n_jobs=n_jobs, output_path=output_path)
 
         if self.task_type != MULTILABEL_CLS:
             assert (
@@ -141,18 +147,19 @@ class Regressor(BaseEstimator):
 
         return self
 
-    def predict(self, X, batch_size=None, n_jobs=1):
+    def predict(self, X, batch_size=None, n_jobs=1, output_path=None):
         """
         Make predictions for X.
         :param X: DataNode
-        :param batch_size: int
-        :param n_jobs: int
+        :param batch_size: int, if set, X is predicted in blocks of batch_size rows
+        :param n_jobs: int, number of blocks predicted concurrently
+        :param output_path: str, if set, the predictions are written to this .npy file and returned as a memmap
         :return: y : array of shape = [n_samples] or [n_samples, n_labels]
             The predicted classes.
         """
         if not isinstance(X, DataNode):
             raise ValueError("X is supposed to be a Data Node, but get %s" % type(X))
-        return super().predict(X, batch_size=batch_size, n_jobs=n_jobs)
+        return super().predict(X, batch_size=batch_size, n_jobs=n_jobs, output_path=output_path)
 
     def get_tree_importance(self, data: DataNode):
         from lightgbm import LGBMRegressor
@@ -211,7 +218,7 @@ class ImageClassifier(BaseDLEstimator):
                          output_dir=output_dir)
         self.image_size = None
 
-    def fit(self, data: ImageDataset, **kwargs):
+    def fit(self, data: 'ImageDataset', **kwargs):
         """
         Fit the classifier to given training data.
         :param data: instance of Image Dataset
@@ -238,6 +245,7 @@ class ImageClassifier(BaseDLEstimator):
         :return: y : array of shape = [n_samples, n_classes]
             The predicted class probabilities.
         """
+        from solnml.datasets.image_dataset import ImageDataset
         if not isinstance(dataset, ImageDataset):
             raise ValueError("X is supposed to be an ImageDataset, but get %s" % type(dataset))
         pred_proba = super().predict_proba(dataset, mode=mode, batch_size=batch_size, n_jobs=n_jobs)
@@ -260,7 +268,7 @@ class ImageClassifier(BaseDLEstimator):
 class TextClassifier(BaseDLEstimator):
     """This class implements the text classification task. """
 
-    def fit(self, data: TextDataset, **kwargs):
+    def fit(self, data: 'TextDataset', **kwargs):
         """
         Fit the classifier to given training data.
         :param data: instance of Image Dataset
@@ -286,6 +294,7 @@ class TextClassifier(BaseDLEstimator):
         :return: y : array of shape = [n_samples, n_classes]
             The predicted class probabilities.
         """
+        from solnml.datasets.text_dataset import TextDataset
         if not isinstance(dataset, TextDataset):
             raise ValueError("X is supposed to be a TextDataset, but get %s" % type(dataset))
         pred_proba = super().predict_proba(dataset, mode='test', batch_size=batch_size, n_jobs=n_jobs)
@@ -308,7 +317,7 @@ class TextClassifier(BaseDLEstimator):
 class ObjectionDetecter(BaseDLEstimator):
     """This class implements the text classification task. """
 
-    def fit(self, data: ODDataset, **kwargs):
+    def fit(self, data: 'ODDataset', **kwargs):
         """
         Fit the classifier to given training data.
         :param data: instance of Image Dataset
@@ -0,0 +1,25 @@
+import os
+import tempfile
+import pickle as pkl
+
+
+def atomic_dump(obj, path, dump_func=None):
+    """
+    Write obj to path through a temporary file in the same directory, so that readers
+    never see a partially written file. The temporary file is removed if the write fails.
+
+    :param dump_func: function (obj, file object) that writes obj; pickle.dump by default.
+    :return: path.
+    """
+    if dump_func is None:
+        dump_func = pkl.dump
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            dump_func(obj, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
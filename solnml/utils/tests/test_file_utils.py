@@ -0,0 +1,33 @@
+import os
+import pickle as pkl
+import numpy as np
+import pytest
+
+from solnml.utils.file_utils import atomic_dump
+
+
+def test_atomic_dump(tmp_path):
+    path = str(tmp_path / 'obj.pkl')
+    assert atomic_dump({'a': 1}, path) == path
+    with open(path, 'rb') as f:
+        assert pkl.load(f) == {'a': 1}
+
+    atomic_dump(np.arange(3), path, dump_func=lambda array, f: np.save(f, array))
+    np.testing.assert_array_equal(np.load(path), np.arange(3))
+    assert os.listdir(str(tmp_path)) == ['obj.pkl']
+
+
+def test_failed_dump_leaves_no_trace(tmp_path):
+    path = str(tmp_path / 'obj.pkl')
+    atomic_dump('old', path)
+
+    def failing_dump(obj, f):
+        f.write(b'partial')
+        raise RuntimeError('disk full')
+
+    with pytest.raises(RuntimeError):
+        atomic_dump('new', path, dump_func=failing_dump)
+    # The previous file is kept and the temporary file is removed.
+    assert os.listdir(str(tmp_path)) == ['obj.pkl']
+    with open(path, 'rb') as f:
+        assert pkl.load(f) == 'old'